@@ -0,0 +1,247 @@
+"""
+Estadísticas de las tareas con columnas NumPy.
+
+VistaColumnar guarda una fila por tarea (proyecto, estado, prioridad y
+fechas como datetime64) y se mantiene al día con los eventos de cambio de
+GestorDatos: solo se reescriben las filas de las tareas tocadas. Los
+agregados (tasa de completado por semana, vencidas, creadas/completadas
+por semana, mezcla de prioridades) son operaciones vectorizadas.
+
+Las tareas archivadas (completadas hace más de DIAS_ARCHIVO días) también
+tienen filas, leídas del NDJSON del archivo: sin ellas las semanas viejas
+quedarían sin completadas. Como archivar solo agrega líneas, se lee desde
+donde se quedó la última vez; si se reescribe, el gestor avisa y se relee.
+
+numpy es opcional: sin él, VistaColumnar lanza RuntimeError y la app
+muestra un aviso en lugar del panel.
+"""
+
+import json
+import threading
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PRIORIDADES = ("Alta", "Media", "Baja")  # Mismo orden que RANGO_PRIORIDAD
+SEMANAS_ESTADISTICAS = 8
+CAPACIDAD_INICIAL = 1024
+COLUMNAS = ("valida", "archivada", "proyecto", "completada", "prioridad", "creada", "completada_el", "programada")
+
+class VistaColumnar:
+    """Columnas NumPy de las tareas de un GestorDatos, actualizadas por eventos de cambio"""
+    def __init__(self, gestor):
+        if np is None:
+            raise RuntimeError("Las estadísticas necesitan numpy (pip install numpy)")
+        self.gestor = gestor
+        self._lock = threading.Lock()
+        self._cambiadas = set()  # ids tocados desde la última puesta al día
+        self._recargar = True    # Reconstruir todo (primera vez, recarga de tareas.json o archivo reescrito)
+        self.fila_de = {}        # id -> fila (solo tareas activas; las archivadas no cambian)
+        self._libres = []        # Filas de tareas borradas, para reutilizar
+        self._leido_archivo = 0  # Bytes del NDJSON del archivo ya convertidos en filas
+        self.usadas = 0
+        self._reservar(CAPACIDAD_INICIAL)
+        gestor.observar_tareas(self._cambio)
+
+    def _reservar(self, capacidad):
+        self.valida = np.zeros(capacidad, dtype=bool)
+        self.archivada = np.zeros(capacidad, dtype=bool)
+        self.proyecto = np.zeros(capacidad, dtype=np.int64)
+        self.completada = np.zeros(capacidad, dtype=bool)
+        self.prioridad = np.zeros(capacidad, dtype=np.int8)
+        self.creada = np.full(capacidad, np.datetime64("NaT"), dtype="datetime64[D]")
+        self.completada_el = np.full(capacidad, np.datetime64("NaT"), dtype="datetime64[D]")
+        self.programada = np.full(capacidad, np.datetime64("NaT"), dtype="datetime64[m]")
+
+    def _asegurar(self, filas):
+        """Crece (duplicando) hasta que entren `filas` filas más"""
+        capacidad = len(self.valida)
+        if self.usadas + filas <= capacidad:
+            return
+        while capacidad < self.usadas + filas:
+            capacidad *= 2
+        anteriores = {nombre: getattr(self, nombre) for nombre in COLUMNAS}
+        self._reservar(capacidad)
+        for nombre, vieja in anteriores.items():
+            getattr(self, nombre)[:len(vieja)] = vieja
+
+    def _cambio(self, ids):
+        # Llega desde cualquier hilo y dentro de las operaciones del gestor: solo se anota
+        with self._lock:
+            if ids is None:
+                self._recargar = True
+                self._cambiadas.clear()
+            elif not self._recargar:
+                self._cambiadas.update(ids)
+
+    def al_dia(self):
+        """Aplica los cambios anotados (o reconstruye si hace falta releer todo)"""
+        with self._lock:
+            recargar, cambiadas = self._recargar, self._cambiadas
+            self._recargar, self._cambiadas = False, set()
+        if recargar:
+            self.fila_de, self._libres, self._leido_archivo, self.usadas = {}, [], 0, 0
+            self._reservar(CAPACIDAD_INICIAL)
+            self._leer_archivo()
+            tareas = list(self.gestor.tareas)
+            inicio = self._anexar([t.to_dict() for t in tareas])
+            self.fila_de = {t.id: inicio + i for i, t in enumerate(tareas)}
+            return
+        # Lo archivado desde la última vez: sus tareas dejan de estar activas (vienen en cambiadas)
+        self._leer_archivo()
+        for id in cambiadas:
+            tarea = self.gestor.obtener_tarea(id)
+            if tarea is None:
+                self._quitar(id)
+            else:
+                self._poner(tarea)
+
+    def _leer_archivo(self):
+        ruta = self.gestor.archivo_historial
+        if not ruta.exists():
+            return
+        with open(ruta, 'rb') as f:
+            f.seek(self._leido_archivo)
+            datos = f.read()
+        # Solo líneas completas: una a medio escribir se lee en la próxima vuelta
+        completo = datos.rfind(b"\n") + 1
+        registros = []
+        for linea in datos[:completo].splitlines():
+            try:
+                registros.append(json.loads(linea))
+            except ValueError:
+                continue
+        self._leido_archivo += completo
+        self._anexar(registros, archivadas=True)
+
+    def _anexar(self, registros, archivadas=False):
+        """Agrega filas al final, cada columna convertida de una vez. Devuelve la primera fila"""
+        n = len(registros)
+        self._asegurar(n)
+        inicio, fin = self.usadas, self.usadas + n
+        self.valida[inicio:fin] = True
+        self.archivada[inicio:fin] = archivadas
+        self.proyecto[inicio:fin] = [_entero(r.get("proyecto_id")) for r in registros]
+        self.completada[inicio:fin] = [bool(r.get("completada")) for r in registros]
+        self.prioridad[inicio:fin] = [_rango(r.get("prioridad")) for r in registros]
+        self.creada[inicio:fin] = _fechas([_texto(r.get("fecha_creacion"))[:10] for r in registros], "D")
+        self.completada_el[inicio:fin] = _fechas([_texto(r.get("fecha_completada"))[:10] for r in registros], "D")
+        self.programada[inicio:fin] = _fechas([_texto(r.get("fecha_programada")) for r in registros], "m")
+        self.usadas = fin
+        return inicio
+
+    def _poner(self, tarea):
+        fila = self.fila_de.get(tarea.id)
+        if fila is None:
+            if self._libres:
+                fila = self._libres.pop()
+            else:
+                self._asegurar(1)
+                fila = self.usadas
+                self.usadas += 1
+            self.fila_de[tarea.id] = fila
+        self.valida[fila] = True
+        self.archivada[fila] = False
+        self.proyecto[fila] = tarea.proyecto_id
+        self.completada[fila] = tarea.completada
+        self.prioridad[fila] = _rango(tarea.prioridad)
+        self.creada[fila] = _fecha(_texto(tarea.fecha_creacion)[:10], "D")
+        self.completada_el[fila] = _fecha(_texto(tarea.fecha_completada)[:10], "D")
+        self.programada[fila] = _fecha(_texto(tarea.fecha_programada), "m")
+
+    def _quitar(self, id):
+        fila = self.fila_de.pop(id, None)
+        if fila is not None:
+            self.valida[fila] = False
+            self._libres.append(fila)
+
+    def resumen(self, proyecto_id=None, ahora=None, semanas=SEMANAS_ESTADISTICAS):
+        """Agregados de un proyecto (o de todos con None) para el panel de estadísticas.
+
+        Los totales, las vencidas y la mezcla de prioridades son de las tareas activas;
+        las semanas cuentan también las archivadas.
+        """
+        self.al_dia()
+        ahora = ahora or datetime.now()
+        u = self.usadas
+        filas = self.valida[:u].copy()
+        if proyecto_id is not None:
+            filas &= self.proyecto[:u] == proyecto_id
+        activas = ~self.archivada[:u][filas]
+        completada = self.completada[:u][filas]
+        creada = self.creada[:u][filas]
+        completada_el = self.completada_el[:u][filas]
+        programada = self.programada[:u][filas]
+        prioridad = self.prioridad[:u][filas]
+
+        total = int(activas.sum())
+        hechas = int((completada & activas).sum())
+        pendientes = ~completada & activas
+        # NaT nunca es menor que nada: las tareas sin fecha no cuentan como vencidas
+        vencidas = int((pendientes & (programada < np.datetime64(ahora.strftime("%Y-%m-%dT%H:%M"), "m"))).sum())
+
+        # Semanas de lunes a domingo; la última es la actual
+        hoy = ahora.date()
+        inicio = np.datetime64(hoy - timedelta(days=hoy.weekday()) - timedelta(weeks=semanas - 1), "D")
+        creadas_semana = _por_semana(creada, inicio, semanas)
+        completadas_semana = _por_semana(completada_el[completada], inicio, semanas)
+
+        # Tasa al cierre de cada semana: completadas hasta entonces / creadas hasta entonces
+        fines = inicio + np.arange(1, semanas + 1) * 7
+        creadas_hasta = np.searchsorted(np.sort(creada[~np.isnat(creada)]), fines)
+        completadas_hasta = np.searchsorted(np.sort(completada_el[completada & ~np.isnat(completada_el)]), fines)
+        tasas = np.divide(completadas_hasta, creadas_hasta, out=np.zeros(semanas), where=creadas_hasta > 0)
+
+        mezcla = np.bincount(prioridad[pendientes], minlength=len(PRIORIDADES))
+        return {
+            "total": total,
+            "completadas": hechas,
+            "pendientes": total - hechas,
+            "tasa": hechas / total if total else 0.0,
+            "vencidas": vencidas,
+            "semanas": [
+                {
+                    "inicio": (inicio + 7 * i).astype(date),
+                    "creadas": int(creadas_semana[i]),
+                    "completadas": int(completadas_semana[i]),
+                    "tasa": float(tasas[i]),
+                }
+                for i in range(semanas)
+            ],
+            "prioridades": {nombre: int(mezcla[i]) for i, nombre in enumerate(PRIORIDADES)},
+        }
+
+def _rango(prioridad):
+    return PRIORIDADES.index(prioridad) if prioridad in PRIORIDADES else 1
+
+def _texto(valor):
+    return valor if isinstance(valor, str) else ""
+
+def _entero(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return -1
+
+def _fecha(valor, unidad):
+    """datetime64 de "YYYY-MM-DD[ HH:MM]"; NaT si falta o no se entiende"""
+    try:
+        return np.datetime64(valor or "NaT", unidad)
+    except ValueError:
+        return np.datetime64("NaT", unidad)
+
+def _fechas(valores, unidad):
+    # Todo el bloque de una vez; si alguna fecha está mal, valor a valor (las malas quedan en NaT)
+    try:
+        return np.array(valores, dtype=f"datetime64[{unidad}]")
+    except ValueError:
+        return np.array([_fecha(v, unidad) for v in valores], dtype=f"datetime64[{unidad}]")
+
+def _por_semana(fechas, inicio, semanas):
+    """Cuántas fechas caen en cada una de las `semanas` semanas desde `inicio` (NaT se ignora)"""
+    dias = (fechas[~np.isnat(fechas)] - inicio).astype(np.int64)
+    dias = dias[(dias >= 0) & (dias < semanas * 7)]
+    return np.bincount(dias // 7, minlength=semanas)
@@ -0,0 +1,427 @@
+"""
+Benchmarks de la agenda con datos sintéticos (1k, 10k y 100k tareas).
+
+Mide la carga de datos, cada mutación de GestorDatos (incluida la escritura
+a disco), la revisión del notificador, los ciclos traer/guardar contra el
+emulador local de Sheets y la construcción de tarjetas de tareas. Los
+resultados se escriben en JSON para comparar entre commits:
+
+    python benchmarks.py --tamanos 1000,10000 --salida bench_nuevo.json
+    python benchmarks.py --comparar bench_viejo.json --salida bench_nuevo.json
+
+Cada tamaño corre en un directorio temporal: no toca los .json de la app.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import main2
+import emulador_sheets
+
+TAMANOS = [1000, 10000, 100000]
+TAREAS_POR_PROYECTO = 500
+REPETICIONES = 5
+TAREAS_NUEVAS_GUARDAR = 100  # Tareas solo locales que sube cada ciclo de guardar
+PROYECTOS_TARJETAS = 5  # Proyectos que se abren (en frío) para medir las tarjetas
+UMBRAL_REGRESION = 1.2  # Mediana nueva / vieja a partir de la cual se avisa
+PETICIONES_CARGA = 200  # Peticiones por tipo en la prueba de carga
+# Backend de la prueba de carga: latencia parecida a Apps Script, con cola lenta y errores
+CONFIG_CARGA = dict(latencia_ms=40, jitter_ms=40, tasa_lentas=0.03, latencia_lenta_ms=400, tasa_fallos=0.02, semilla=1)
+
+PALABRAS = ["revisar", "informe", "cliente", "reunión", "enviar", "factura", "diseño", "llamar",
+            "presupuesto", "entrega", "pruebas", "servidor", "contrato", "equipo", "migración",
+            "documentar", "planificar", "compras", "campaña", "soporte", "análisis", "backup"]
+
+# ========== DATOS SINTÉTICOS ==========
+
+def generar_agenda(n_tareas, tareas_por_proyecto=TAREAS_POR_PROYECTO, semilla=42):
+    """(proyectos, tareas) reproducibles para una semilla.
+
+    Un 30 % completadas y un 40 % con fecha programada. Los recordatorios ya
+    pasados figuran como enviados, como en una agenda real, para que el
+    notificador de la app no dispare cientos de avisos al medir.
+    """
+    rnd = random.Random(semilla)
+    ahora = datetime.now()
+    colores = list(main2.COLORES_PROYECTO)
+    n_proyectos = max(1, n_tareas // tareas_por_proyecto)
+    proyectos = [
+        main2.Proyecto(i, f"Proyecto {i}", f"Proyecto sintético {i}", rnd.choice(colores), ahora.strftime("%Y-%m-%d %H:%M"))
+        for i in range(1, n_proyectos + 1)
+    ]
+    tareas = []
+    for i in range(1, n_tareas + 1):
+        creada = ahora - timedelta(days=rnd.randint(0, 365), minutes=rnd.randint(0, 1440))
+        completada = rnd.random() < 0.3
+        fecha_programada = None
+        enviada = False
+        if rnd.random() < 0.4:
+            if rnd.random() < 0.5:
+                fecha = ahora - timedelta(days=rnd.randint(1, 60), minutes=rnd.randint(0, 1440))
+                enviada = True
+            else:
+                fecha = ahora + timedelta(hours=1, days=rnd.randint(0, 60), minutes=rnd.randint(0, 1440))
+            fecha_programada = fecha.strftime("%Y-%m-%d %H:%M")
+        titulo = " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(2, 5))).capitalize()
+        descripcion = " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(0, 20)))
+        tareas.append(main2.Tarea(
+            i, titulo, descripcion, creada.strftime("%Y-%m-%d %H:%M"), rnd.randint(1, n_proyectos),
+            completada, fecha_programada, enviada, rnd.choice(["Alta", "Media", "Baja"]),
+            (creada + timedelta(days=1)).strftime("%Y-%m-%d %H:%M") if completada else None,
+        ))
+    return proyectos, tareas
+
+def escribir_agenda(proyectos, tareas):
+    """Escribe los datos en el directorio actual con el formato de GestorDatos"""
+    gestor = main2.GestorDatos()
+    gestor.proyectos = proyectos
+    gestor.tareas = tareas
+    gestor.guardar_proyectos()
+    gestor.guardar_tareas()
+
+# ========== MEDICIÓN ==========
+
+def resumir(caso, tamano, tiempos_ms, **extra):
+    ordenados = sorted(tiempos_ms)
+    
+    def percentil(p):
+        return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))], 3)
+    
+    return {
+        "caso": caso,
+        "tareas": tamano,
+        "n": len(ordenados),
+        "mediana_ms": round(statistics.median(ordenados), 3),
+        "p95_ms": percentil(0.95),
+        "p99_ms": percentil(0.99),
+        "min_ms": round(ordenados[0], 3),
+        "max_ms": round(ordenados[-1], 3),
+        **extra,
+    }
+
+def medir(funcion, repeticiones=REPETICIONES, preparar=None):
+    """Tiempos en ms de funcion(); preparar() corre antes de cada vuelta sin contar"""
+    tiempos = []
+    for _ in range(repeticiones):
+        argumentos = preparar() if preparar else ()
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+# ========== CASOS ==========
+
+def bench_gestor(tamano, proyectos, tareas, rnd):
+    resultados = []
+    resultados.append(resumir("cargar_datos", tamano, medir(main2.GestorDatos, repeticiones=3)))
+
+    gestor = main2.GestorDatos()
+    # Índices calientes, como en la app después del arranque
+    gestor.preparar_busqueda()
+    gestor.obtener_tareas_ordenadas(1)
+    gestor.tareas_entre("", "9999")
+
+    def id_al_azar():
+        return (rnd.choice(gestor.tareas).id,)
+
+    resultados.append(resumir("agregar_tarea", tamano, medir(
+        lambda: gestor.agregar_tarea("Tarea de benchmark", "descripción", 1, None, "Alta"))))
+    resultados.append(resumir("actualizar_tarea", tamano, medir(
+        lambda id: gestor.actualizar_tarea(id, "Editada", "nueva descripción", False, None, "Baja"), preparar=id_al_azar)))
+    resultados.append(resumir("toggle_completada", tamano, medir(gestor.toggle_completada, preparar=id_al_azar)))
+    resultados.append(resumir("marcar_notificacion_enviada", tamano, medir(gestor.marcar_notificacion_enviada, preparar=id_al_azar)))
+    resultados.append(resumir("eliminar_tarea", tamano, medir(gestor.eliminar_tarea, preparar=id_al_azar)))
+    resultados.append(resumir("agregar_proyecto", tamano, medir(
+        lambda: gestor.agregar_proyecto("Proyecto de benchmark", "", "Azul"))))
+    resultados.append(resumir("actualizar_proyecto", tamano, medir(
+        lambda: gestor.actualizar_proyecto(1, "Proyecto 1", "editado", "Verde"))))
+    ids_proyectos = iter(p.id for p in proyectos[::-1])
+    resultados.append(resumir("eliminar_proyecto", tamano, medir(
+        gestor.eliminar_proyecto, repeticiones=min(REPETICIONES, len(proyectos)), preparar=lambda: (next(ids_proyectos),))))
+
+    notificador = main2.NotificadorTareas(gestor)
+    resultados.append(resumir("notificador_revisar", tamano, medir(
+        lambda: notificador.revisar(datetime.now()), repeticiones=20)))
+    return resultados
+
+def bench_sync(tamano, proyectos, tareas):
+    """Ciclos del SincronizadorAutomatico contra el emulador local"""
+    filas_proyectos = [p.to_dict() for p in proyectos]
+    filas_tareas = [t.to_dict() for t in tareas]
+
+    def servidor_con(filas):
+        backend = emulador_sheets.BackendSheets()
+        backend.cargar(emulador_sheets.SHEET_PROYECTOS, filas_proyectos)
+        backend.cargar(emulador_sheets.SHEET_TAREAS, filas)
+        return emulador_sheets.crear_servidor(backend)
+
+    async def ciclo(url, gestor, operacion):
+        cliente = main2.ClienteSincronizacion(url)
+        sincronizador = main2.SincronizadorAutomatico(gestor, cliente)
+        try:
+            return await getattr(sincronizador, operacion)()
+        finally:
+            await cliente.cerrar()
+
+    def vaciar_local():
+        for archivo in ("proyectos.json", "tareas.json"):
+            if os.path.exists(archivo):
+                os.remove(archivo)
+        return (main2.GestorDatos(),)
+
+    resultados = []
+    # traer: dispositivo nuevo (local vacío) que descarga todo
+    servidor, url = servidor_con(filas_tareas)
+    try:
+        tiempos = medir(lambda gestor: asyncio.run(ciclo(url, gestor, "_traer")), repeticiones=3, preparar=vaciar_local)
+        resultados.append(resumir("sincronizar_traer", tamano, tiempos))
+    finally:
+        servidor.shutdown()
+
+    # guardar: Sheets ya tiene todo salvo las últimas TAREAS_NUEVAS_GUARDAR
+    escribir_agenda(proyectos, tareas)
+    tiempos = []
+    for _ in range(3):
+        servidor, url = servidor_con(filas_tareas[:-TAREAS_NUEVAS_GUARDAR])
+        try:
+            gestor = main2.GestorDatos()
+            inicio = time.perf_counter()
+            asyncio.run(ciclo(url, gestor, "_guardar"))
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        finally:
+            servidor.shutdown()
+    resultados.append(resumir("sincronizar_guardar", tamano, tiempos))
+    return resultados
+
+def bench_carga(tamano, proyectos, tareas):
+    """Throughput y latencia de cola de ClienteSincronizacion (reintentos y circuito
+    incluidos) contra el emulador con latencia, peticiones lentas y errores 500"""
+    backend = emulador_sheets.BackendSheets()
+    backend.cargar(emulador_sheets.SHEET_PROYECTOS, [p.to_dict() for p in proyectos])
+    backend.cargar(emulador_sheets.SHEET_TAREAS, [t.to_dict() for t in tareas])
+    servidor, url = emulador_sheets.crear_servidor(backend, emulador_sheets.ConfigEmulador(**CONFIG_CARGA))
+    rnd = random.Random(3)
+    
+    async def carga():
+        cliente = main2.ClienteSincronizacion(url)
+        medidas = {"post": [], "get": []}
+        errores = {"post": 0, "get": 0}
+        
+        async def cronometrar(tipo, corrutina):
+            inicio = time.perf_counter()
+            try:
+                ok = await corrutina
+            except main2.CircuitoAbierto:
+                raise
+            except Exception:
+                ok = False
+            medidas[tipo].append((time.perf_counter() - inicio) * 1000)
+            errores[tipo] += not ok
+            return ok
+        
+        nuevas = [main2.Tarea(tamano + i, f"Carga {i}", "", t.fecha_creacion, t.proyecto_id)
+                  for i, t in enumerate(rnd.sample(tareas, min(PETICIONES_CARGA, len(tareas))), start=1)]
+        inicio = time.perf_counter()
+        await cliente.enviar_varios(lambda t: cronometrar("post", cliente.enviar_tarea(t)), nuevas)
+        duracion_post = time.perf_counter() - inicio
+        
+        async def leer_pagina(cursor):
+            response = await cliente._peticion("GET", {"path": "tareas", "limit": main2.TAMANO_PAGINA_SYNC, "cursor": cursor})
+            return response.status_code == 200 and "tareas" in response.json()
+        
+        cursores = [str(rnd.randint(2, len(tareas) + 1)) for _ in range(PETICIONES_CARGA)]
+        inicio = time.perf_counter()
+        await cliente.enviar_varios(lambda c: cronometrar("get", leer_pagina(c)), cursores)
+        duracion_get = time.perf_counter() - inicio
+        await cliente.cerrar()
+        return medidas, errores, {"post": duracion_post, "get": duracion_get}
+    
+    try:
+        medidas, errores, duraciones = asyncio.run(carga())
+    finally:
+        servidor.shutdown()
+    return [
+        resumir(f"carga_{tipo}", tamano, medidas[tipo],
+                por_segundo=round(len(medidas[tipo]) / duraciones[tipo], 1), errores=errores[tipo])
+        for tipo in ("post", "get")
+    ]
+
+class PaginaSinVentana:
+    """Lo que main() usa de ft.Page, sin cliente Flutter. El event loop corre en un hilo"""
+    def __init__(self, ancho=1200, alto=800):
+        self.width = ancho
+        self.height = alto
+        self.overlay = []
+        self.controls = []
+        self.floating_action_button = None
+        self.updates = 0
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def add(self, *controles):
+        self.controls.extend(controles)
+
+    def update(self, *controles):
+        self.updates += 1
+
+    def run_task(self, handler, *args, **kwargs):
+        return asyncio.run_coroutine_threadsafe(handler(*args, **kwargs), self.loop)
+
+    def cerrar(self):
+        async def cancelar_tareas():
+            # Notificador y demás tareas de main(): cancelarlas antes de parar el loop
+            pendientes = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in pendientes:
+                t.cancel()
+            await asyncio.gather(*pendientes, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(cancelar_tareas(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+def buscar_controles(control, clave_prefijo, encontrados):
+    if str(getattr(control, "key", "") or "").startswith(clave_prefijo):
+        encontrados.append(control)
+    for atributo in ("controls", "content"):
+        hijo = getattr(control, atributo, None)
+        for c in (hijo if isinstance(hijo, list) else [hijo]):
+            if c is not None and not isinstance(c, str):
+                buscar_controles(c, clave_prefijo, encontrados)
+    return encontrados
+
+def bench_tarjetas(tamano, proyectos):
+    """Arranque de la UI (primer frame, interactiva) y tarjetas de tareas al abrir
+    proyectos no visitados (caché de tarjetas en frío)"""
+    tiempos_tarjeta = []
+    obtener_original = main2.CacheTarjetas.obtener
+
+    def obtener_medido(cache, id, firma, crear):
+        def crear_medido():
+            inicio = time.perf_counter()
+            control = crear()
+            if str(control.key).startswith("tarea-"):
+                tiempos_tarjeta.append((time.perf_counter() - inicio) * 1000)
+            return control
+        return obtener_original(cache, id, firma, crear_medido)
+
+    main2.GOOGLE_SHEETS_URL = ""  # Sin sincronización durante la medición
+    main2.CacheTarjetas.obtener = obtener_medido
+    pagina = PaginaSinVentana()
+    try:
+        asyncio.run_coroutine_threadsafe(main2.main(pagina), pagina.loop).result()
+        while "interactivo" not in main2.ARRANQUE:  # tareas.json se carga tras el primer frame
+            time.sleep(0.01)
+        arranque = dict(main2.ARRANQUE)
+        time.sleep(0.5 + tamano / 50000)  # Deja terminar el índice de búsqueda del arranque
+
+        tiempos_seleccion = []
+        for proyecto in proyectos[:PROYECTOS_TARJETAS]:
+            tarjeta = buscar_controles(pagina.controls[0], f"proyecto-{proyecto.id}", [])[0]
+            updates = pagina.updates
+            inicio = time.perf_counter()
+            tarjeta.on_tap(None)
+            while pagina.updates == updates:
+                time.sleep(0.0005)
+            tiempos_seleccion.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        main2.CacheTarjetas.obtener = obtener_original
+        pagina.cerrar()
+
+    return [
+        resumir("arranque_primer_frame", tamano, [arranque["primer_frame"] * 1000]),
+        resumir("arranque_interactivo", tamano, [arranque["interactivo"] * 1000]),
+        resumir("crear_tarjeta_tarea", tamano, tiempos_tarjeta),
+        # Incluye la espera de un frame (INTERVALO_FRAME) del planificador de render
+        resumir("seleccionar_proyecto_frio", tamano, tiempos_seleccion),
+    ]
+
+# ========== EJECUCIÓN ==========
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def ejecutar(tamanos, casos):
+    resultados = []
+    directorio_inicial = os.getcwd()
+    for tamano in tamanos:
+        print(f"⏱️ {tamano} tareas...")
+        proyectos, tareas = generar_agenda(tamano)
+        with tempfile.TemporaryDirectory(prefix="bench_agenda_") as directorio:
+            os.chdir(directorio)
+            try:
+                escribir_agenda(proyectos, tareas)
+                if "gestor" in casos:
+                    resultados += bench_gestor(tamano, proyectos, tareas, random.Random(7))
+                if "sync" in casos:
+                    resultados += bench_sync(tamano, proyectos, tareas)
+                if "carga" in casos:
+                    resultados += bench_carga(tamano, proyectos, tareas)
+                if "tarjetas" in casos:
+                    escribir_agenda(proyectos, tareas)
+                    resultados += bench_tarjetas(tamano, proyectos)
+            finally:
+                os.chdir(directorio_inicial)
+    return {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+def comparar(nuevo, viejo, umbral=UMBRAL_REGRESION):
+    """Imprime la razón de medianas por caso; devuelve cuántos casos empeoraron más del umbral"""
+    anteriores = {(r["caso"], r["tareas"]): r for r in viejo["resultados"]}
+    regresiones = 0
+    print(f"\nComparación con {viejo.get('commit') or 'anterior'}:")
+    for r in nuevo["resultados"]:
+        previo = anteriores.get((r["caso"], r["tareas"]))
+        if not previo or not previo["mediana_ms"]:
+            continue
+        razon = r["mediana_ms"] / previo["mediana_ms"]
+        marca = "⚠️" if razon > umbral else "  "
+        regresiones += razon > umbral
+        print(f"{marca} {r['caso']:<28} {r['tareas']:>7}  {previo['mediana_ms']:>10.3f} -> {r['mediana_ms']:>10.3f} ms  x{razon:.2f}")
+    return regresiones
+
+def imprimir(informe):
+    print(f"\n{'caso':<28} {'tareas':>7} {'mediana ms':>11} {'p95 ms':>10} {'p99 ms':>10} {'n':>4}")
+    for r in informe["resultados"]:
+        extra = f"  {r['por_segundo']}/s, {r['errores']} errores" if "por_segundo" in r else ""
+        print(f"{r['caso']:<28} {r['tareas']:>7} {r['mediana_ms']:>11.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['n']:>4}{extra}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de la agenda de proyectos")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)), help="Cantidades de tareas separadas por comas")
+    parser.add_argument("--casos", default="gestor,sync,carga,tarjetas", help="Grupos a medir: gestor, sync, carga, tarjetas")
+    parser.add_argument("--salida", default="bench_resultados.json", help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    # Rutas relativas al directorio desde el que se lanza (cada tamaño corre en uno temporal)
+    salida = os.path.abspath(args.salida)
+    anterior = os.path.abspath(args.comparar) if args.comparar else None
+
+    informe = ejecutar([int(t) for t in args.tamanos.split(",")], set(args.casos.split(",")))
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    imprimir(informe)
+    print(f"\n✓ Resultados en {salida}")
+
+    if anterior:
+        with open(anterior, "r", encoding="utf-8") as f:
+            if comparar(informe, json.load(f)):
+                sys.exit(1)
@@ -0,0 +1,390 @@
+"""
+Backend local que imita a google_apps_script.js (solo biblioteca estándar).
+
+Las "hojas" son listas de filas en memoria con la fila 1 de cabeceras, igual
+que en Sheets: los cursores de paginación son números de fila y las celdas
+vacías se devuelven como "". Implementa doGet/doPost/doPut/doDelete y puede
+inyectar latencia, errores, cortes de conexión y las cuotas de Apps Script
+(ejecuciones simultáneas y peticiones por día) para pruebas de carga:
+
+    python emulador_sheets.py --puerto 8765 --latencia-ms 300 --jitter-ms 200 --tasa-fallos 0.02
+    GOOGLE_SHEETS_URL=http://127.0.0.1:8765/ python main2.py
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Mismos nombres y cabeceras que google_apps_script.js
+SHEET_TAREAS = "TAREAS"
+SHEET_PROYECTOS = "PROYECTOS"
+SHEET_ARCHIVO = "ARCHIVO"
+LIMITE_PAGINA_MAX = 500
+
+CABECERAS = {
+    SHEET_TAREAS: ["id", "titulo", "descripcion", "fecha_creacion", "proyecto_id", "completada",
+                   "fecha_programada", "notificacion_enviada", "prioridad", "fecha_completada"],
+    SHEET_PROYECTOS: ["id", "nombre", "descripcion", "color", "fecha_creacion"],
+}
+CABECERAS[SHEET_ARCHIVO] = CABECERAS[SHEET_TAREAS]
+
+# Límites de Apps Script (cuentas gratuitas)
+MAX_EJECUCIONES_SIMULTANEAS = 30
+RUTA_REDIRECCION = "/macros/echo"  # Como script.googleusercontent.com tras el 302
+
+# ========== HOJAS EN MEMORIA ==========
+
+class BackendSheets:
+    """Las tres hojas y las mismas operaciones que el Apps Script"""
+    def __init__(self):
+        self.hojas = {nombre: [list(cabeceras)] for nombre, cabeceras in CABECERAS.items()}
+        self._lock = threading.Lock()  # Apps Script serializa las escrituras sobre una hoja
+
+    @staticmethod
+    def _fila_a_objeto(fila, cabeceras):
+        return dict(zip(cabeceras, fila))
+
+    @staticmethod
+    def _objeto_a_fila(obj, cabeceras):
+        # Como objectToRow: obj[h] || ""
+        return [obj.get(h) or "" for h in cabeceras]
+
+    def cargar(self, hoja, objetos):
+        """Rellena una hoja de golpe (datos de prueba)"""
+        with self._lock:
+            cabeceras = self.hojas[hoja][0]
+            self.hojas[hoja].extend(self._objeto_a_fila(o, cabeceras) for o in objetos)
+
+    def listar(self, hoja):
+        with self._lock:
+            cabeceras, *filas = self.hojas[hoja]
+            return [self._fila_a_objeto(f, cabeceras) for f in filas if f[0]]
+
+    def pagina(self, hoja, cursor, limit):
+        """Como getPagina: cursor = fila de Sheets (1-based) donde empieza la página"""
+        with self._lock:
+            filas = self.hojas[hoja]
+            ultima = len(filas)
+            try:
+                limite = int(limit)
+            except (TypeError, ValueError):
+                limite = LIMITE_PAGINA_MAX
+            limite = min(max(limite, 1), LIMITE_PAGINA_MAX)
+            try:
+                inicio = max(int(cursor), 2)
+            except (TypeError, ValueError):
+                inicio = 2
+            tramo = filas[inicio - 1:inicio - 1 + limite]
+            items = [self._fila_a_objeto(f, filas[0]) for f in tramo if f[0]]
+            siguiente = inicio + len(tramo)
+            return {"items": items, "siguiente_cursor": str(siguiente) if tramo and siguiente <= ultima else None}
+
+    def crear(self, hoja, obj):
+        with self._lock:
+            self.hojas[hoja].append(self._objeto_a_fila(obj, self.hojas[hoja][0]))
+        return obj
+
+    def actualizar(self, hoja, id, obj):
+        """Como actualizarTarea/actualizarProyecto: reescribe la fila entera; None si no existe"""
+        with self._lock:
+            filas = self.hojas[hoja]
+            for i in range(1, len(filas)):
+                if str(filas[i][0]) == str(id):
+                    filas[i] = self._objeto_a_fila(obj, filas[0])
+                    return obj
+        return None
+
+    def eliminar(self, hoja, id):
+        with self._lock:
+            return self._eliminar(hoja, id)
+
+    def _eliminar(self, hoja, id):
+        filas = self.hojas[hoja]
+        for i in range(1, len(filas)):
+            if str(filas[i][0]) == str(id):
+                del filas[i]
+                return True
+        return False
+
+    def eliminar_proyecto(self, id):
+        """Como eliminarProyecto: también borra las tareas del proyecto"""
+        with self._lock:
+            if not self._eliminar(SHEET_PROYECTOS, id):
+                return False
+            tareas = self.hojas[SHEET_TAREAS]
+            columna = tareas[0].index("proyecto_id")
+            self.hojas[SHEET_TAREAS] = [tareas[0]] + [f for f in tareas[1:] if str(f[columna]) != str(id)]
+            return True
+
+    def archivar_tareas(self, ids):
+        pendientes = {str(i) for i in ids or []}
+        with self._lock:
+            tareas = self.hojas[SHEET_TAREAS]
+            archivo = self.hojas[SHEET_ARCHIVO]
+            ya_archivadas = {str(f[0]) for f in archivo[1:]}
+            conservar = [tareas[0]]
+            archivadas = 0
+            for fila in tareas[1:]:
+                if str(fila[0]) in pendientes:
+                    archivadas += 1
+                    if str(fila[0]) not in ya_archivadas:
+                        archivo.append(fila)
+                else:
+                    conservar.append(fila)
+            self.hojas[SHEET_TAREAS] = conservar
+        return {"archivadas": archivadas}
+
+# ========== FALLOS Y CUOTAS ==========
+
+class ConfigEmulador:
+    """Comportamiento de red/servicio que se inyecta en cada petición"""
+    def __init__(self, latencia_ms=0, jitter_ms=0, tasa_lentas=0.0, latencia_lenta_ms=3000,
+                 tasa_fallos=0.0, tasa_cortes=0.0, max_simultaneas=MAX_EJECUCIONES_SIMULTANEAS,
+                 cuota_diaria=None, redireccion=False, semilla=None):
+        self.latencia_ms = latencia_ms  # Base de cada ejecución
+        self.jitter_ms = jitter_ms  # Extra uniforme en [0, jitter_ms]
+        self.tasa_lentas = tasa_lentas  # Fracción con latencia_lenta_ms (la cola de la distribución)
+        self.latencia_lenta_ms = latencia_lenta_ms
+        self.tasa_fallos = tasa_fallos  # Fracción que responde 500
+        self.tasa_cortes = tasa_cortes  # Fracción que cierra la conexión sin responder
+        self.max_simultaneas = max_simultaneas  # Más ejecuciones a la vez -> 429
+        self.cuota_diaria = cuota_diaria  # Peticiones por día antes de 429 (None = sin límite)
+        self.redireccion = redireccion  # Responder 302 como el despliegue real
+        self.azar = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def sortear(self):
+        """(espera en segundos, "fallo"/"corte"/None) para una petición"""
+        with self._lock:
+            espera = self.latencia_ms + self.azar.uniform(0, self.jitter_ms)
+            if self.azar.random() < self.tasa_lentas:
+                espera = self.latencia_lenta_ms
+            r = self.azar.random()
+        if r < self.tasa_cortes:
+            return espera / 1000, "corte"
+        if r < self.tasa_cortes + self.tasa_fallos:
+            return espera / 1000, "fallo"
+        return espera / 1000, None
+
+class Cuotas:
+    """Ejecuciones simultáneas y peticiones del día, como los límites de Apps Script"""
+    def __init__(self, config):
+        self.config = config
+        self.en_curso = 0
+        self.dia = time.strftime("%Y-%m-%d")
+        self.hoy = 0
+        self.rechazadas = 0
+        self._lock = threading.Lock()
+
+    def entrar(self):
+        """None si la petición entra; si no, el mensaje de error de Apps Script"""
+        with self._lock:
+            dia = time.strftime("%Y-%m-%d")
+            if dia != self.dia:
+                self.dia, self.hoy = dia, 0
+            if self.en_curso >= self.config.max_simultaneas:
+                self.rechazadas += 1
+                return "Service invoked too many times in a short time. Try Utilities.sleep(1000) between calls."
+            if self.config.cuota_diaria is not None and self.hoy >= self.config.cuota_diaria:
+                self.rechazadas += 1
+                return "Service invoked too many times for one day."
+            self.en_curso += 1
+            self.hoy += 1
+            return None
+
+    def salir(self):
+        with self._lock:
+            self.en_curso -= 1
+
+# ========== SERVIDOR HTTP ==========
+
+class ManejadorSheets(BaseHTTPRequestHandler):
+    # Se asignan en crear_servidor
+    backend = None
+    config = None
+    cuotas = None
+    redirecciones = None  # token -> cuerpo pendiente de recoger tras el 302
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea por petición
+
+    def _parametros(self):
+        return {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+    def _cuerpo(self):
+        longitud = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(longitud)) if longitud else {}
+
+    def _responder(self, datos, estado=200):
+        cuerpo = json.dumps(datos).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _atender(self, operacion):
+        """Cuotas, fallos inyectados y latencia alrededor de una operación del script"""
+        if urlparse(self.path).path == RUTA_REDIRECCION:
+            # Segunda petición tras el 302: sirve la respuesta guardada (no cuenta como ejecución)
+            cuerpo = self.redirecciones.pop(self._parametros().get("user_content_key"), None)
+            if cuerpo is None:
+                self._responder({"error": "Respuesta caducada"}, 404)
+            else:
+                self._responder(cuerpo)
+            return
+
+        rechazo = self.cuotas.entrar()
+        if rechazo:
+            self._responder({"error": rechazo}, 429)
+            return
+        try:
+            espera, fallo = self.config.sortear()
+            if espera:
+                time.sleep(espera)
+            if fallo == "corte":
+                self.close_connection = True
+                self.connection.close()
+                return
+            if fallo == "fallo":
+                self._responder({"error": "Fallo inyectado por el emulador"}, 500)
+                return
+            try:
+                datos = operacion(self._parametros())
+            except Exception as e:
+                # Apps Script responde 200 con {error} también cuando falla
+                datos = {"error": str(e)}
+        finally:
+            self.cuotas.salir()
+
+        if self.config.redireccion:
+            token = uuid.uuid4().hex
+            self.redirecciones[token] = datos
+            self.send_response(302)
+            self.send_header("Location", f"{RUTA_REDIRECCION}?user_content_key={token}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._responder(datos)
+
+    def do_GET(self):
+        self._atender(self._get)
+
+    def do_POST(self):
+        self._atender(self._post)
+
+    def do_PUT(self):
+        self._atender(self._put)
+
+    def do_DELETE(self):
+        self._atender(self._delete)
+
+    def _get(self, p):
+        path = p.get("path", "")
+        if path == "tareas" and p.get("limit"):
+            pagina = self.backend.pagina(SHEET_TAREAS, p.get("cursor"), p["limit"])
+            return {"tareas": pagina["items"], "siguiente_cursor": pagina["siguiente_cursor"]}
+        elif path == "tareas":
+            return {"tareas": self.backend.listar(SHEET_TAREAS)}
+        elif path == "proyectos" and p.get("limit"):
+            pagina = self.backend.pagina(SHEET_PROYECTOS, p.get("cursor"), p["limit"])
+            return {"proyectos": pagina["items"], "siguiente_cursor": pagina["siguiente_cursor"]}
+        elif path == "proyectos":
+            return {"proyectos": self.backend.listar(SHEET_PROYECTOS)}
+        elif path == "archivo":
+            pagina = self.backend.pagina(SHEET_ARCHIVO, p.get("cursor"), p.get("limit"))
+            return {"tareas": pagina["items"], "siguiente_cursor": pagina["siguiente_cursor"]}
+        elif path == "salud":
+            return {"estado": "ok"}
+        return {"nombre": "Backend Google Sheets (emulador)", "version": "1.1"}
+
+    def _post(self, p):
+        path = p.get("path", "")
+        datos = self._cuerpo()
+        if path == "tareas":
+            return self.backend.crear(SHEET_TAREAS, datos)
+        elif path == "proyectos":
+            return self.backend.crear(SHEET_PROYECTOS, datos)
+        elif path == "archivar":
+            return self.backend.archivar_tareas(datos.get("ids"))
+        return None
+
+    def _put(self, p):
+        path = p.get("path", "")
+        datos = self._cuerpo()
+        if path == "tareas":
+            return self.backend.actualizar(SHEET_TAREAS, p.get("id"), datos)
+        elif path == "proyectos":
+            return self.backend.actualizar(SHEET_PROYECTOS, p.get("id"), datos)
+        return None
+
+    def _delete(self, p):
+        path = p.get("path", "")
+        if path == "tareas":
+            return {"ok": self.backend.eliminar(SHEET_TAREAS, p.get("id"))}
+        elif path == "proyectos":
+            return {"ok": self.backend.eliminar_proyecto(p.get("id"))}
+        return None
+
+def crear_servidor(backend=None, config=None, host="127.0.0.1", puerto=0):
+    """Servidor en un hilo daemon. Devuelve (servidor, url); puerto=0 elige uno libre"""
+    config = config or ConfigEmulador()
+    manejador = type("Manejador", (ManejadorSheets,), {
+        "backend": backend or BackendSheets(),
+        "config": config,
+        "cuotas": Cuotas(config),
+        "redirecciones": {},
+    })
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    servidor.manejador = manejador  # Acceso a cuotas y backend desde las pruebas
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_port}/"
+
+def cargar_desde_json(backend, directorio):
+    """Precarga las hojas con proyectos.json y tareas.json de la app"""
+    for archivo, hoja in (("proyectos.json", SHEET_PROYECTOS), ("tareas.json", SHEET_TAREAS)):
+        ruta = os.path.join(directorio, archivo)
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                backend.cargar(hoja, json.load(f))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Emulador local del backend de Google Sheets")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--datos", help="Directorio con proyectos.json/tareas.json para precargar las hojas")
+    parser.add_argument("--latencia-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--tasa-lentas", type=float, default=0.0, help="Fracción de peticiones muy lentas")
+    parser.add_argument("--latencia-lenta-ms", type=float, default=3000)
+    parser.add_argument("--tasa-fallos", type=float, default=0.0, help="Fracción que responde 500")
+    parser.add_argument("--tasa-cortes", type=float, default=0.0, help="Fracción que corta la conexión")
+    parser.add_argument("--max-simultaneas", type=int, default=MAX_EJECUCIONES_SIMULTANEAS)
+    parser.add_argument("--cuota-diaria", type=int, help="Peticiones por día (por defecto sin límite)")
+    parser.add_argument("--redireccion", action="store_true", help="Responder con 302 como el despliegue real")
+    parser.add_argument("--semilla", type=int)
+    args = parser.parse_args()
+
+    backend = BackendSheets()
+    if args.datos:
+        cargar_desde_json(backend, args.datos)
+    config = ConfigEmulador(
+        latencia_ms=args.latencia_ms, jitter_ms=args.jitter_ms,
+        tasa_lentas=args.tasa_lentas, latencia_lenta_ms=args.latencia_lenta_ms,
+        tasa_fallos=args.tasa_fallos, tasa_cortes=args.tasa_cortes,
+        max_simultaneas=args.max_simultaneas, cuota_diaria=args.cuota_diaria,
+        redireccion=args.redireccion, semilla=args.semilla,
+    )
+    servidor, url = crear_servidor(backend, config, host=args.host, puerto=args.puerto)
+    print(f"📡 Emulador de Sheets en {url} (Ctrl+C para salir)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
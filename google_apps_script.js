@@ -5,8 +5,9 @@
  * 1. Crear nueva Google Sheet vacía
  * 2. Copiar este código en Apps Script (Extensiones > Apps Script)
  * 3. Crear los siguientes apartados:
- *    - Hoja "TAREAS" con columnas: id, titulo, descripcion, fecha_creacion, proyecto_id, completada, fecha_programada, notificacion_enviada, prioridad
+ *    - Hoja "TAREAS" con columnas: id, titulo, descripcion, fecha_creacion, proyecto_id, completada, fecha_programada, notificacion_enviada, prioridad, fecha_completada
  *    - Hoja "PROYECTOS" con columnas: id, nombre, descripcion, color, fecha_creacion
+ *    - Hoja "ARCHIVO" (opcional, se crea sola): mismas columnas que TAREAS
  * 4. Ejecutar function doGet() una vez
  * 5. Deploy > New deployment > Web app
  *    - Execute as: Tu usuario
@@ -18,7 +19,12 @@
 // Configuración
 const SHEET_TAREAS = "TAREAS";
 const SHEET_PROYECTOS = "PROYECTOS";
+const SHEET_ARCHIVO = "ARCHIVO";
 const SPREADSHEET_ID = SpreadsheetApp.getActiveSpreadsheet().getId();
+const LIMITE_PAGINA_MAX = 500;
+const CACHE_TTL = 21600;       // Segundos (6 horas, máximo de CacheService)
+const CACHE_FRAGMENTO = 30000; // Caracteres por valor: CacheService admite 100KB por clave (UTF-8)
+const CACHE_MAX_FRAGMENTOS = 200;
 
 // ========== UTILIDADES ==========
 
@@ -46,6 +52,140 @@ function objectToRow(obj, headers) {
   return headers.map(h => obj[h] || "");
 }
 
+/**
+ * Lee solo una página de filas de la hoja, sin cargar toda la tabla.
+ * El cursor es "<versión>:<fila>:<id>": la versión de la caché y el id de
+ * la última fila entregada. Si la hoja cambió desde la página anterior
+ * (otra versión) o esa fila ya no tiene ese id (se borraron o movieron
+ * filas), devuelve { vencido: true } y el cliente empieza de nuevo, en
+ * lugar de seguir desde una fila corrida y saltarse tareas.
+ * Devuelve { items: [...], siguiente_cursor: "versión:fila:id" | null }
+ */
+function getPagina(sheetName, version, cursor, limit) {
+  const sheet = getOrCreateSheet(sheetName);
+  const lastRow = sheet.getLastRow();
+  const lastCol = sheet.getLastColumn();
+  
+  let inicio = 2;
+  if (cursor) {
+    const partes = String(cursor).split(":");
+    const fila = parseInt(partes[1], 10);
+    if (partes.length < 3 || partes[0] !== version || !(fila >= 2) || fila > lastRow) return { vencido: true };
+    // El id puede contener ":"; se compara con la fila como texto (una sola celda)
+    const ultimoId = partes.slice(2).join(":");
+    if (String(sheet.getRange(fila, 1).getValue()) !== ultimoId) return { vencido: true };
+    inicio = fila + 1;
+  }
+  
+  if (lastRow < 2) return { items: [], siguiente_cursor: null };
+  
+  const limite = Math.min(Math.max(parseInt(limit, 10) || LIMITE_PAGINA_MAX, 1), LIMITE_PAGINA_MAX);
+  const filas = Math.min(limite, lastRow - inicio + 1);
+  
+  if (filas <= 0) return { items: [], siguiente_cursor: null };
+  
+  const headers = sheet.getRange(1, 1, 1, lastCol).getValues()[0];
+  const data = sheet.getRange(inicio, 1, filas, lastCol).getValues();
+  const items = [];
+  
+  for (let i = 0; i < data.length; i++) {
+    const obj = rowToObject(data[i], headers);
+    if (obj.id) items.push(obj);
+  }
+  
+  const ultima = inicio + filas - 1;
+  const siguiente = ultima < lastRow ? [version, ultima, String(data[data.length - 1][0])].join(":") : null;
+  return { items: items, siguiente_cursor: siguiente };
+}
+
+function respuestaPagina(clave, pagina) {
+  if (pagina.vencido) return { error: "cursor_vencido" };
+  const respuesta = { siguiente_cursor: pagina.siguiente_cursor };
+  respuesta[clave] = pagina.items;
+  return respuesta;
+}
+
+// ========== CACHÉ DE RESPUESTAS ==========
+
+/**
+ * Las respuestas de doGet se guardan ya serializadas en CacheService,
+ * partidas en fragmentos para respetar el límite de tamaño por valor.
+ * Cada recurso ("tareas", "proyectos") tiene una versión guardada en
+ * ScriptProperties; al escribir se cambia la versión y las entradas
+ * viejas dejan de usarse (expiran solas).
+ */
+function versionCache(recurso) {
+  return PropertiesService.getScriptProperties().getProperty("cache_v_" + recurso) || "0";
+}
+
+function invalidarCache(recurso) {
+  // UUID en vez de contador: dos escrituras concurrentes nunca dejan la misma versión
+  PropertiesService.getScriptProperties().setProperty("cache_v_" + recurso, Utilities.getUuid());
+}
+
+function leerCache(clave) {
+  const cache = CacheService.getScriptCache();
+  const total = cache.get(clave + ":n");
+  if (total === null) return null;
+  
+  const claves = [];
+  for (let i = 0; i < parseInt(total, 10); i++) {
+    claves.push(clave + ":" + i);
+  }
+  
+  const fragmentos = cache.getAll(claves);
+  let texto = "";
+  for (let k of claves) {
+    // Si algún fragmento expiró, la entrada completa no sirve
+    if (fragmentos[k] === undefined || fragmentos[k] === null) return null;
+    texto += fragmentos[k];
+  }
+  return texto;
+}
+
+function escribirCache(clave, texto) {
+  const valores = {};
+  let n = 0;
+  let i = 0;
+  
+  while (i < texto.length) {
+    let fin = Math.min(i + CACHE_FRAGMENTO, texto.length);
+    // No cortar un par sustituto (emojis) entre dos fragmentos
+    const codigo = texto.charCodeAt(fin - 1);
+    if (fin < texto.length && codigo >= 0xD800 && codigo <= 0xDBFF) fin--;
+    valores[clave + ":" + n] = texto.substring(i, fin);
+    i = fin;
+    n++;
+  }
+  
+  if (n > CACHE_MAX_FRAGMENTOS) {
+    log("Respuesta demasiado grande para caché: " + clave);
+    return;
+  }
+  
+  valores[clave + ":n"] = String(n);
+  try {
+    CacheService.getScriptCache().putAll(valores, CACHE_TTL);
+  } catch (error) {
+    log("No se pudo guardar en caché: " + error);
+  }
+}
+
+function respuestaCacheada(recurso, variante, construir) {
+  const version = versionCache(recurso);
+  const clave = recurso + ":" + version + ":" + variante;
+  let texto = leerCache(clave);
+  
+  if (texto === null) {
+    texto = JSON.stringify(construir(version));
+    escribirCache(clave, texto);
+  }
+  
+  return ContentService
+    .createTextOutput(texto)
+    .setMimeType(ContentService.MimeType.JSON);
+}
+
 // ========== TAREAS CRUD ==========
 
 function getTareas() {
@@ -71,7 +211,7 @@ function crearTarea(tarea) {
   
   // Si la hoja está vacía, crear headers
   if (data.length === 0) {
-    const headers = ["id", "titulo", "descripcion", "fecha_creacion", "proyecto_id", "completada", "fecha_programada", "notificacion_enviada", "prioridad"];
+    const headers = ["id", "titulo", "descripcion", "fecha_creacion", "proyecto_id", "completada", "fecha_programada", "notificacion_enviada", "prioridad", "fecha_completada"];
     sheet.appendRow(headers);
   }
   
@@ -81,6 +221,7 @@ function crearTarea(tarea) {
   // Agregar fila
   const row = objectToRow(tarea, headers);
   sheet.appendRow(row);
+  invalidarCache("tareas");
   
   log("Tarea creada: " + tarea.titulo);
   return tarea;
@@ -99,6 +240,7 @@ function actualizarTarea(tarea_id, tarea) {
     if (data[i][0] == tarea_id) {
       const row = objectToRow(tarea, headers);
       sheet.getRange(i + 1, 1, 1, headers.length).setValues([row]);
+      invalidarCache("tareas");
       
       log("Tarea actualizada: " + tarea.titulo);
       return tarea;
@@ -118,6 +260,7 @@ function eliminarTarea(tarea_id) {
   for (let i = 1; i < data.length; i++) {
     if (data[i][0] == tarea_id) {
       sheet.deleteRow(i + 1);
+      invalidarCache("tareas");
       log("Tarea eliminada: " + tarea_id);
       return true;
     }
@@ -126,6 +269,60 @@ function eliminarTarea(tarea_id) {
   return false;
 }
 
+/**
+ * Mueve las tareas indicadas de TAREAS a ARCHIVO.
+ * Los IDs que ya estén en ARCHIVO solo se borran de TAREAS (sin duplicar).
+ */
+function archivarTareas(ids) {
+  const pendientes = {};
+  for (let id of ids || []) pendientes[String(id)] = true;
+  
+  const sheet = getOrCreateSheet(SHEET_TAREAS);
+  const data = sheet.getDataRange().getValues();
+  
+  if (data.length < 2) return { archivadas: 0 };
+  
+  const headers = data[0];
+  const archivo = getOrCreateSheet(SHEET_ARCHIVO);
+  if (archivo.getLastRow() === 0) {
+    archivo.appendRow(headers);
+  }
+  
+  // Solo se lee la columna de IDs del archivo
+  const yaArchivadas = {};
+  if (archivo.getLastRow() > 1) {
+    const ids_archivo = archivo.getRange(2, 1, archivo.getLastRow() - 1, 1).getValues();
+    for (let fila of ids_archivo) yaArchivadas[String(fila[0])] = true;
+  }
+  
+  const nuevas = [];
+  const filasBorrar = [];
+  for (let i = 1; i < data.length; i++) {
+    const id = String(data[i][0]);
+    if (pendientes[id]) {
+      if (!yaArchivadas[id]) nuevas.push(data[i]);
+      filasBorrar.push(i + 1);
+    }
+  }
+  
+  if (nuevas.length > 0) {
+    archivo.getRange(archivo.getLastRow() + 1, 1, nuevas.length, headers.length).setValues(nuevas);
+  }
+  
+  // Borrar de abajo hacia arriba para no desplazar las filas pendientes
+  for (let j = filasBorrar.length - 1; j >= 0; j--) {
+    sheet.deleteRow(filasBorrar[j]);
+  }
+  
+  if (filasBorrar.length > 0) {
+    invalidarCache("tareas");
+    invalidarCache("archivo");
+  }
+  
+  log("Tareas archivadas: " + filasBorrar.length);
+  return { archivadas: filasBorrar.length };
+}
+
 // ========== PROYECTOS CRUD ==========
 
 function getProyectos() {
@@ -161,6 +358,7 @@ function crearProyecto(proyecto) {
   // Agregar fila
   const row = objectToRow(proyecto, headers);
   sheet.appendRow(row);
+  invalidarCache("proyectos");
   
   log("Proyecto creado: " + proyecto.nombre);
   return proyecto;
@@ -179,6 +377,7 @@ function actualizarProyecto(proyecto_id, proyecto) {
     if (data[i][0] == proyecto_id) {
       const row = objectToRow(proyecto, headers);
       sheet.getRange(i + 1, 1, 1, headers.length).setValues([row]);
+      invalidarCache("proyectos");
       
       log("Proyecto actualizado: " + proyecto.nombre);
       return proyecto;
@@ -198,6 +397,7 @@ function eliminarProyecto(proyecto_id) {
   for (let i = 1; i < data.length; i++) {
     if (data[i][0] == proyecto_id) {
       sheet.deleteRow(i + 1);
+      invalidarCache("proyectos");
       log("Proyecto eliminado: " + proyecto_id);
       
       // También eliminar tareas del proyecto
@@ -224,14 +424,28 @@ function doGet(e) {
   const path = e.parameter.path || "";
   
   try {
-    if (path === "tareas") {
-      return ContentService
-        .createTextOutput(JSON.stringify({ tareas: getTareas() }))
-        .setMimeType(ContentService.MimeType.JSON);
+    if (path === "tareas" && e.parameter.limit) {
+      // Lectura paginada: ?path=tareas&cursor=...&limit=...
+      return respuestaCacheada("tareas", "c" + (e.parameter.cursor || "") + ":l" + e.parameter.limit, function(version) {
+        return respuestaPagina("tareas", getPagina(SHEET_TAREAS, version, e.parameter.cursor, e.parameter.limit));
+      });
+    } else if (path === "tareas") {
+      return respuestaCacheada("tareas", "todo", function() {
+        return { tareas: getTareas() };
+      });
+    } else if (path === "proyectos" && e.parameter.limit) {
+      return respuestaCacheada("proyectos", "c" + (e.parameter.cursor || "") + ":l" + e.parameter.limit, function(version) {
+        return respuestaPagina("proyectos", getPagina(SHEET_PROYECTOS, version, e.parameter.cursor, e.parameter.limit));
+      });
     } else if (path === "proyectos") {
-      return ContentService
-        .createTextOutput(JSON.stringify({ proyectos: getProyectos() }))
-        .setMimeType(ContentService.MimeType.JSON);
+      return respuestaCacheada("proyectos", "todo", function() {
+        return { proyectos: getProyectos() };
+      });
+    } else if (path === "archivo") {
+      // Tareas archivadas, solo para historial/búsqueda: ?path=archivo&cursor=...&limit=...
+      return respuestaCacheada("archivo", "c" + (e.parameter.cursor || "") + ":l" + (e.parameter.limit || ""), function(version) {
+        return respuestaPagina("tareas", getPagina(SHEET_ARCHIVO, version, e.parameter.cursor, e.parameter.limit));
+      });
     } else if (path === "salud") {
       return ContentService
         .createTextOutput(JSON.stringify({ estado: "ok" }))
@@ -240,10 +454,12 @@ function doGet(e) {
       return ContentService
         .createTextOutput(JSON.stringify({
           nombre: "Backend Google Sheets",
-          version: "1.0",
+          version: "1.1",
           endpoints: {
             "GET?path=tareas": "Lista de tareas",
+            "GET?path=tareas&cursor=&limit=": "Página de tareas (devuelve siguiente_cursor; error cursor_vencido si la hoja cambió)",
             "GET?path=proyectos": "Lista de proyectos",
+            "GET?path=archivo&cursor=&limit=": "Página de tareas archivadas",
             "GET?path=salud": "Health check"
           }
         }))
@@ -273,6 +489,10 @@ function doPost(e) {
       return ContentService
         .createTextOutput(JSON.stringify(crearProyecto(data)))
         .setMimeType(ContentService.MimeType.JSON);
+    } else if (path === "archivar") {
+      return ContentService
+        .createTextOutput(JSON.stringify(archivarTareas(data.ids)))
+        .setMimeType(ContentService.MimeType.JSON);
     }
   } catch (error) {
     return ContentService
@@ -0,0 +1,297 @@
+"""
+Importación y exportación de tareas en bloque (CSV y NDJSON), en streaming.
+
+    python intercambio.py exportar tareas.csv --datos ~/agenda
+    python intercambio.py importar backlog.ndjson --proyecto 3
+
+Exportar escribe fila a fila a un archivo temporal que luego reemplaza al
+destino: no se arma la lista de dicts de todas las tareas. Con
+--archivadas se agregan las del archivo NDJSON, leídas línea a línea.
+
+Importar lee por bloques de BLOQUE_INTERCAMBIO registros, valida cada uno
+y da de alta el bloque con GestorDatos.agregar_tareas, todo dentro de una
+transacción: los archivos quedan bloqueados hasta el final, tareas.json
+se escribe una sola vez y, si algo falla (o con --estricto, ante el
+primer registro inválido), se deshacen las altas. Los ids de origen se
+renumeran; el informe trae la correspondencia origen -> nuevo.
+
+Columnas (CSV) o claves (NDJSON): las de Tarea más "proyecto" (nombre) y
+"archivada". Al importar, el proyecto se busca por nombre (y se crea si no
+existe) o, sin nombre, por proyecto_id; --proyecto manda todo a uno.
+"""
+
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from main2 import GestorDatos, RANGO_PRIORIDAD
+
+BLOQUE_INTERCAMBIO = 1000  # Registros validados e insertados de una vez
+MAX_ERRORES_INFORME = 50  # Registros rechazados descritos en el informe (el resto solo se cuenta)
+COLOR_PROYECTO_IMPORTADO = "Azul"
+FORMATO_FECHA = "%Y-%m-%d %H:%M"
+COLUMNAS = ("id", "titulo", "descripcion", "proyecto_id", "proyecto", "completada", "prioridad",
+            "fecha_programada", "fecha_creacion", "fecha_completada", "notificacion_enviada", "archivada")
+FORMATOS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+def formato_de(ruta):
+    formato = FORMATOS.get(Path(ruta).suffix.lower())
+    if formato is None:
+        raise ValueError(f"Formato desconocido para {ruta} (usa .csv, .ndjson o .jsonl)")
+    return formato
+
+# ========== EXPORTAR ==========
+
+def exportar(gestor, ruta, formato=None, proyecto_id=None, archivadas=False, progreso=None):
+    """Escribe las tareas (de un proyecto o todas) en CSV o NDJSON. Devuelve cuántas se escribieron.
+
+    progreso(escritas, fraccion) se llama cada BLOQUE_INTERCAMBIO filas.
+    """
+    formato = formato or formato_de(ruta)
+    gestor.tareas_cargadas.wait()
+    nombres = {p.id: p.nombre for p in gestor.proyectos}
+    # Solo referencias: cada tarea se convierte a dict al escribir su fila
+    tareas = list(gestor.query({"proyecto_id": proyecto_id} if proyecto_id is not None else None))
+    total = len(tareas)
+    if archivadas:
+        total += sum(1 for pid in gestor.ids_archivadas.values() if proyecto_id is None or pid == proyecto_id)
+
+    def filas():
+        for tarea in tareas:
+            yield tarea.to_dict()
+        if archivadas and gestor.archivo_historial.exists():
+            # Línea a línea: cargar_historial() tendría el archivo entero en memoria
+            with open(gestor.archivo_historial, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    if linea.strip():
+                        datos = json.loads(linea)
+                        if proyecto_id is None or datos.get("proyecto_id") == proyecto_id:
+                            datos["archivada"] = True
+                            yield datos
+
+    temporal = Path(f"{ruta}.tmp")
+    escritas = 0
+    with open(temporal, 'w', encoding='utf-8', newline='') as f:
+        if formato == "csv":
+            escritor = csv.DictWriter(f, fieldnames=COLUMNAS, extrasaction="ignore")
+            escritor.writeheader()
+        for datos in filas():
+            datos["proyecto"] = nombres.get(datos.get("proyecto_id"), "")
+            datos.setdefault("archivada", False)
+            if formato == "csv":
+                escritor.writerow({k: _celda(v) for k, v in datos.items()})
+            else:
+                f.write(json.dumps(datos, ensure_ascii=False) + "\n")
+            escritas += 1
+            if progreso and escritas % BLOQUE_INTERCAMBIO == 0:
+                progreso(escritas, escritas / max(total, 1))
+    os.replace(temporal, ruta)
+    if progreso:
+        progreso(escritas, 1.0)
+    return escritas
+
+def _celda(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    return valor
+
+# ========== IMPORTAR ==========
+
+def importar(gestor, ruta, formato=None, proyecto_id=None, estricto=False,
+             tamano_bloque=BLOQUE_INTERCAMBIO, progreso=None):
+    """Da de alta las tareas de un CSV o NDJSON en una sola transacción. Devuelve un informe:
+
+    {"leidas", "importadas", "rechazadas", "errores": [(registro, mensaje)],
+     "proyectos_creados": [id], "ids": {id_origen: id_nuevo}}
+
+    proyecto_id: si se indica, todas las tareas van a ese proyecto.
+    estricto: el primer registro inválido deshace todo (ValueError) en lugar de saltarlo.
+    progreso(leidas, fraccion) se llama tras cada bloque.
+    """
+    formato = formato or formato_de(ruta)
+    if proyecto_id is not None and gestor.obtener_proyecto(proyecto_id) is None:
+        raise ValueError(f"No existe el proyecto {proyecto_id}")
+    informe = {"leidas": 0, "importadas": 0, "rechazadas": 0, "errores": [],
+               "proyectos_creados": [], "ids": {}}
+    creadas = []
+    tamano = max(os.path.getsize(ruta), 1)
+    gestor.tareas_cargadas.wait()
+
+    with gestor.transaccion():
+        por_nombre = {}
+        for p in gestor.proyectos:
+            por_nombre.setdefault(p.nombre.strip().lower(), p.id)
+        existentes = {p.id for p in gestor.proyectos}
+
+        def proyecto_de(registro):
+            if proyecto_id is not None:
+                return proyecto_id
+            nombre = _texto(registro.get("proyecto"), "proyecto").strip()
+            if nombre:
+                if nombre.lower() not in por_nombre:
+                    nuevo = gestor.agregar_proyecto(nombre, "", COLOR_PROYECTO_IMPORTADO)
+                    por_nombre[nombre.lower()] = nuevo.id
+                    informe["proyectos_creados"].append(nuevo.id)
+                return por_nombre[nombre.lower()]
+            pid = _entero(registro.get("proyecto_id"), "proyecto_id")
+            if pid not in existentes:
+                raise ValueError(f"no existe el proyecto {pid} (indica 'proyecto' por nombre o usa --proyecto)")
+            return pid
+
+        try:
+            with open(ruta, 'r', encoding='utf-8-sig', newline='') as f:
+                registros = csv.DictReader(f) if formato == "csv" else (l for l in f if l.strip())
+                bloque = []  # (id de origen, campos)
+
+                def volcar():
+                    nuevas = gestor.agregar_tareas([campos for _, campos in bloque])
+                    creadas.extend(t.id for t in nuevas)
+                    for (origen, _), tarea in zip(bloque, nuevas):
+                        if origen is not None:
+                            informe["ids"][origen] = tarea.id
+                    informe["importadas"] += len(nuevas)
+                    bloque.clear()
+                    if progreso:
+                        progreso(informe["leidas"], f.buffer.tell() / tamano)
+
+                for registro in registros:
+                    informe["leidas"] += 1
+                    try:
+                        if isinstance(registro, str):
+                            registro = json.loads(registro)
+                        if not isinstance(registro, dict):
+                            raise ValueError("se esperaba un objeto JSON")
+                        origen, campos = _validar(registro)
+                        if origen is not None and origen in informe["ids"]:
+                            raise ValueError(f"id {origen} repetido en el archivo")
+                        campos["proyecto_id"] = proyecto_de(registro)
+                    except ValueError as e:
+                        if estricto:
+                            raise ValueError(f"Registro {informe['leidas']}: {e}") from None
+                        informe["rechazadas"] += 1
+                        if len(informe["errores"]) < MAX_ERRORES_INFORME:
+                            informe["errores"].append((informe["leidas"], str(e)))
+                        continue
+                    if origen is not None:
+                        informe["ids"][origen] = None  # Reservado hasta volcar el bloque
+                    bloque.append((origen, campos))
+                    if len(bloque) >= tamano_bloque:
+                        volcar()
+                if bloque:
+                    volcar()
+        except BaseException:
+            # También Ctrl+C: nada llegó al disco, basta con quitar de memoria lo agregado
+            gestor.eliminar_tareas(creadas)
+            for pid in informe["proyectos_creados"]:
+                gestor.eliminar_proyecto(pid)
+            raise
+    return informe
+
+def _validar(registro):
+    """(id de origen, argumentos de Tarea sin id ni proyecto_id); ValueError si el registro no sirve"""
+    titulo = _texto(registro.get("titulo"), "titulo").strip()
+    if not titulo:
+        raise ValueError("falta 'titulo'")
+    prioridad = _texto(registro.get("prioridad"), "prioridad").strip().capitalize() or "Media"
+    if prioridad not in RANGO_PRIORIDAD:
+        raise ValueError(f"'prioridad' debe ser una de: {', '.join(RANGO_PRIORIDAD)}")
+    completada = _booleano(registro.get("completada"), "completada")
+    ahora = datetime.now().strftime(FORMATO_FECHA)
+    fecha_completada = _fecha(registro.get("fecha_completada"), "fecha_completada")
+    origen = registro.get("id")
+    return (
+        None if origen in (None, "") else _entero(origen, "id"),
+        {
+            "titulo": titulo,
+            "descripcion": _texto(registro.get("descripcion"), "descripcion"),
+            "fecha_creacion": _fecha(registro.get("fecha_creacion"), "fecha_creacion") or ahora,
+            "completada": completada,
+            "fecha_programada": _fecha(registro.get("fecha_programada"), "fecha_programada"),
+            "notificacion_enviada": _booleano(registro.get("notificacion_enviada"), "notificacion_enviada"),
+            "prioridad": prioridad,
+            "fecha_completada": (fecha_completada or ahora) if completada else None,
+        },
+    )
+
+def _texto(valor, campo):
+    if valor is None:
+        return ""
+    if not isinstance(valor, str):
+        raise ValueError(f"'{campo}' debe ser texto")
+    return valor
+
+def _entero(valor, campo):
+    if isinstance(valor, bool):
+        raise ValueError(f"'{campo}' debe ser un número")
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{campo}' debe ser un número") from None
+
+def _booleano(valor, campo):
+    if valor in (None, ""):
+        return False
+    if isinstance(valor, bool):
+        return valor
+    texto = str(valor).strip().lower()
+    if texto in ("1", "true", "sí", "si", "x", "yes"):
+        return True
+    if texto in ("0", "false", "no"):
+        return False
+    raise ValueError(f"'{campo}' debe ser true/false")
+
+def _fecha(valor, campo):
+    """Acepta YYYY-MM-DD HH:MM o solo YYYY-MM-DD (a las 00:00)"""
+    if valor in (None, ""):
+        return None
+    if isinstance(valor, str):
+        valor = valor.strip()
+        for formato, sufijo in ((FORMATO_FECHA, ""), ("%Y-%m-%d", " 00:00")):
+            try:
+                datetime.strptime(valor, formato)
+                return valor + sufijo
+            except ValueError:
+                pass
+    raise ValueError(f"'{campo}' debe tener el formato YYYY-MM-DD HH:MM")
+
+# ========== LÍNEA DE COMANDOS ==========
+
+def mostrar_progreso(cantidad, fraccion):
+    print(f"\r⏳ {cantidad} registros ({fraccion:.0%})", end="", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importar/exportar tareas en CSV o NDJSON")
+    parser.add_argument("accion", choices=["importar", "exportar"])
+    parser.add_argument("archivo", help="Ruta .csv, .ndjson o .jsonl")
+    parser.add_argument("--proyecto", type=int, help="Solo este proyecto (exportar) o destino de todas (importar)")
+    parser.add_argument("--archivadas", action="store_true", help="Exportar también las tareas archivadas")
+    parser.add_argument("--estricto", action="store_true", help="Un registro inválido cancela toda la importación")
+    parser.add_argument("--bloque", type=int, default=BLOQUE_INTERCAMBIO, help="Registros insertados de una vez")
+    parser.add_argument("--datos", help="Directorio con proyectos.json/tareas.json (por defecto el actual)")
+    args = parser.parse_args()
+
+    archivo = os.path.abspath(args.archivo)  # Antes del chdir
+    if args.datos:
+        os.chdir(args.datos)  # GestorDatos usa rutas relativas
+    gestor = GestorDatos()
+    try:
+        if args.accion == "exportar":
+            escritas = exportar(gestor, archivo, proyecto_id=args.proyecto, archivadas=args.archivadas,
+                                progreso=mostrar_progreso)
+            print(f"\n✅ {escritas} tareas exportadas a {archivo}")
+        else:
+            informe = importar(gestor, archivo, proyecto_id=args.proyecto, estricto=args.estricto,
+                               tamano_bloque=args.bloque, progreso=mostrar_progreso)
+            print(f"\n✅ {informe['importadas']} tareas importadas, {informe['rechazadas']} rechazadas"
+                  f", {len(informe['proyectos_creados'])} proyectos nuevos")
+            for registro, mensaje in informe["errores"]:
+                print(f"⚠️ Registro {registro}: {mensaje}")
+            if informe["rechazadas"] > len(informe["errores"]):
+                print(f"⚠️ ... y {informe['rechazadas'] - len(informe['errores'])} más")
+    except (OSError, ValueError) as e:
+        print(f"\n❌ {e}")
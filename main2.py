@@ -4,18 +4,71 @@ Basado en el diseño responsive de main.py
 Mantiene sincronización MANUAL con Google Sheets
 """
 
+import time
+_INICIO_IMPORTS = time.perf_counter()  # Para el informe de arranque
+
 import flet as ft
 from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import threading
-import requests
+import asyncio
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import random
+import re
+import bisect
+import heapq
+import itertools
+import functools
+from contextlib import contextmanager
+import unicodedata
+# httpx y plyer se importan al primer uso (primera petición / primer aviso): no retrasan el arranque
 from dotenv import load_dotenv
 import os
+try:
+    import fcntl  # Locks entre procesos en Linux/macOS
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # ========== CONFIGURACIÓN ==========
 load_dotenv()
 GOOGLE_SHEETS_URL = os.getenv('GOOGLE_SHEETS_URL', '')
+TAMANO_PAGINA_SYNC = 200  # Filas por página al leer de Sheets
+DIAS_ARCHIVO = 30  # Las tareas completadas hace más de N días pasan al archivo
+DIAS_AGENDA = 7  # Días (desde hoy) que muestra la vista de agenda
+TAMANO_VENTANA_TAREAS = 50  # Tarjetas que se construyen por tramo en la lista de tareas
+MAX_RESULTADOS_BUSQUEDA = 100
+MAX_TARJETAS_CACHE = 600  # Tarjetas guardadas para reutilizar entre vistas (LRU; crece si hay más en pantalla)
+INTERVALO_FRAME = 0.016  # Segundos: como mucho un page.update() por frame
+ANCHO_MOVIL = 800  # Punto de quiebre móvil/escritorio (px)
+ESPERA_RESIZE = 0.15  # Segundos sin eventos de resize antes de recalcular el layout
+INTERVALO_VIGILANCIA = 2  # Segundos entre comprobaciones de cambios hechos por otros procesos
+ESPERA_CARGA_TAREAS = 30  # Segundos que una modificación espera a que tareas.json esté cargado
+
+# Intervalos de la sincronización automática (segundos)
+INTERVALO_SYNC_RAPIDO = 5    # Tras una edición local
+INTERVALO_SYNC_BASE = 60     # Tras un ciclo con cambios
+INTERVALO_SYNC_MAX = 900     # Tope del backoff (inactividad o errores)
+
+# Timeouts en segundos según la operación: (lectura, conexión)
+TIMEOUT_SALUD = (3, 2)
+TIMEOUT_LECTURA = (15, 3)
+TIMEOUT_ESCRITURA = (10, 3)
+MAX_PETICIONES_SIMULTANEAS = 4  # Peticiones en vuelo a la vez contra Apps Script
+AVISO_PREVIO_NOTIFICACION = 300  # Segundos de antelación de los recordatorios
+
+# Métricas internas: desactivadas no cuestan nada (AGENDA_METRICAS=1 para activarlas)
+METRICAS_ACTIVAS = os.getenv('AGENDA_METRICAS', '') == '1'
+ARCHIVO_METRICAS = os.getenv('AGENDA_METRICAS_ARCHIVO', 'metricas')  # Genera .json y .prom
+INTERVALO_METRICAS = 15  # Segundos entre exportaciones
+CUBETAS_METRICAS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)  # Segundos (histograma)
+REINTENTOS_SYNC = 2            # Reintentos extra por petición (con jitter)
+ESPERA_BASE_REINTENTO = 0.5    # Segundos; se duplica en cada reintento
+FALLOS_PARA_ABRIR_CIRCUITO = 3
+ESPERA_CIRCUITO = 30           # Segundos con el circuito abierto antes de probar ?path=salud
+ESPERA_CIRCUITO_MAX = 600
 
 # ========== COLORES ==========
 COLORES_PROYECTO = {
@@ -27,11 +80,124 @@ COLORES_PROYECTO = {
     "Rosa": ft.Colors.PINK_400,
 }
 
+COLORES_PRIORIDAD = {
+    "Alta": ft.Colors.RED_400,
+    "Media": ft.Colors.ORANGE_400,
+    "Baja": ft.Colors.GREEN_400,
+}
+
+# ========== MÉTRICAS ==========
+
+class Metricas:
+    """Contadores e histogramas de tiempos en memoria, con etiquetas.
+    
+    Se exportan a JSON y a texto de Prometheus (para node_exporter con
+    textfile collector o para leerlos a mano).
+    """
+    def __init__(self):
+        self.contadores = {}  # (nombre, etiquetas) -> valor
+        self.tiempos = {}  # (nombre, etiquetas) -> [cuenta, suma, máximo, [por cubeta]]
+        self._lock = threading.Lock()
+    
+    def contar(self, nombre, valor=1, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self.contadores[clave] = self.contadores.get(clave, 0) + valor
+    
+    def observar(self, nombre, segundos, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            datos = self.tiempos.get(clave)
+            if datos is None:
+                datos = self.tiempos[clave] = [0, 0.0, 0.0, [0] * len(CUBETAS_METRICAS)]
+            datos[0] += 1
+            datos[1] += segundos
+            datos[2] = max(datos[2], segundos)
+            i = bisect.bisect_left(CUBETAS_METRICAS, segundos)
+            if i < len(CUBETAS_METRICAS):
+                datos[3][i] += 1
+    
+    @contextmanager
+    def cronometro(self, nombre, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+    
+    def instantanea(self):
+        with self._lock:
+            return {
+                "contadores": [{"nombre": n, "etiquetas": dict(e), "valor": v} for (n, e), v in self.contadores.items()],
+                "tiempos": [
+                    {"nombre": n, "etiquetas": dict(e), "cuenta": c, "suma_s": round(suma, 6), "max_s": round(maximo, 6),
+                     "cubetas": dict(zip(map(str, CUBETAS_METRICAS), cubetas))}
+                    for (n, e), (c, suma, maximo, cubetas) in self.tiempos.items()
+                ],
+            }
+    
+    def a_prometheus(self):
+        def etiquetas_texto(etiquetas, extra=()):
+            pares = [f'{k}="{v}"' for k, v in (*etiquetas, *extra)]
+            return "{" + ",".join(pares) + "}" if pares else ""
+        
+        lineas = []
+        tipos = set()
+        with self._lock:
+            for (nombre, etiquetas), valor in sorted(self.contadores.items()):
+                if nombre not in tipos:
+                    tipos.add(nombre)
+                    lineas.append(f"# TYPE agenda_{nombre}_total counter")
+                lineas.append(f"agenda_{nombre}_total{etiquetas_texto(etiquetas)} {valor}")
+            for (nombre, etiquetas), (cuenta, suma, _, cubetas) in sorted(self.tiempos.items()):
+                if nombre not in tipos:
+                    tipos.add(nombre)
+                    lineas.append(f"# TYPE agenda_{nombre}_segundos histogram")
+                acumulado = 0
+                for limite, n in zip(CUBETAS_METRICAS, cubetas):
+                    acumulado += n
+                    lineas.append(f"agenda_{nombre}_segundos_bucket{etiquetas_texto(etiquetas, [('le', limite)])} {acumulado}")
+                lineas.append(f"agenda_{nombre}_segundos_bucket{etiquetas_texto(etiquetas, [('le', '+Inf')])} {cuenta}")
+                lineas.append(f"agenda_{nombre}_segundos_sum{etiquetas_texto(etiquetas)} {suma:.6f}")
+                lineas.append(f"agenda_{nombre}_segundos_count{etiquetas_texto(etiquetas)} {cuenta}")
+        return "\n".join(lineas) + "\n"
+    
+    def exportar(self, base=ARCHIVO_METRICAS):
+        try:
+            with open(f"{base}.json", 'w', encoding='utf-8') as f:
+                json.dump(self.instantanea(), f, indent=2, ensure_ascii=False)
+            # Escribir y renombrar: quien lee el .prom nunca ve un archivo a medias
+            with open(f"{base}.prom.tmp", 'w', encoding='utf-8') as f:
+                f.write(self.a_prometheus())
+            os.replace(f"{base}.prom.tmp", f"{base}.prom")
+        except Exception as e:
+            print(f"⚠️ No se pudieron exportar las métricas: {e}")
+
+# None si están desactivadas: cada punto de medida es un solo `if METRICAS`
+METRICAS = Metricas() if METRICAS_ACTIVAS else None
+
+def cronometrado(nombre):
+    """Decorador que mide la función; sin métricas devuelve la función original"""
+    def decorar(funcion):
+        if METRICAS is None:
+            return funcion
+        
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                METRICAS.observar(nombre, time.perf_counter() - inicio)
+        return medida
+    return decorar
+
 # ========== MODELOS ==========
 
 class Tarea:
     def __init__(self, id, titulo, descripcion, fecha_creacion, proyecto_id, 
-                 completada=False, fecha_programada=None, notificacion_enviada=False, prioridad="Media"):
+                 completada=False, fecha_programada=None, notificacion_enviada=False, prioridad="Media",
+                 fecha_completada=None):
         self.id = id
         self.titulo = titulo
         self.descripcion = descripcion
@@ -41,6 +207,7 @@ class Tarea:
         self.fecha_programada = fecha_programada
         self.notificacion_enviada = notificacion_enviada
         self.prioridad = prioridad
+        self.fecha_completada = fecha_completada
     
     def to_dict(self):
         return {
@@ -52,7 +219,8 @@ class Tarea:
             'completada': self.completada,
             'fecha_programada': self.fecha_programada,
             'notificacion_enviada': self.notificacion_enviada,
-            'prioridad': self.prioridad
+            'prioridad': self.prioridad,
+            'fecha_completada': self.fecha_completada
         }
     
     @staticmethod
@@ -67,7 +235,8 @@ class Tarea:
                 data.get('completada', False),
                 data.get('fecha_programada'),
                 data.get('notificacion_enviada', False),
-                data.get('prioridad', 'Media')
+                data.get('prioridad', 'Media'),
+                data.get('fecha_completada') or None  # Sheets devuelve "" si la celda está vacía
             )
         except (ValueError, TypeError, KeyError) as e:
             # Si hay error de conversión, asignar IDs por defecto y retornar
@@ -106,51 +275,751 @@ class Proyecto:
             print(f"⚠️ Advertencia al convertir Proyecto: {e}. Usando valores por defecto.")
             return None  # Mejor ignorar registros corruptos
 
+# ========== BÚSQUEDA ==========
+
+PALABRAS_VACIAS = {
+    "a", "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los",
+    "o", "para", "por", "que", "se", "su", "un", "una", "y",
+}
+_RE_PALABRA = re.compile(r"\w+")
+
+_SIN_TILDES = str.maketrans("áéíóúüàèìòùâêîôûäëïöñç", "aeiouuaeiouaeiouaeionc")
+
+def normalizar_texto(texto):
+    """Minúsculas y sin tildes: 'Revisión' -> 'revision' (la ñ queda como n)"""
+    texto = (texto or "").lower().translate(_SIN_TILDES)
+    if texto.isascii():
+        return texto
+    # Caso raro (otras marcas diacríticas): descomponer y quitar los acentos
+    descompuesto = unicodedata.normalize("NFD", texto)
+    return "".join(c for c in descompuesto if unicodedata.category(c) != "Mn")
+
+_palabras_normalizadas = {}
+
+def tokenizar(texto):
+    palabras = []
+    for palabra in _RE_PALABRA.findall((texto or "").lower()):
+        if not palabra.isascii():
+            # El vocabulario se repite mucho: se normaliza cada palabra una sola vez
+            normalizada = _palabras_normalizadas.get(palabra)
+            if normalizada is None:
+                normalizada = normalizar_texto(palabra)
+                if len(_palabras_normalizadas) < 100000:
+                    _palabras_normalizadas[palabra] = normalizada
+            palabra = normalizada
+        if palabra not in PALABRAS_VACIAS:
+            palabras.append(palabra)
+    return palabras
+
+class IndiceBusqueda:
+    """Índice invertido de palabras de titulo/descripcion -> IDs de tarea.
+    
+    Se mantiene incrementalmente. Las búsquedas son por prefijo sobre un
+    vocabulario ordenado (bisect), así 'revi' encuentra 'revisión'.
+    """
+    def __init__(self, tareas=()):
+        self.postings = {}       # término -> set de IDs
+        self.vocabulario = []    # términos ordenados, para buscar por prefijo
+        self.terminos_tarea = {} # id -> términos indexados (para quitar sin el texto viejo)
+        self.tareas = {}         # id -> Tarea
+        # Carga inicial: el vocabulario se ordena una sola vez al final
+        for tarea in tareas:
+            self._agregar(tarea, ordenar=False)
+        self.vocabulario = sorted(self.postings)
+    
+    def agregar(self, tarea):
+        if tarea.id in self.tareas:
+            self.quitar(tarea.id)
+        self._agregar(tarea, ordenar=True)
+    
+    def _agregar(self, tarea, ordenar):
+        terminos = set(tokenizar(f"{tarea.titulo} {tarea.descripcion or ''}"))
+        self.tareas[tarea.id] = tarea
+        self.terminos_tarea[tarea.id] = terminos
+        for termino in terminos:
+            ids = self.postings.get(termino)
+            if ids is None:
+                ids = self.postings[termino] = set()
+                if ordenar:
+                    bisect.insort(self.vocabulario, termino)
+            ids.add(tarea.id)
+    
+    def quitar(self, id):
+        self.tareas.pop(id, None)
+        for termino in self.terminos_tarea.pop(id, ()):
+            ids = self.postings.get(termino)
+            if ids is None:
+                continue
+            ids.discard(id)
+            if not ids:
+                del self.postings[termino]
+                i = bisect.bisect_left(self.vocabulario, termino)
+                if i < len(self.vocabulario) and self.vocabulario[i] == termino:
+                    del self.vocabulario[i]
+    
+    def _ids_prefijo(self, prefijo):
+        ids = set()
+        i = bisect.bisect_left(self.vocabulario, prefijo)
+        while i < len(self.vocabulario) and self.vocabulario[i].startswith(prefijo):
+            ids |= self.postings[self.vocabulario[i]]
+            i += 1
+        return ids
+    
+    def buscar(self, texto):
+        """Tareas que contienen todas las palabras de `texto`, cada una como prefijo"""
+        palabras = _RE_PALABRA.findall(normalizar_texto(texto))
+        # Las palabras vacías se ignoran salvo la última, que puede ser el inicio de otra ("de" -> "desarrollo")
+        palabras = [p for i, p in enumerate(palabras) if p not in PALABRAS_VACIAS or i == len(palabras) - 1]
+        if not palabras:
+            return []
+        
+        # La palabra más larga suele ser la más selectiva: se resuelve con el índice
+        palabras = sorted(set(palabras), key=len, reverse=True)
+        resultado = self._ids_prefijo(palabras[0])
+        for palabra in palabras[1:]:
+            if not resultado:
+                break
+            if len(resultado) <= 1000:
+                # Pocos candidatos: más barato mirar sus términos que unir postings
+                resultado = {i for i in resultado
+                             if any(t.startswith(palabra) for t in self.terminos_tarea[i])}
+            else:
+                resultado &= self._ids_prefijo(palabra)
+        return [self.tareas[i] for i in resultado]
+
+# ========== ORDEN DE TAREAS ==========
+
+RANGO_PRIORIDAD = {"Alta": 0, "Media": 1, "Baja": 2}
+SIN_FECHA = "9999-99-99"  # Las tareas sin fecha programada van al final
+
+# Todas las claves terminan en -id: son únicas y el orden es estable
+MODOS_ORDEN = {
+    "prioridad": lambda t: (t.completada, RANGO_PRIORIDAD.get(t.prioridad, 1), t.fecha_programada or SIN_FECHA, -t.id),
+    "fecha": lambda t: (t.completada, t.fecha_programada or SIN_FECHA, RANGO_PRIORIDAD.get(t.prioridad, 1), -t.id),
+    "creacion": lambda t: (t.completada, -t.id),
+}
+
+class ListaOrdenada:
+    """Tareas ordenadas por una clave, mantenidas con bisect (sin reordenar todo)"""
+    def __init__(self, clave, tareas=()):
+        self.clave = clave
+        pares = sorted(((clave(t), t) for t in tareas), key=lambda par: par[0])
+        self.claves = [k for k, _ in pares]
+        self.tareas = [t for _, t in pares]
+        self.clave_de = {t.id: k for k, t in pares}  # Para quitarla aunque la tarea ya haya cambiado
+    
+    def __len__(self):
+        return len(self.tareas)
+    
+    def agregar(self, tarea):
+        self.quitar(tarea.id)
+        k = self.clave(tarea)
+        i = bisect.bisect_right(self.claves, k)
+        self.claves.insert(i, k)
+        self.tareas.insert(i, tarea)
+        self.clave_de[tarea.id] = k
+    
+    def quitar(self, id):
+        k = self.clave_de.pop(id, None)
+        if k is None:
+            return
+        i = bisect.bisect_left(self.claves, k)
+        del self.claves[i]
+        del self.tareas[i]
+
+# Índice de fechas: solo tareas pendientes con fecha, por (fecha_programada, id).
+# "YYYY-MM-DD HH:MM" ordena igual como texto que como fecha
+def en_agenda(tarea):
+    return bool(tarea.fecha_programada) and not tarea.completada
+
+def clave_fecha(tarea):
+    return (tarea.fecha_programada, tarea.id)
+
+def leer_fecha(valor):
+    """datetime (local, sin zona) de una fecha guardada; None si falta o no se entiende.
+    Además de "YYYY-MM-DD HH:MM" acepta ISO, que es lo que Sheets puede devolver"""
+    if not valor or not isinstance(valor, str):
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d %H:%M")
+    except ValueError:
+        pass
+    try:
+        fecha = datetime.fromisoformat(valor.strip())
+    except ValueError:
+        return None
+    return fecha.astimezone().replace(tzinfo=None) if fecha.tzinfo else fecha
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+# ========== CONSULTAS ==========
+
+CAMPOS_INDICE = ("proyecto_id", "completada", "prioridad")
+FILTROS_CONSULTA = {"id", "texto", "fecha_desde", "fecha_hasta", "con_fecha", "notificacion_enviada", *CAMPOS_INDICE}
+
+class IndiceCampos:
+    """Tareas agrupadas por (proyecto_id, completada, prioridad), y por id.
+    
+    Los conteos por esos campos suman tamaños de grupos (sin recorrer tareas)
+    y los candidatos de un filtro son solo los grupos que lo cumplen.
+    """
+    def __init__(self, tareas=()):
+        self.grupos = {}    # (proyecto_id, completada, prioridad) -> {id: Tarea}
+        self.clave_de = {}  # id -> clave del grupo donde está
+        for tarea in tareas:
+            self.agregar(tarea)
+    
+    @staticmethod
+    def clave(tarea):
+        return (tarea.proyecto_id, tarea.completada, tarea.prioridad)
+    
+    def agregar(self, tarea):
+        self.quitar(tarea.id)
+        k = self.clave(tarea)
+        self.grupos.setdefault(k, {})[tarea.id] = tarea
+        self.clave_de[tarea.id] = k
+    
+    def quitar(self, id):
+        k = self.clave_de.pop(id, None)
+        if k is None:
+            return
+        grupo = self.grupos[k]
+        del grupo[id]
+        if not grupo:
+            del self.grupos[k]
+    
+    def obtener(self, id):
+        k = self.clave_de.get(id)
+        return None if k is None else self.grupos[k][id]
+    
+    def grupos_de(self, campos):
+        """Grupos cuyas claves cumplen {campo: valor} (campos de CAMPOS_INDICE)"""
+        return [grupo for clave, grupo in self.grupos.items()
+                if all(campos.get(campo, valor) == valor for campo, valor in zip(CAMPOS_INDICE, clave))]
+
+def cumple(tarea, filtros):
+    """Comprobación directa de los filtros que el índice elegido no resolvió ("texto" no: siempre va por índice)"""
+    for campo, valor in filtros.items():
+        if campo == "fecha_desde":
+            if not tarea.fecha_programada or tarea.fecha_programada < valor:
+                return False
+        elif campo == "fecha_hasta":
+            if not tarea.fecha_programada or tarea.fecha_programada >= valor:
+                return False
+        elif campo == "con_fecha":
+            if bool(tarea.fecha_programada) != valor:
+                return False
+        elif getattr(tarea, campo) != valor:
+            return False
+    return True
+
+class Plan:
+    """Índice elegido para unos filtros: candidatos, filtros restantes y, si sale barato, el conteo"""
+    def __init__(self, descripcion, candidatos, resto, ordenado=False, contar=None):
+        self.descripcion = descripcion
+        self.candidatos = candidatos  # funcion() -> secuencia de tareas (copia o lista que no se toca)
+        self.resto = resto            # Filtros que se comprueban tarea a tarea
+        self.ordenado = ordenado      # Los candidatos ya vienen en el orden pedido
+        self.contar = contar if not resto else None  # funcion() -> int sin recorrer candidatos
+    
+    def __repr__(self):
+        resto = f" + filtro({', '.join(self.resto)})" if self.resto else ""
+        return f"{self.descripcion}{resto}"
+
+class Consulta:
+    """Resultado perezoso de GestorDatos.query: se recorre, se cuenta (count) o se
+    comprueba (exists) sin construir listas de más. Sin orden_por, el orden es el del índice usado."""
+    def __init__(self, gestor, filtros, orden_por, limite, desplazamiento):
+        desconocidos = set(filtros) - FILTROS_CONSULTA
+        if desconocidos:
+            raise ValueError(f"Filtros desconocidos: {', '.join(sorted(desconocidos))}")
+        if orden_por is not None and orden_por not in MODOS_ORDEN:
+            raise ValueError(f"orden_por debe ser uno de: {', '.join(MODOS_ORDEN)}")
+        self.gestor = gestor
+        self.filtros = filtros
+        self.orden_por = orden_por
+        self.limite = limite
+        self.desplazamiento = desplazamiento
+        self.plan = gestor._planificar(filtros, orden_por)
+    
+    def _coincidencias(self):
+        candidatos = self.plan.candidatos()
+        if not self.plan.resto:
+            return iter(candidatos)
+        return (t for t in candidatos if cumple(t, self.plan.resto))
+    
+    def __iter__(self):
+        resultados = self._coincidencias()
+        if self.orden_por and not self.plan.ordenado:
+            clave = MODOS_ORDEN[self.orden_por]
+            if self.limite is not None:
+                # Solo hacen falta las primeras desplazamiento+limite: montículo en vez de ordenar todo
+                resultados = iter(heapq.nsmallest(self.desplazamiento + self.limite, resultados, key=clave))
+            else:
+                resultados = iter(sorted(resultados, key=clave))
+        fin = None if self.limite is None else self.desplazamiento + self.limite
+        return itertools.islice(resultados, self.desplazamiento, fin)
+    
+    def count(self):
+        """Coincidencias totales (sin limite ni desplazamiento)"""
+        # El orden no cambia el conteo: se planifica sin él, que puede dar un índice mejor
+        plan = self.plan if self.orden_por is None else self.gestor._planificar(self.filtros, None)
+        if plan.contar:
+            return plan.contar()
+        if not plan.resto:
+            return len(plan.candidatos())
+        return sum(1 for t in plan.candidatos() if cumple(t, plan.resto))
+    
+    def exists(self):
+        plan = self.plan if self.orden_por is None else self.gestor._planificar(self.filtros, None)
+        if plan.contar:
+            return plan.contar() > 0
+        return any(True for t in plan.candidatos() if cumple(t, plan.resto))
+
+# ========== ARCHIVOS COMPARTIDOS ENTRE PROCESOS ==========
+
+def sello_archivo(ruta):
+    """(mtime, tamaño, inodo) de un archivo, o None si no existe: cambia con cada escritura"""
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    """Lock consultivo y exclusivo sobre <ruta>.lock (lo respetan las instancias de la agenda y el servicio)"""
+    with open(f"{ruta}.lock", "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class ArchivoCompartido:
+    """Archivo JSON (lista de registros con 'id') que pueden escribir varios procesos.
+    
+    Recuerda lo último que leyó o escribió (la base, por id) y el sello del
+    archivo (mtime, tamaño, inodo): así sabe si otro proceso lo cambió y qué
+    registros tocó sin recargar todo. Escribe a un temporal y lo renombra,
+    de modo que nadie lee nunca un archivo a medias.
+    """
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.base = {}  # id -> registro tal como está en disco
+        self.sello = None
+        self._lock = threading.RLock()
+        self._profundidad = 0  # bloqueo() anidado en el mismo hilo: el lock del archivo se toma una vez
+    
+    def _sello_disco(self):
+        return sello_archivo(self.ruta)
+    
+    def cambio_externo(self):
+        return self._sello_disco() != self.sello
+    
+    @contextmanager
+    def bloqueo(self):
+        with self._lock:
+            if self._profundidad:
+                self._profundidad += 1
+                try:
+                    yield
+                finally:
+                    self._profundidad -= 1
+                return
+            with bloqueo_archivo(self.ruta):
+                self._profundidad = 1
+                try:
+                    yield
+                finally:
+                    self._profundidad = 0
+    
+    def leer(self):
+        """Registros en disco; pasan a ser la base"""
+        sello = self._sello_disco()  # Antes de leer: si cambia mientras, se verá en la próxima comprobación
+        datos = []
+        if sello is not None:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        self._recordar(datos, sello)
+        return datos
+    
+    def escribir(self, datos):
+        temporal = self.ruta.with_name(self.ruta.name + ".tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(datos, indent=2, ensure_ascii=False))  # Una sola escritura, no una por token
+        os.replace(temporal, self.ruta)
+        self._recordar(datos, self._sello_disco())
+    
+    def diferencias(self):
+        """(registros nuevos o cambiados, ids borrados) en disco respecto a la base, que se actualiza"""
+        anterior = self.base
+        self.leer()
+        cambiados = [d for id, d in self.base.items() if anterior.get(id) != d]
+        borrados = [id for id in anterior if id not in self.base]
+        return cambiados, borrados
+    
+    def _recordar(self, datos, sello):
+        self.base = {}
+        for d in datos:
+            try:
+                self.base[int(d['id'])] = d
+            except (KeyError, TypeError, ValueError):
+                pass
+        self.sello = sello
+
 # ========== GESTOR DE DATOS (SOLO LOCAL) ==========
 
+def requiere_tareas(metodo):
+    """Con la carga diferida, espera a que tareas.json esté en memoria antes de
+    modificar self.tareas (si no, se guardaría la lista vacía encima del archivo)"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        if not self.tareas_cargadas.wait(ESPERA_CARGA_TAREAS):
+            raise RuntimeError("tareas.json sigue sin cargarse")
+        if self.error_carga_tareas:
+            # No se modifica nada: guardar ahora pisaría tareas.json con lo poco que haya en memoria
+            raise RuntimeError(f"tareas.json no se pudo cargar: {self.error_carga_tareas}")
+        return metodo(self, *args, **kwargs)
+    return envoltura
+
+def escritura(metodo):
+    """Modificaciones en memoria de proyectos/tareas, de a una: con _lock_disco no coinciden
+    con la fusión de lo que escribió otro proceso (una lista reconstruida a la vez que se
+    fusiona perdería esos registros, y al guardar contarían como borrados locales)"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._lock_disco:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
 class GestorDatos:
-    def __init__(self):
+    def __init__(self, diferir_tareas=False):
+        """diferir_tareas: solo lee proyectos.json y el resumen de conteos;
+        tareas.json se carga luego con cargar_tareas() (arranque de la UI)"""
         self.archivo_proyectos = Path("proyectos.json")
         self.archivo_tareas = Path("tareas.json")
+        self.archivo_resumen = Path("resumen_proyectos.json")  # Conteos para el primer frame
+        self._disco_proyectos = ArchivoCompartido(self.archivo_proyectos)
+        self._disco_tareas = ArchivoCompartido(self.archivo_tareas)
+        self._lock_disco = threading.RLock()  # Cambios en memoria, fusión con el disco y escritura, de a uno
+        # Archivo (datos fríos): tareas completadas hace tiempo, fuera de self.tareas
+        self.archivo_historial = Path("tareas_archivo.ndjson")
+        self.archivo_indice_historial = Path("tareas_archivo_indice.json")
+        self._sello_indice_historial = None  # Para saber si otro proceso archivó o restauró tareas
         self.proyectos = []
         self.tareas = []
-        self.cargar_datos()
+        self.ids_archivadas = {}  # id -> proyecto_id, sin cargar el archivo completo
+        self.archivadas_pendientes = []  # IDs archivados que falta mover en Sheets
+        self._historial = None  # Se carga bajo demanda
+        self.suscriptores = []  # Funciones llamadas tras cada escritura a disco
+        self.observadores_tareas = []  # Funciones llamadas con los ids de cada tarea cambiada en memoria
+        self._indice_busqueda = None  # Se construye en la primera búsqueda (o con preparar_busqueda)
+        self._ordenes = {}  # (proyecto_id, modo) -> ListaOrdenada, creada al mostrar el proyecto
+        self._indice_fechas = None  # ListaOrdenada de tareas en agenda, creada en la primera consulta
+        self._indice_campos = None  # IndiceCampos, creado en la primera consulta por proyecto/estado/prioridad
+        self._lock_indices = threading.Lock()
+        self.tareas_cargadas = threading.Event()  # Se marca también si la carga falla (ver error_carga_tareas)
+        self.error_carga_tareas = None
+        self._lote = 0  # Profundidad de lote(): mientras sea > 0 no se escribe a disco
+        self._pendientes_lote = set()  # "proyectos"/"tareas" a guardar al cerrar el lote
+        self.resumen = ({}, {})  # (conteos, vencidas) guardados en la última escritura
+        if diferir_tareas:
+            self.cargar_proyectos()
+            self.resumen = self.leer_resumen()
+        else:
+            self.cargar_datos()
     
     def cargar_datos(self):
+        self.cargar_proyectos()
+        self.cargar_tareas()
+    
+    @cronometrado("gestor_cargar_proyectos")
+    @escritura
+    def cargar_proyectos(self):
         if self.archivo_proyectos.exists():
-            with open(self.archivo_proyectos, 'r', encoding='utf-8') as f:
-                datos = json.load(f)
-                self.proyectos = [Proyecto.from_dict(p) for p in datos]
+            self.proyectos = [Proyecto.from_dict(p) for p in self._disco_proyectos.leer()]
+        self._leer_indice_historial()
+    
+    @cronometrado("gestor_cargar_tareas")
+    def cargar_tareas(self):
+        try:
+            if self.archivo_tareas.exists():
+                with self._lock_disco:
+                    # Filtrar None (registros con IDs corruptos)
+                    self.tareas = [t for t in (Tarea.from_dict(d) for d in self._disco_tareas.leer()) if t is not None]
+        except Exception as e:
+            # Quien espera en requiere_tareas se entera del error en lugar de quedarse bloqueado
+            self.error_carga_tareas = e
+            self.tareas_cargadas.set()
+            raise
+        self.error_carga_tareas = None
         
-        if self.archivo_tareas.exists():
-            with open(self.archivo_tareas, 'r', encoding='utf-8') as f:
+        with self._lock_indices:
+            self._indice_busqueda = None
+            self._ordenes = {}
+            self._indice_fechas = None
+            self._indice_campos = None
+        self.tareas_cargadas.set()
+        self._avisar_tareas(None)
+    
+    def leer_resumen(self):
+        """(conteos, vencidas) por proyecto sin abrir tareas.json; vacío si no hay resumen"""
+        try:
+            with open(self.archivo_resumen, 'r', encoding='utf-8') as f:
                 datos = json.load(f)
-                self.tareas = [Tarea.from_dict(t) for t in datos]
+            conteos = {int(k): (v[0], v[1]) for k, v in datos.items()}
+            vencidas = {int(k): v[2] for k, v in datos.items() if v[2]}
+            return conteos, vencidas
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return {}, {}
+    
+    def guardar_resumen(self):
+        """Conteos por proyecto para pintar el primer frame del próximo arranque"""
+        vencidas = self.vencidas_por_proyecto()
+        datos = {pid: [total, completadas, vencidas.get(pid, 0)]
+                 for pid, (total, completadas) in self.contar_por_proyecto().items()}
+        with open(self.archivo_resumen, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
     
+    @cronometrado("gestor_guardar_proyectos")
     def guardar_proyectos(self):
-        with open(self.archivo_proyectos, 'w', encoding='utf-8') as f:
-            json.dump([p.to_dict() for p in self.proyectos], f, indent=2, ensure_ascii=False)
+        # El lote se mira con el lock: el de otro hilo no se queda con este guardado
+        with self._lock_disco:
+            if self._lote:
+                self._pendientes_lote.add("proyectos")
+                return
+            # Si otro proceso escribió desde nuestra última lectura, primero se incorporan sus cambios
+            with self._disco_proyectos.bloqueo():
+                self._incorporar_externos("proyectos")
+                self._disco_proyectos.escribir([p.to_dict() for p in self.proyectos])
+        self._notificar("proyectos")
     
+    @requiere_tareas
+    @cronometrado("gestor_guardar_tareas")
     def guardar_tareas(self):
-        with open(self.archivo_tareas, 'w', encoding='utf-8') as f:
-            json.dump([t.to_dict() for t in self.tareas], f, indent=2, ensure_ascii=False)
+        with self._lock_disco:
+            if self._lote:
+                self._pendientes_lote.add("tareas")
+                return
+            with self._disco_tareas.bloqueo():
+                self._incorporar_externos("tareas")
+                self._disco_tareas.escribir([t.to_dict() for t in self.tareas])
+        self.guardar_resumen()
+        self._notificar("tareas")
     
-    def agregar_proyecto(self, nombre, descripcion, color):
-        # Convertir todos los IDs a int, ignorar los que no sean válidos
-        ids = []
-        for p in self.proyectos:
+    def recargar_cambios(self):
+        """Incorpora lo que otros procesos escribieron desde la última lectura, registro a registro.
+        
+        Devuelve {"proyectos": n, "tareas": n} con los registros aplicados (vacío si nada cambió).
+        """
+        cambios = {}
+        with self._lock_disco:
+            # El índice del archivo primero: las tareas que otro proceso archivó no vuelven
+            # por la sincronización ni se renumera una tarea a un id archivado
+            archivo = self._incorporar_indice_historial()
+            for tipo in ("proyectos", "tareas"):
+                if tipo == "tareas" and (not self.tareas_cargadas.is_set() or self.error_carga_tareas):
+                    continue
+                aplicados = self._incorporar_externos(tipo)
+                if aplicados:
+                    cambios[tipo] = aplicados
+            if archivo and "tareas" not in cambios:
+                cambios["tareas"] = 0  # Solo cambió el archivo: la vista de archivadas se rehace igual
+        for tipo in cambios:
+            self._notificar(tipo)
+        return cambios
+    
+    def _incorporar_externos(self, tipo):
+        """Si otro proceso escribió el archivo desde nuestra última lectura, aplica sus cambios"""
+        disco = self._disco_tareas if tipo == "tareas" else self._disco_proyectos
+        return self._fusionar_externos(tipo) if disco.cambio_externo() else 0
+    
+    def _fusionar_externos(self, tipo):
+        """Aplica en memoria los registros que cambiaron en disco. Ante un conflicto gana lo local
+        (lo modificado o borrado aquí y aún no escrito); si los dos crearon el mismo id, el local se renumera"""
+        disco = self._disco_tareas if tipo == "tareas" else self._disco_proyectos
+        registros = self.tareas if tipo == "tareas" else self.proyectos
+        ids_memoria = {r.id for r in registros}
+        modificados = {r.id for r in registros if disco.base.get(r.id) != r.to_dict()}
+        nuevos_locales = ids_memoria - set(disco.base)
+        borrados_locales = set(disco.base) - ids_memoria
+        
+        cambiados, borrados = disco.diferencias()
+        por_id = {r.id: r for r in registros}
+        aplicados = 0
+        for datos in cambiados:
+            externo = (Tarea if tipo == "tareas" else Proyecto).from_dict(datos)
+            if externo is None or externo.id in borrados_locales:
+                continue
+            if externo.id in nuevos_locales:
+                self._renumerar(tipo, por_id.pop(externo.id))
+            elif externo.id in modificados:
+                continue
+            local = por_id.get(externo.id)
+            if local is None:
+                registros.append(externo)
+                if tipo == "tareas":
+                    self._indexar(externo)
+            else:
+                # Mismo objeto: las tarjetas y el proyecto seleccionado siguen apuntando a él
+                if tipo == "tareas":
+                    self._desindexar(local)  # Con el proyecto_id de antes, por si cambió
+                local.__dict__.update(externo.__dict__)
+                if tipo == "tareas":
+                    self._indexar(local)
+            aplicados += 1
+        
+        quitar = {id for id in borrados if id in por_id and id not in modificados}
+        if quitar:
+            for id in quitar:
+                if tipo == "tareas":
+                    self._desindexar(por_id[id])
+            if tipo == "tareas":
+                self.tareas = [t for t in self.tareas if t.id not in quitar]
+            else:
+                self.proyectos = [p for p in self.proyectos if p.id not in quitar]
+            aplicados += len(quitar)
+        return aplicados
+    
+    def _renumerar(self, tipo, registro):
+        """Da un id libre a un registro local que otro proceso creó con el mismo id"""
+        if tipo == "tareas":
+            usados = {t.id for t in self.tareas} | set(self._disco_tareas.base) | set(self.ids_archivadas)
+            self._desindexar(registro)
+            anterior, registro.id = registro.id, max(usados) + 1
+            self._indexar(registro)
+        else:
+            usados = {p.id for p in self.proyectos} | set(self._disco_proyectos.base)
+            anterior, registro.id = registro.id, max(usados) + 1
+            # Sus tareas aún no escritas se mueven con él; las que ya están en disco son del otro proceso
+            for tarea in self.tareas:
+                if tarea.proyecto_id == anterior and tarea.id not in self._disco_tareas.base:
+                    tarea.proyecto_id = registro.id
+                    self._indexar(tarea, texto=False)
+            with self._lock_indices:
+                for clave in [c for c in self._ordenes if c[0] in (anterior, registro.id)]:
+                    del self._ordenes[clave]
+        print(f"⚠️ {tipo.capitalize()}: id {anterior} creado también por otro proceso, el local pasa a {registro.id}")
+    
+    @contextmanager
+    def lote(self):
+        """Agrupa varias operaciones: cada archivo se escribe (y se avisa) una sola vez al salir.
+        
+        Tiene tomado _lock_disco hasta el final: los cambios de otros hilos (sync, notificador)
+        esperan y se guardan desde su propio hilo, no quedan dentro del lote.
+        """
+        with self._lock_disco:
+            self._lote += 1
             try:
-                ids.append(int(p.id))
-            except (ValueError, TypeError):
-                # Ignorar IDs que no se puedan convertir
-                pass
-        nuevo_id = max(ids, default=0) + 1
-        fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
-        proyecto = Proyecto(nuevo_id, nombre, descripcion, color, fecha)
-        self.proyectos.append(proyecto)
-        self.guardar_proyectos()
-        return proyecto
+                yield
+            finally:
+                self._lote -= 1
+                if not self._lote:
+                    pendientes, self._pendientes_lote = self._pendientes_lote, set()
+                    if "proyectos" in pendientes:
+                        self.guardar_proyectos()
+                    if "tareas" in pendientes:
+                        self.guardar_tareas()
+    
+    @contextmanager
+    def transaccion(self):
+        """lote() con proyectos.json y tareas.json bloqueados hasta el final.
+        
+        Otro proceso no puede escribir en medio, y como nada llega al disco antes de salir,
+        quien deshaga en memoria lo hecho dentro deja los archivos como estaban.
+        """
+        # lote() por dentro: escribe al salir, todavía con los archivos bloqueados
+        with self._lock_disco, self._disco_proyectos.bloqueo(), self._disco_tareas.bloqueo():
+            with self.lote():
+                yield
+    
+    def suscribir(self, funcion):
+        """Registra funcion(tipo) para enterarse de cada cambio guardado ("proyectos" o "tareas")"""
+        self.suscriptores.append(funcion)
+    
+    def _notificar(self, tipo):
+        for funcion in self.suscriptores:
+            try:
+                funcion(tipo)
+            except Exception as e:
+                print(f"⚠️ Error en suscriptor de cambios: {e}")
+    
+    # El archivo (NDJSON) y su índice se comparten con otros procesos igual que tareas.json,
+    # y los cubre el mismo lock: archivar mueve tareas de uno a otro, y los ids archivados
+    # siguen ocupados al dar ids nuevos.
+    
+    def _leer_indice_historial(self):
+        sello = sello_archivo(self.archivo_indice_historial)  # Antes de leer, como ArchivoCompartido
+        indice = {}
+        if sello is not None:
+            with open(self.archivo_indice_historial, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+        self.ids_archivadas = {int(k): v for k, v in indice.get('ids', {}).items()}
+        self.archivadas_pendientes = indice.get('pendientes', [])
+        self._sello_indice_historial = sello
+    
+    def _incorporar_indice_historial(self):
+        """Si otro proceso archivó o restauró tareas desde nuestra última lectura, relee el índice.
+        
+        Lo de este proceso ya está escrito (cada cambio guarda el índice en el acto): el disco manda.
+        Devuelve True si cambió.
+        """
+        with self._lock_disco:
+            if sello_archivo(self.archivo_indice_historial) == self._sello_indice_historial:
+                return False
+            self._leer_indice_historial()
+            self._historial = None  # El NDJSON también cambió: se relee al pedirlo
+        self._avisar_tareas(None)
+        return True
+    
+    @contextmanager
+    def _bloqueo_historial(self):
+        """tareas.json bloqueado (su lock cubre el archivo y el índice) y el índice al día"""
+        with self._lock_disco, self._disco_tareas.bloqueo():
+            self._incorporar_indice_historial()
+            yield
+    
+    @cronometrado("gestor_guardar_indice_historial")
+    def guardar_indice_historial(self):
+        # A un temporal y renombrar: otro proceso nunca lee el índice a medias
+        temporal = self.archivo_indice_historial.with_name(self.archivo_indice_historial.name + ".tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ids': self.ids_archivadas,
+                'pendientes': self.archivadas_pendientes
+            }, f, ensure_ascii=False)
+        os.replace(temporal, self.archivo_indice_historial)
+        self._sello_indice_historial = sello_archivo(self.archivo_indice_historial)
+    
+    def agregar_proyecto(self, nombre, descripcion, color):
+        # Con el lock del archivo hasta guardar: el id nuevo no choca con uno que otro proceso acaba de crear
+        with self._lock_disco, self._disco_proyectos.bloqueo():
+            self._incorporar_externos("proyectos")
+            # Convertir todos los IDs a int, ignorar los que no sean válidos
+            ids = []
+            for p in self.proyectos:
+                try:
+                    ids.append(int(p.id))
+                except (ValueError, TypeError):
+                    # Ignorar IDs que no se puedan convertir
+                    pass
+            nuevo_id = max(ids, default=0) + 1
+            fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
+            proyecto = Proyecto(nuevo_id, nombre, descripcion, color, fecha)
+            self.proyectos.append(proyecto)
+            self.guardar_proyectos()
+            return proyecto
     
+    @escritura
     def actualizar_proyecto(self, id, nombre, descripcion, color):
         for proyecto in self.proyectos:
             if proyecto.id == id:
@@ -161,11 +1030,25 @@ class GestorDatos:
                 return True
         return False
     
+    @requiere_tareas
+    @escritura
     def eliminar_proyecto(self, id):
+        for t in self.tareas:
+            if t.proyecto_id == id:
+                self._desindexar(t)
         self.tareas = [t for t in self.tareas if t.proyecto_id != id]
+        with self._lock_indices:
+            for clave in [c for c in self._ordenes if c[0] == id]:
+                del self._ordenes[clave]
         self.proyectos = [p for p in self.proyectos if p.id != id]
         self.guardar_proyectos()
         self.guardar_tareas()
+        
+        # Solo se abre el archivo si el proyecto tenía tareas archivadas
+        with self._bloqueo_historial():
+            if id in self.ids_archivadas.values():
+                historial = [t for t in self.cargar_historial() if t.proyecto_id != id]
+                self._reescribir_historial(historial)
     
     def obtener_proyecto(self, id):
         for proyecto in self.proyectos:
@@ -173,60 +1056,653 @@ class GestorDatos:
                 return proyecto
         return None
     
+    @requiere_tareas
     def agregar_tarea(self, titulo, descripcion, proyecto_id, fecha_programada=None, prioridad="Media"):
-        # Convertir todos los IDs a int, ignorar los que no sean válidos
-        ids = []
-        for t in self.tareas:
-            try:
-                ids.append(int(t.id))
-            except (ValueError, TypeError):
-                # Ignorar IDs que no se puedan convertir
-                pass
-        nuevo_id = max(ids, default=0) + 1
-        fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
-        tarea = Tarea(nuevo_id, titulo, descripcion, fecha, int(proyecto_id), 
-                     fecha_programada=fecha_programada, prioridad=prioridad)
-        self.tareas.append(tarea)
-        self.guardar_tareas()
-        return tarea
+        # Con el lock del archivo hasta guardar: el id nuevo no choca con uno que otro proceso acaba de crear
+        with self._bloqueo_historial():
+            self._incorporar_externos("tareas")
+            # Convertir todos los IDs a int, ignorar los que no sean válidos
+            ids = []
+            for t in self.tareas:
+                try:
+                    ids.append(int(t.id))
+                except (ValueError, TypeError):
+                    # Ignorar IDs que no se puedan convertir
+                    pass
+            # Los IDs archivados siguen ocupados aunque no estén en memoria
+            nuevo_id = max(max(ids, default=0), max(self.ids_archivadas, default=0)) + 1
+            fecha = datetime.now().strftime("%Y-%m-%d %H:%M")
+            tarea = Tarea(nuevo_id, titulo, descripcion, fecha, int(proyecto_id), 
+                         fecha_programada=fecha_programada, prioridad=prioridad)
+            self.tareas.append(tarea)
+            self._indexar(tarea)
+            self.guardar_tareas()
+            return tarea
+    
+    @requiere_tareas
+    def agregar_tareas(self, datos):
+        """Alta en bloque: cada dict trae los argumentos de Tarea salvo el id. Devuelve las tareas creadas.
+        
+        Los ids se reparten de una pasada (agregar_tarea recorre todas las tareas en cada alta).
+        """
+        with self._bloqueo_historial():
+            self._incorporar_externos("tareas")
+            siguiente = max(max((t.id for t in self.tareas), default=0), max(self.ids_archivadas, default=0)) + 1
+            nuevas = [Tarea(siguiente + i, **campos) for i, campos in enumerate(datos)]
+            self.tareas.extend(nuevas)
+            for tarea in nuevas:
+                self._indexar(tarea)
+            self.guardar_tareas()
+            return nuevas
     
+    @requiere_tareas
+    @escritura
     def actualizar_tarea(self, id, titulo, descripcion, completada, fecha_programada=None, prioridad="Media"):
         for tarea in self.tareas:
             if tarea.id == id:
                 tarea.titulo = titulo
                 tarea.descripcion = descripcion
+                if completada != tarea.completada:
+                    tarea.fecha_completada = datetime.now().strftime("%Y-%m-%d %H:%M") if completada else None
                 tarea.completada = completada
                 tarea.fecha_programada = fecha_programada
                 tarea.prioridad = prioridad
+                self._indexar(tarea)
                 self.guardar_tareas()
                 return True
         return False
     
+    @requiere_tareas
+    @escritura
     def eliminar_tarea(self, id):
+        for t in self.tareas:
+            if t.id == id:
+                self._desindexar(t)
         self.tareas = [t for t in self.tareas if t.id != id]
         self.guardar_tareas()
     
+    @requiere_tareas
+    @escritura
+    def eliminar_tareas(self, ids):
+        ids = set(ids)
+        for t in self.tareas:
+            if t.id in ids:
+                self._desindexar(t)
+        self.tareas = [t for t in self.tareas if t.id not in ids]
+        self.guardar_tareas()
+    
+    @requiere_tareas
+    @escritura
     def toggle_completada(self, id):
         for tarea in self.tareas:
             if tarea.id == id:
                 tarea.completada = not tarea.completada
+                tarea.fecha_completada = datetime.now().strftime("%Y-%m-%d %H:%M") if tarea.completada else None
+                self._indexar(tarea, texto=False)
                 self.guardar_tareas()
                 return
     
     def obtener_tareas_proyecto(self, proyecto_id):
-        return [t for t in self.tareas if t.proyecto_id == proyecto_id]
+        return list(self.query({"proyecto_id": proyecto_id}))
+    
+    def obtener_tarea(self, id):
+        with self._lock_indices:
+            return self._campos().obtener(id)
+    
+    def query(self, filtros=None, orden_por=None, limite=None, desplazamiento=0):
+        """Consulta sobre las tareas activas usando el mejor índice disponible.
+        
+        filtros: {campo: valor} con id, proyecto_id, completada, prioridad,
+        notificacion_enviada, con_fecha, fecha_desde/fecha_hasta ([desde, hasta)
+        sobre fecha_programada) y texto (búsqueda por prefijos).
+        orden_por: un modo de MODOS_ORDEN o None. Devuelve una Consulta perezosa:
+        list(gestor.query(...)), .count() o .exists().
+        """
+        return Consulta(self, dict(filtros or {}), orden_por, limite, desplazamiento)
+    
+    def _campos(self):
+        """IndiceCampos (se construye la primera vez). Llamar con _lock_indices tomado"""
+        if self._indice_campos is None:
+            self._indice_campos = IndiceCampos(self.tareas)
+        return self._indice_campos
+    
+    def _planificar(self, filtros, orden_por):
+        """Elige el índice más selectivo para los filtros. Por orden de preferencia:
+        id, texto, fechas (pendientes con fecha), proyecto ya ordenado, grupos de campos, todo"""
+        resto = dict(filtros)
+        if "id" in resto:
+            id = resto.pop("id")
+            return Plan(f"id({id})", lambda: [t for t in [self.obtener_tarea(id)] if t is not None], resto)
+        
+        if resto.get("texto"):
+            texto = resto.pop("texto")
+            return Plan(f"busqueda({texto!r})", lambda: self.buscar(texto), resto)
+        resto.pop("texto", None)
+        
+        # El índice de fechas tiene exactamente las pendientes con fecha, ordenadas por fecha
+        if resto.get("completada") is False and ("fecha_desde" in resto or "fecha_hasta" in resto or resto.get("con_fecha") is True):
+            desde = resto.pop("fecha_desde", "")
+            hasta = resto.pop("fecha_hasta", SIN_FECHA)
+            del resto["completada"]
+            if resto.get("con_fecha") is True:
+                del resto["con_fecha"]  # Todas las del índice tienen fecha
+            return Plan(f"fechas({desde!r}, {hasta!r})", lambda: self.tareas_entre(desde, hasta), resto,
+                        ordenado=orden_por is None, contar=lambda: len(self.tareas_entre(desde, hasta)))
+        
+        if orden_por and "proyecto_id" in resto:
+            proyecto_id = resto.pop("proyecto_id")
+            ordenadas = lambda: list(self.obtener_tareas_ordenadas(proyecto_id, orden_por))
+            return Plan(f"orden_proyecto({proyecto_id}, {orden_por})", ordenadas, resto, ordenado=True)
+        
+        campos = {c: resto.pop(c) for c in CAMPOS_INDICE if c in resto}
+        if campos:
+            def candidatos():
+                with self._lock_indices:
+                    return [t for grupo in self._campos().grupos_de(campos) for t in grupo.values()]
+            def contar():
+                with self._lock_indices:
+                    return sum(len(grupo) for grupo in self._campos().grupos_de(campos))
+            return Plan(f"campos({', '.join(f'{c}={v!r}' for c, v in campos.items())})", candidatos, resto, contar=contar)
+        
+        return Plan("completo", lambda: self.tareas, resto, contar=lambda: len(self.tareas))
+    
+    def preparar_busqueda(self):
+        """Construye el índice de búsqueda (pensado para un hilo en segundo plano)"""
+        with self._lock_indices:
+            if self._indice_busqueda is None:
+                self._indice_busqueda = IndiceBusqueda(list(self.tareas))
+    
+    def buscar(self, texto):
+        """Búsqueda de texto en las tareas activas de todos los proyectos"""
+        self.preparar_busqueda()
+        with self._lock_indices:
+            return self._indice_busqueda.buscar(texto)
+    
+    def obtener_tareas_ordenadas(self, proyecto_id, modo="prioridad"):
+        """Tareas del proyecto en el orden del modo; la lista se mantiene entre llamadas.
+        
+        Devuelve la lista interna: no modificarla (recortarla con [a:b] sí).
+        """
+        with self._lock_indices:
+            orden = self._ordenes.get((proyecto_id, modo))
+            if orden is None:
+                tareas = [t for grupo in self._campos().grupos_de({"proyecto_id": proyecto_id}) for t in grupo.values()]
+                orden = ListaOrdenada(MODOS_ORDEN[modo], tareas)
+                self._ordenes[(proyecto_id, modo)] = orden
+            return orden.tareas
+    
+    def tareas_entre(self, desde, hasta):
+        """Tareas pendientes con fecha_programada en [desde, hasta), por fecha. O(log n + k)
+        
+        desde/hasta son textos "YYYY-MM-DD" o "YYYY-MM-DD HH:MM"; desde="" es sin límite.
+        """
+        with self._lock_indices:
+            if self._indice_fechas is None:
+                self._indice_fechas = ListaOrdenada(clave_fecha, [t for t in self.tareas if en_agenda(t)])
+            claves = self._indice_fechas.claves
+            # (texto,) queda antes que cualquier (texto, id): cortes sin mirar los ids
+            i = bisect.bisect_left(claves, (desde,))
+            j = bisect.bisect_left(claves, (hasta,))
+            return self._indice_fechas.tareas[i:j]
+    
+    def vencidas_por_proyecto(self):
+        """Tareas pendientes cuya fecha ya pasó, contadas por proyecto"""
+        conteos = {}
+        for t in self.tareas_entre("", datetime.now().strftime("%Y-%m-%d %H:%M")):
+            conteos[t.proyecto_id] = conteos.get(t.proyecto_id, 0) + 1
+        return conteos
+    
+    def _indexar(self, tarea, texto=True):
+        """Alta o modificación de una tarea en los índices en memoria"""
+        # Con el lock: si un índice se está construyendo, el cambio espera y no se pierde
+        with self._lock_indices:
+            if texto and self._indice_busqueda is not None:
+                self._indice_busqueda.agregar(tarea)
+            for (proyecto_id, _), orden in self._ordenes.items():
+                if proyecto_id == tarea.proyecto_id:
+                    orden.agregar(tarea)
+            if self._indice_campos is not None:
+                self._indice_campos.agregar(tarea)
+            if self._indice_fechas is not None:
+                if en_agenda(tarea):
+                    self._indice_fechas.agregar(tarea)
+                else:
+                    self._indice_fechas.quitar(tarea.id)
+        self._avisar_tareas((tarea.id,))
+    
+    def _desindexar(self, tarea):
+        with self._lock_indices:
+            if self._indice_busqueda is not None:
+                self._indice_busqueda.quitar(tarea.id)
+            for (proyecto_id, _), orden in self._ordenes.items():
+                if proyecto_id == tarea.proyecto_id:
+                    orden.quitar(tarea.id)
+            if self._indice_fechas is not None:
+                self._indice_fechas.quitar(tarea.id)
+            if self._indice_campos is not None:
+                self._indice_campos.quitar(tarea.id)
+        self._avisar_tareas((tarea.id,))
+    
+    def observar_tareas(self, funcion):
+        """Registra funcion(ids) para cada alta, cambio o baja de tareas en memoria.
+        
+        ids es una tupla, o None si hay que releer todo (se recargó tareas.json o se
+        reescribió el archivo). Se llama sin el lock de los índices, desde el hilo que
+        hizo el cambio: debe ser rápida (anotar y volver).
+        """
+        self.observadores_tareas.append(funcion)
+    
+    def _avisar_tareas(self, ids):
+        for funcion in self.observadores_tareas:
+            try:
+                funcion(ids)
+            except Exception as e:
+                print(f"⚠️ Error en observador de tareas: {e}")
+    
+    def contar_por_proyecto(self):
+        """(total, completadas) de cada proyecto, sumando los grupos del índice de campos"""
+        conteos = {}
+        with self._lock_indices:
+            for (proyecto_id, completada, _), grupo in self._campos().grupos.items():
+                total, completadas = conteos.get(proyecto_id, (0, 0))
+                conteos[proyecto_id] = (total + len(grupo), completadas + (len(grupo) if completada else 0))
+        return conteos
+    
+    @requiere_tareas
+    @escritura
+    def marcar_notificacion_enviada(self, tarea_id):
+        for tarea in self.tareas:
+            if tarea.id == tarea_id:
+                tarea.notificacion_enviada = True
+                self.guardar_tareas()
+                break
+    
+    @requiere_tareas
+    @escritura
+    def fusionar_tareas_remotas(self, paginas, guardar=True):
+        """Agrega página a página las tareas remotas que no existen en local. Devuelve cuántas se agregaron"""
+        # Las archivadas (también por otro proceso) cuentan como existentes para no devolverlas a la lista activa
+        self._incorporar_indice_historial()
+        ids_locales = {int(t.id) for t in self.tareas} | set(self.ids_archivadas)
+        agregadas = 0
+        for pagina in paginas:
+            for tarea in pagina:
+                if tarea.id not in ids_locales:
+                    self.tareas.append(tarea)
+                    self._indexar(tarea)
+                    ids_locales.add(tarea.id)
+                    agregadas += 1
+        if agregadas and guardar:
+            self.guardar_tareas()
+        return agregadas
+    
+    @escritura
+    def agregar_proyectos_remotos(self, proyectos):
+        """Agrega los proyectos de Sheets que no existen en local. Devuelve cuántos se agregaron"""
+        ids_locales = {int(p.id) for p in self.proyectos}
+        nuevos = [p for p in proyectos if int(p.id) not in ids_locales]
+        if nuevos:
+            self.proyectos.extend(nuevos)
+            self.guardar_proyectos()
+        return len(nuevos)
+    
+    # Archivo de tareas completadas
+    @requiere_tareas
+    @escritura
+    @cronometrado("gestor_archivar_completadas")
+    def archivar_completadas(self, dias=DIAS_ARCHIVO):
+        """Mueve al archivo las tareas completadas hace más de `dias` días. Devuelve cuántas se movieron"""
+        # Con el lock del archivo: otro proceso no archiva a la vez (líneas repetidas, índice pisado)
+        with self._bloqueo_historial():
+            # Lo que otro proceso ya archivó deja de estar en tareas.json: no se vuelve a archivar
+            self._incorporar_externos("tareas")
+            ahora = datetime.now()
+            limite = ahora - timedelta(days=dias)
+            activas = []
+            archivadas = []
+            ya_archivadas = []  # Archivadas por otro proceso que aquí seguían (modificadas sin guardar)
+            sellar = False
+            
+            for tarea in self.tareas:
+                if tarea.id in self.ids_archivadas:
+                    ya_archivadas.append(tarea)
+                    continue
+                completada_el = leer_fecha(tarea.fecha_completada) if tarea.completada else None
+                if tarea.completada and completada_el is None:
+                    # Completadas antes de existir fecha_completada, o con una fecha ilegible
+                    # (Sheets, edición a mano): empiezan a contar desde hoy
+                    if tarea.fecha_completada:
+                        print(f"⚠️ Tarea {tarea.id}: fecha_completada '{tarea.fecha_completada}' no válida, se usa la de hoy")
+                    completada_el = ahora
+                if completada_el is not None and tarea.fecha_completada != completada_el.strftime("%Y-%m-%d %H:%M"):
+                    tarea.fecha_completada = completada_el.strftime("%Y-%m-%d %H:%M")
+                    self._avisar_tareas((tarea.id,))
+                    sellar = True
+                if completada_el is not None and completada_el < limite:
+                    archivadas.append(tarea)
+                else:
+                    activas.append(tarea)
+            
+            if archivadas:
+                # El archivo es NDJSON: archivar solo agrega líneas, no reescribe lo anterior
+                with open(self.archivo_historial, 'a', encoding='utf-8') as f:
+                    for tarea in archivadas:
+                        f.write(json.dumps(tarea.to_dict(), ensure_ascii=False) + "\n")
+                for tarea in archivadas:
+                    self.ids_archivadas[tarea.id] = tarea.proyecto_id
+                    self.archivadas_pendientes.append(tarea.id)
+                if self._historial is not None:
+                    self._historial.extend(archivadas)
+                self.guardar_indice_historial()
+            for tarea in archivadas + ya_archivadas:
+                self._desindexar(tarea)
+            if archivadas or ya_archivadas:
+                self.tareas = activas
+            
+            if archivadas or ya_archivadas or sellar:
+                self.guardar_tareas()
+            return len(archivadas)
+    
+    def cargar_historial(self):
+        """Tareas archivadas; el archivo se lee la primera vez que se necesita (y tras cambiarlo otro proceso)"""
+        self._incorporar_indice_historial()
+        if self._historial is None:
+            self._historial = []
+            if self.archivo_historial.exists():
+                with open(self.archivo_historial, 'r', encoding='utf-8') as f:
+                    for linea in f:
+                        if linea.strip():
+                            tarea = Tarea.from_dict(json.loads(linea))
+                            if tarea is not None:
+                                self._historial.append(tarea)
+        return self._historial
+    
+    def obtener_historial_proyecto(self, proyecto_id):
+        self._incorporar_indice_historial()
+        if proyecto_id not in self.ids_archivadas.values():
+            return []
+        return [t for t in self.cargar_historial() if t.proyecto_id == proyecto_id]
+    
+    def buscar_en_historial(self, texto):
+        """Tareas archivadas con todas las palabras de `texto` (sin distinguir tildes ni mayúsculas).
+        Recorre el archivo entero: solo se usa cuando se pide buscar también en él"""
+        palabras = _RE_PALABRA.findall(normalizar_texto(texto))
+        if not palabras:
+            return []
+        return [t for t in self.cargar_historial()
+                if all(p in normalizar_texto(f"{t.titulo} {t.descripcion or ''}") for p in palabras)]
+    
+    @requiere_tareas
+    @escritura
+    def restaurar_tarea(self, id):
+        """Devuelve una tarea archivada a la lista activa (sin completar)"""
+        with self._bloqueo_historial():
+            if id not in self.ids_archivadas:
+                return None
+            historial = self.cargar_historial()
+            tarea = next((t for t in historial if t.id == id), None)
+            if tarea is None:
+                return None
+            self._reescribir_historial([t for t in historial if t.id != id])
+            tarea.completada = False
+            tarea.fecha_completada = None
+            self.tareas.append(tarea)
+            self._indexar(tarea)
+            self.guardar_tareas()
+            return tarea
+    
+    @escritura
+    def confirmar_archivado_remoto(self, ids):
+        with self._bloqueo_historial():
+            self.archivadas_pendientes = [i for i in self.archivadas_pendientes if i not in set(ids)]
+            self.guardar_indice_historial()
+    
+    @cronometrado("gestor_reescribir_historial")
+    def _reescribir_historial(self, historial):
+        # Bajo _bloqueo_historial; temporal y renombrar, porque otro proceso puede estar leyéndolo
+        temporal = self.archivo_historial.with_name(self.archivo_historial.name + ".tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            for tarea in historial:
+                f.write(json.dumps(tarea.to_dict(), ensure_ascii=False) + "\n")
+        os.replace(temporal, self.archivo_historial)
+        self._historial = historial
+        self.ids_archivadas = {t.id: t.proyecto_id for t in historial}
+        self.archivadas_pendientes = [i for i in self.archivadas_pendientes if i in self.ids_archivadas]
+        self.guardar_indice_historial()
+        self._avisar_tareas(None)  # Archivar solo agrega líneas; reescribir cambia lo ya leído
+
+# ========== NOTIFICACIONES ==========
+
+class NotificadorTareas:
+    """Recordatorios como una tarea asyncio (solo revisa las tareas activas).
+    
+    Duerme hasta el próximo recordatorio del índice de fechas (como mucho
+    un minuto) y se despierta antes si cambian las tareas.
+    """
+    def __init__(self, gestor):
+        self.gestor = gestor
+        self.activo = True
+        self.tarea = None
+        self.loop = None
+        self._despertar = None
+        self._fechas_invalidas = set()  # ids ya avisados por consola, para no repetirlo cada minuto
+        gestor.suscribir(self._cambio)
+    
+    def iniciar(self):
+        """Llamar desde el event loop"""
+        self.loop = asyncio.get_running_loop()
+        self._despertar = asyncio.Event()
+        self.tarea = self.loop.create_task(self._verificar_notificaciones())
+    
+    def detener(self):
+        self.activo = False
+        self._cambio(None)
+    
+    def _cambio(self, tipo):
+        # Desde cualquier hilo: una tarea nueva o editada puede adelantar el próximo aviso
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._despertar.set)
+    
+    async def _verificar_notificaciones(self):
+        while self.activo:
+            try:
+                avisar, espera = self.revisar(datetime.now())
+                for tarea in avisar:
+                    await self._notificar(tarea)
+                await self._dormir(espera)
+            except Exception as e:
+                print(f"Error en verificación de notificaciones: {e}")
+                await self._dormir(60)
+    
+    @cronometrado("notificador_revisar")
+    def revisar(self, ahora):
+        """(tareas que toca avisar, segundos hasta el siguiente aviso pendiente, como mucho 60)"""
+        aviso = timedelta(seconds=AVISO_PREVIO_NOTIFICACION)
+        # Solo el tramo del índice de fechas que vence antes del margen de aviso
+        limite = (ahora + aviso + timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M")
+        avisar = []
+        for tarea in self.gestor.query({"completada": False, "fecha_hasta": limite, "notificacion_enviada": False}):
+            fecha_prog = self._fecha(tarea)
+            
+            # Notificar si ya pasó la hora o está dentro de los próximos 5 minutos
+            if fecha_prog is not None and ahora >= fecha_prog - aviso:
+                avisar.append(tarea)
+        
+        espera = 60
+        # Sin orden_por, el índice de fechas las da por fecha: la primera legible es la próxima
+        for proxima in self.gestor.query({"completada": False, "fecha_desde": limite, "notificacion_enviada": False}):
+            fecha_prog = self._fecha(proxima)
+            if fecha_prog is not None:
+                espera = min(espera, max(1, (fecha_prog - aviso - ahora).total_seconds()))
+                break
+        return avisar, espera
+    
+    def _fecha(self, tarea):
+        """fecha_programada como datetime; None (y se salta la tarea) si no se entiende"""
+        fecha = leer_fecha(tarea.fecha_programada)
+        if fecha is None and tarea.id not in self._fechas_invalidas:
+            self._fechas_invalidas.add(tarea.id)
+            print(f"⚠️ Tarea {tarea.id}: fecha_programada '{tarea.fecha_programada}' no válida, sin recordatorio")
+        return fecha
+    
+    async def _dormir(self, segundos):
+        try:
+            await asyncio.wait_for(self._despertar.wait(), segundos)
+        except asyncio.TimeoutError:
+            pass
+        self._despertar.clear()
+    
+    async def _notificar(self, tarea):
+        proyecto = self.gestor.obtener_proyecto(tarea.proyecto_id)
+        proyecto_nombre = proyecto.nombre if proyecto else "Sin proyecto"
+        
+        try:
+            # plyer y la escritura a disco bloquean: fuera del event loop
+            await asyncio.to_thread(
+                self._mostrar_aviso,
+                title=f"⏰ Recordatorio: {tarea.titulo}",
+                message=f"Proyecto: {proyecto_nombre}\n{tarea.descripcion[:100]}",
+                app_name="Agenda de Proyectos",
+                timeout=10
+            )
+            await asyncio.to_thread(self.gestor.marcar_notificacion_enviada, tarea.id)
+            if METRICAS:
+                METRICAS.contar("notificaciones_enviadas")
+        except Exception as e:
+            print(f"Error al enviar notificación: {e}")
+    
+    @staticmethod
+    def _mostrar_aviso(**kwargs):
+        # plyer se importa con el primer aviso, no al arrancar
+        from plyer import notification
+        notification.notify(**kwargs)
 
 # ========== CLIENTE SINCRONIZACIÓN ==========
 
+class CircuitoAbierto(Exception):
+    """El backend se considera caído: la petición falla sin tocar la red"""
+
+class ListadoCambiado(RuntimeError):
+    """La hoja cambió entre dos páginas (cursor vencido): hay que empezar el listado de nuevo"""
+
+class CircuitBreaker:
+    """Cuenta fallos consecutivos; al llegar al umbral corta las peticiones
+    durante un tiempo (que crece si la prueba de salud vuelve a fallar)"""
+    def __init__(self, umbral=FALLOS_PARA_ABRIR_CIRCUITO, espera=ESPERA_CIRCUITO):
+        self.umbral = umbral
+        self.espera_base = espera
+        self.espera = espera
+        self.fallos = 0
+        self.abierto_hasta = None  # None = cerrado
+        self._lock = threading.Lock()
+    
+    @property
+    def abierto(self):
+        return self.abierto_hasta is not None
+    
+    def toca_probar(self):
+        with self._lock:
+            return self.abierto_hasta is not None and time.monotonic() >= self.abierto_hasta
+    
+    def exito(self):
+        with self._lock:
+            self.fallos = 0
+            self.abierto_hasta = None
+            self.espera = self.espera_base
+    
+    def fallo(self):
+        with self._lock:
+            self.fallos += 1
+            if self.abierto_hasta is not None:
+                # Falló la prueba de salud: esperar más antes de volver a probar
+                self.espera = min(self.espera * 2, ESPERA_CIRCUITO_MAX)
+                self.abierto_hasta = time.monotonic() + self.espera
+            elif self.fallos >= self.umbral:
+                self.abierto_hasta = time.monotonic() + self.espera
+                print(f"📴 Circuito abierto: backend sin respuesta, nuevo intento en {self.espera} s")
+
 class ClienteSincronizacion:
+    """Cliente asíncrono (httpx) del API de Apps Script. Todos los métodos son corrutinas"""
     def __init__(self, url_sheets):
         self.url = url_sheets
+        self._sesion = None  # httpx.AsyncClient, creado en la primera petición
+        self.circuito = CircuitBreaker()
+    
+    @property
+    def sesion(self):
+        if self._sesion is None:
+            import httpx
+            # Reutiliza conexiones TLS; Apps Script responde con un redirect a googleusercontent
+            self._sesion = httpx.AsyncClient(follow_redirects=True, limits=httpx.Limits(max_connections=MAX_PETICIONES_SIMULTANEAS))
+        return self._sesion
+    
+    @staticmethod
+    def _timeout(timeout):
+        import httpx
+        lectura, conexion = timeout
+        return httpx.Timeout(lectura, connect=conexion)
+    
+    async def cerrar(self):
+        if self._sesion is not None:
+            await self._sesion.aclose()
+    
+    async def salud(self):
+        """Prueba rápida de ?path=salud (no pasa por el circuito)"""
+        try:
+            response = await self.sesion.get(self.url, params={"path": "salud"}, timeout=self._timeout(TIMEOUT_SALUD))
+            return response.status_code == 200 and response.json().get("estado") == "ok"
+        except Exception:
+            return False
+    
+    async def _comprobar_circuito(self):
+        if not self.circuito.abierto:
+            return
+        if self.circuito.toca_probar():
+            if await self.salud():
+                print("📶 Backend disponible de nuevo, circuito cerrado")
+                self.circuito.exito()
+                return
+            self.circuito.fallo()
+        if METRICAS:
+            METRICAS.contar("sync_circuito_abierto")
+        raise CircuitoAbierto("Backend no disponible")
     
-    def traer_proyectos(self):
+    async def _peticion(self, metodo, params, json=None, timeout=TIMEOUT_LECTURA):
+        """Petición con circuit breaker y reintentos con jitter.
+        
+        Los GET se reintentan ante cualquier error de red o 5xx/429. Los POST
+        solo si no llegó a conectar, para no crear filas duplicadas en Sheets.
+        """
+        import httpx
+        await self._comprobar_circuito()
+        for intento in range(REINTENTOS_SYNC + 1):
+            inicio = time.perf_counter()
+            try:
+                response = await self.sesion.request(metodo, self.url, params=params, json=json, timeout=self._timeout(timeout))
+                if METRICAS:
+                    ruta = params.get("path", "")
+                    METRICAS.observar("sync_peticion", time.perf_counter() - inicio, metodo=metodo, ruta=ruta)
+                    METRICAS.contar("sync_respuestas", metodo=metodo, ruta=ruta, estado=response.status_code)
+                    METRICAS.contar("sync_bytes_recibidos", len(response.content), ruta=ruta)
+                if response.status_code >= 500 or response.status_code == 429:
+                    raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                self.circuito.exito()
+                return response
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if METRICAS:
+                    METRICAS.contar("sync_errores", metodo=metodo, ruta=params.get("path", ""), tipo=type(e).__name__)
+                self.circuito.fallo()
+                reintentable = metodo == "GET" or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not reintentable or intento == REINTENTOS_SYNC or self.circuito.abierto:
+                    raise
+                # Full jitter: evita que varios dispositivos reintenten a la vez
+                await asyncio.sleep(random.uniform(0, ESPERA_BASE_REINTENTO * 2 ** intento))
+    
+    async def traer_proyectos(self):
         try:
             if not self.url:
                 return None
-            response = requests.get(self.url + "?path=proyectos", timeout=10)
+            response = await self._peticion("GET", {"path": "proyectos"})
             if response.status_code == 200:
                 datos = response.json()
                 # El API devuelve {proyectos: [...]} así que accedemos a la lista correctamente
@@ -238,53 +1714,486 @@ class ClienteSincronizacion:
             print(f"❌ Error traer_proyectos: {e}")
         return None
     
-    def traer_tareas(self):
-        try:
-            if not self.url:
-                return None
-            response = requests.get(self.url + "?path=tareas", timeout=10)
-            if response.status_code == 200:
-                datos = response.json()
-                # El API devuelve {tareas: [...]} así que accedemos a la lista correctamente
-                tareas_lista = datos.get("tareas", [])
-                # Filtrar None (registros con IDs corruptos)
-                tareas = [Tarea.from_dict(t) for t in tareas_lista]
-                return [t for t in tareas if t is not None]
-        except Exception as e:
-            print(f"❌ Error traer_tareas: {e}")
-        return None
+    async def paginas_tareas(self, limite=TAMANO_PAGINA_SYNC):
+        """Generador asíncrono de páginas de tareas (?path=tareas&cursor=...&limit=...).
+        
+        Solo mantiene en memoria una página a la vez. Lanza excepción si una
+        página falla, para que quien consume no trabaje con datos a medias;
+        ListadoCambiado si la hoja cambió a mitad del listado.
+        """
+        if not self.url:
+            return
+        cursor = None
+        while True:
+            parametros = {"path": "tareas", "limit": limite}
+            if cursor:
+                parametros["cursor"] = cursor
+            response = await self._peticion("GET", parametros)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code} al leer tareas")
+            datos = response.json()
+            if datos.get("error") == "cursor_vencido":
+                raise ListadoCambiado("Las tareas de Sheets cambiaron durante la lectura")
+            if datos.get("error"):
+                raise RuntimeError(f"Sheets: {datos['error']}")
+            # Filtrar None (registros con IDs corruptos)
+            tareas = [Tarea.from_dict(t) for t in datos.get("tareas", [])]
+            yield [t for t in tareas if t is not None]
+            # Un backend sin paginación no devuelve siguiente_cursor: todo llegó en una página
+            cursor = datos.get("siguiente_cursor")
+            if not cursor:
+                break
+    
+    async def ids_tareas_remotas(self):
+        """IDs de las tareas en Sheets, leídos por páginas sin guardar los objetos.
+        Si la hoja cambia a mitad del listado se empieza de nuevo: con IDs de menos se duplicarían tareas"""
+        for intento in range(REINTENTOS_SYNC + 1):
+            ids = set()
+            try:
+                async for pagina in self.paginas_tareas():
+                    ids.update(int(t.id) for t in pagina)
+                return ids
+            except ListadoCambiado:
+                if intento == REINTENTOS_SYNC:
+                    raise
     
-    def enviar_proyecto(self, proyecto):
+    async def enviar_proyecto(self, proyecto):
         try:
-            response = requests.post(self.url + "?path=proyectos", json=proyecto.to_dict(), timeout=10)
+            response = await self._peticion("POST", {"path": "proyectos"}, json=proyecto.to_dict(), timeout=TIMEOUT_ESCRITURA)
             return response.status_code == 200
+        except CircuitoAbierto:
+            raise  # Cortar el envío en curso en lugar de fallar una a una
         except Exception as e:
             print(f"❌ Error enviar_proyecto: {e}")
             return False
     
-    def enviar_tarea(self, tarea):
+    async def enviar_tarea(self, tarea):
         try:
-            response = requests.post(self.url + "?path=tareas", json=tarea.to_dict(), timeout=10)
+            response = await self._peticion("POST", {"path": "tareas"}, json=tarea.to_dict(), timeout=TIMEOUT_ESCRITURA)
             return response.status_code == 200
+        except CircuitoAbierto:
+            raise  # Cortar el envío en curso en lugar de fallar una a una
         except Exception as e:
             print(f"❌ Error enviar_tarea: {e}")
             return False
+    
+    async def archivar_tareas(self, ids):
+        """Mueve las tareas indicadas de la hoja TAREAS a la hoja ARCHIVO"""
+        try:
+            response = await self._peticion("POST", {"path": "archivar"}, json={"ids": list(ids)}, timeout=TIMEOUT_ESCRITURA)
+            return response.status_code == 200
+        except CircuitoAbierto:
+            raise  # Cortar el envío en curso en lugar de fallar una a una
+        except Exception as e:
+            print(f"❌ Error archivar_tareas: {e}")
+            return False
+    
+    async def enviar_varios(self, enviar, elementos):
+        """Envía los elementos con como mucho MAX_PETICIONES_SIMULTANEAS en vuelo.
+        
+        Devuelve cuántos se enviaron bien. Si una petición lanza (p. ej.
+        CircuitoAbierto) se cancelan las demás y se propaga la excepción.
+        """
+        semaforo = asyncio.Semaphore(MAX_PETICIONES_SIMULTANEAS)
+        
+        async def limitado(elemento):
+            async with semaforo:
+                return await enviar(elemento)
+        
+        tareas = [asyncio.ensure_future(limitado(e)) for e in elementos]
+        try:
+            resultados = await asyncio.gather(*tareas)
+        except BaseException:
+            for t in tareas:
+                t.cancel()
+            raise
+        return sum(1 for ok in resultados if ok)
+
+# ========== SINCRONIZACIÓN AUTOMÁTICA ==========
+
+class SincronizadorAutomatico:
+    """Una única tarea asyncio que hace los ciclos traer/guardar con Google Sheets.
+    
+    El intervalo se adapta: corto tras una edición local, vuelve a la base
+    tras un ciclo con cambios y se duplica (hasta el tope) si no hubo
+    cambios o hubo error. Las peticiones manuales y las programadas se
+    juntan en una sola ejecución; nunca corren dos ciclos a la vez.
+    
+    La red va por el event loop; lo que toca el disco, en un hilo propio.
+    """
+    def __init__(self, gestor, cliente, al_cambiar_estado=None):
+        self.gestor = gestor
+        self.cliente = cliente
+        self.al_cambiar_estado = al_cambiar_estado  # funcion(estado, resultado)
+        self.activo = False
+        self.tarea = None
+        self.loop = None
+        self.intervalo = INTERVALO_SYNC_BASE
+        self.proxima = time.monotonic()
+        self.pendientes = set()  # Operaciones pedidas: "traer" y/o "guardar"
+        self._lock = threading.Lock()
+        self._despertar = None  # asyncio.Event, creado en el loop al iniciar
+        self._disco = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-disco")
+        self._hilo_propio = threading.local()
+        gestor.suscribir(self._cambio_local)
+    
+    def iniciar(self):
+        """Llamar desde el event loop"""
+        self.loop = asyncio.get_running_loop()
+        self._despertar = asyncio.Event()
+        self.activo = True
+        self.tarea = self.loop.create_task(self._bucle())
+    
+    def detener(self):
+        self.activo = False
+        self._avisar_loop()
+    
+    def _avisar_loop(self):
+        # Se llama desde cualquier hilo (handlers de Flet, escrituras del gestor)
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._despertar.set)
+    
+    def solicitar(self, *operaciones):
+        """Pide un ciclo ya; si hay uno en curso, se ejecuta uno solo al terminar"""
+        with self._lock:
+            self.pendientes.update(operaciones or ("traer", "guardar"))
+            self.proxima = time.monotonic()
+        self._avisar_loop()
+    
+    def _cambio_local(self, tipo):
+        # Lo que escribe el propio ciclo (datos traídos de Sheets) no es una edición local
+        if getattr(self._hilo_propio, "activo", False):
+            return
+        with self._lock:
+            self.pendientes.add("guardar")
+            self.proxima = min(self.proxima, time.monotonic() + INTERVALO_SYNC_RAPIDO)
+        self._avisar_loop()
+    
+    async def _en_disco(self, funcion, *args):
+        """Ejecuta funcion(*args) en el hilo de disco del sincronizador"""
+        def ejecutar():
+            self._hilo_propio.activo = True
+            try:
+                return funcion(*args)
+            finally:
+                self._hilo_propio.activo = False
+        return await asyncio.get_running_loop().run_in_executor(self._disco, ejecutar)
+    
+    async def _bucle(self):
+        while self.activo:
+            with self._lock:
+                espera = self.proxima - time.monotonic()
+            if espera > 0:
+                try:
+                    await asyncio.wait_for(self._despertar.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                self._despertar.clear()
+                continue
+            
+            with self._lock:
+                operaciones = self.pendientes or {"traer", "guardar"}
+                self.pendientes = set()
+                # Valor provisional; se recalcula al terminar el ciclo
+                self.proxima = time.monotonic() + INTERVALO_SYNC_MAX
+            
+            self._avisar("sincronizando", None)
+            inicio = time.perf_counter()
+            try:
+                resultado = {"traidas": 0, "enviadas": 0}
+                if "traer" in operaciones:
+                    resultado["traidas"] = await self._traer()
+                if "guardar" in operaciones:
+                    resultado["enviadas"] = await self._guardar()
+                
+                if resultado["traidas"] or resultado["enviadas"]:
+                    self.intervalo = INTERVALO_SYNC_BASE
+                else:
+                    self.intervalo = min(self.intervalo * 2, INTERVALO_SYNC_MAX)
+                self._avisar("ok", resultado)
+                if METRICAS:
+                    METRICAS.observar("sync_ciclo", time.perf_counter() - inicio, resultado="ok")
+                    METRICAS.contar("sync_tareas_traidas", resultado["traidas"])
+                    METRICAS.contar("sync_elementos_enviados", resultado["enviadas"])
+            except Exception as ex:
+                if METRICAS:
+                    METRICAS.observar("sync_ciclo", time.perf_counter() - inicio, resultado="error")
+                print(f"❌ Error en sincronización automática: {ex}")
+                self.intervalo = min(max(self.intervalo, INTERVALO_SYNC_BASE) * 2, INTERVALO_SYNC_MAX)
+                self._avisar("error", {"reintento": self.intervalo, "sin_conexion": self.cliente.circuito.abierto})
+            
+            with self._lock:
+                # Una edición durante el ciclo puede haber pedido una vuelta más pronta
+                siguiente = time.monotonic() + self.intervalo
+                if self.pendientes:
+                    siguiente = min(siguiente, time.monotonic() + INTERVALO_SYNC_RAPIDO)
+                self.proxima = siguiente
+    
+    def _avisar(self, estado, resultado):
+        if self.al_cambiar_estado:
+            try:
+                self.al_cambiar_estado(estado, resultado)
+            except Exception as e:
+                print(f"⚠️ Error al mostrar estado de sincronización: {e}")
+    
+    async def _traer(self):
+        """MERGE inteligente: agrega lo nuevo de Sheets sin perder lo local"""
+        p = await self.cliente.traer_proyectos()
+        if p is None:
+            raise RuntimeError("No se pudieron leer los proyectos de Sheets")
+        agregados = await self._en_disco(self.gestor.agregar_proyectos_remotos, p) if p else 0
+        
+        # Las tareas llegan por páginas y se fusionan a medida que llegan; se guarda una vez al final.
+        # Si la hoja cambia a mitad del listado se vuelve a empezar (las ya fusionadas no se repiten)
+        nuevas = 0
+        for intento in range(REINTENTOS_SYNC + 1):
+            try:
+                async for pagina in self.cliente.paginas_tareas():
+                    nuevas += await self._en_disco(self.gestor.fusionar_tareas_remotas, [pagina], False)
+                break
+            except ListadoCambiado:
+                if intento == REINTENTOS_SYNC:
+                    raise
+        if nuevas:
+            await self._en_disco(self.gestor.guardar_tareas)
+        return agregados + nuevas
+    
+    async def _guardar(self):
+        # Primero traer lo que existe en Sheets para no duplicar (las dos lecturas a la vez).
+        # Si falla alguna página se aborta, así no se duplican tareas en Sheets
+        proyectos_sheets, ids_tareas_sheets = await asyncio.gather(
+            self.cliente.traer_proyectos(),
+            self.cliente.ids_tareas_remotas(),
+        )
+        if proyectos_sheets is None:
+            raise RuntimeError("No se pudieron leer los proyectos de Sheets")
+        ids_proyectos_sheets = {int(p.id) for p in proyectos_sheets}
+        
+        # Enviar solo lo nuevo: proyectos antes que sus tareas (gestor.tareas ya excluye las archivadas)
+        enviados = await self.cliente.enviar_varios(
+            self.cliente.enviar_proyecto,
+            [p for p in list(self.gestor.proyectos) if int(p.id) not in ids_proyectos_sheets],
+        )
+        enviados += await self.cliente.enviar_varios(
+            self.cliente.enviar_tarea,
+            [t for t in list(self.gestor.tareas) if int(t.id) not in ids_tareas_sheets],
+        )
+        
+        # Mover en Sheets las tareas archivadas localmente (TAREAS -> ARCHIVO)
+        pendientes = list(self.gestor.archivadas_pendientes)
+        if pendientes and await self.cliente.archivar_tareas(pendientes):
+            await self._en_disco(self.gestor.confirmar_archivado_remoto, pendientes)
+        return enviados
+
+# ========== PLANIFICADOR DE RENDER ==========
+
+class PlanificadorRender:
+    """Junta las actualizaciones de la UI.
+    
+    Las regiones (funciones que ajustan controles) se marcan como sucias y
+    en el siguiente frame se reconstruye cada una una sola vez, seguido de un
+    único page.update(). Se puede llamar desde cualquier hilo.
+    
+    El frame corre en el event loop de la página (page.run_task): los hilos de
+    fondo no tocan controles, sino que publican funciones en una cola que se
+    aplica ahí, todas juntas, antes de reconstruir las regiones.
+    """
+    def __init__(self, page, intervalo=INTERVALO_FRAME):
+        self.page = page
+        self.intervalo = intervalo
+        self.regiones = {}  # nombre -> función (en orden de registro)
+        self.sucias = set()
+        self.updates = 0
+        self.acciones = {}  # acción -> [veces, page.update() que provocó]
+        self._hilo = threading.local()  # Acción del handler que corre en cada hilo
+        self._acciones_en_frame = set()
+        self._cola = deque()  # Funciones publicadas desde otros hilos
+        self._pendiente = False
+        self._lock = threading.Lock()
+    
+    def registrar(self, nombre, funcion):
+        self.regiones[nombre] = funcion
+    
+    def accion(self, nombre):
+        """Decorador de handlers: los marcar() hechos mientras corre (en su hilo) se atribuyen
+        a `nombre`, para medir cuántos page.update() provoca. Al terminar deja de atribuirse"""
+        def decorar(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                with self._lock:
+                    self.acciones.setdefault(nombre, [0, 0])[0] += 1
+                anterior = getattr(self._hilo, "accion", None)
+                self._hilo.accion = nombre
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self._hilo.accion = anterior
+            return envoltura
+        return decorar
+    
+    def marcar(self, *regiones):
+        """Marca regiones para reconstruir; sin argumentos solo pide un page.update()"""
+        accion = getattr(self._hilo, "accion", None)
+        with self._lock:
+            self.sucias.update(regiones)
+            if accion:
+                self._acciones_en_frame.add(accion)
+            self._programar()
+    
+    def publicar(self, funcion, *args):
+        """Encola `funcion(*args)` para ejecutarla en el event loop en el próximo frame"""
+        with self._lock:
+            self._cola.append((funcion, args))
+            self._programar()
+    
+    def _programar(self):
+        # Llamar con el lock tomado
+        if self._pendiente:
+            return
+        self._pendiente = True
+        try:
+            self.page.run_task(self._frame)
+        except Exception as e:
+            self._pendiente = False
+            print(f"⚠️ No se pudo programar el frame: {e}")
+    
+    async def _frame(self):
+        await asyncio.sleep(self.intervalo)
+        self.flush()
+    
+    def flush(self):
+        # Primero lo publicado por otros hilos: puede marcar más regiones para este frame
+        with self._lock:
+            publicadas = list(self._cola)
+            self._cola.clear()
+        for funcion, args in publicadas:
+            try:
+                funcion(*args)
+            except Exception as e:
+                print(f"❌ Error al aplicar un resultado en la UI: {e}")
+        
+        with self._lock:
+            sucias = self.sucias
+            acciones = self._acciones_en_frame
+            self.sucias = set()
+            self._acciones_en_frame = set()
+            self._pendiente = False
+        
+        try:
+            for nombre, funcion in self.regiones.items():
+                if nombre in sucias:
+                    if METRICAS:
+                        with METRICAS.cronometro("ui_region", region=nombre):
+                            funcion()
+                    else:
+                        funcion()
+            if METRICAS:
+                with METRICAS.cronometro("ui_page_update"):
+                    self.page.update()
+            else:
+                self.page.update()
+        except Exception as e:
+            print(f"❌ Error al actualizar la UI: {e}")
+        
+        with self._lock:
+            self.updates += 1
+            for accion in acciones:
+                self.acciones[accion][1] += 1
+    
+    def estadisticas(self):
+        """{acción: (veces, page.update() por vez)}"""
+        with self._lock:
+            return {a: (veces, round(updates / veces, 2) if veces else 0.0)
+                    for a, (veces, updates) in self.acciones.items()}
+
+# ========== CACHÉ DE TARJETAS ==========
+
+class CacheTarjetas:
+    """Controles memoizados por (id, firma), con expulsión LRU.
+    
+    La firma hace de versión del registro: mientras no cambie, la tarjeta se
+    reutiliza tal cual (también al volver a un proyecto ya visitado).
+    """
+    def __init__(self, capacidad=MAX_TARJETAS_CACHE):
+        self.capacidad_base = capacidad
+        self.capacidad = capacidad
+        self.tarjetas = OrderedDict()  # id -> (firma, control), la más reciente al final
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, id, firma, crear):
+        actual = self.tarjetas.get(id)
+        if actual is not None and actual[0] == firma:
+            self.aciertos += 1
+            self.tarjetas.move_to_end(id)
+            if METRICAS:
+                METRICAS.contar("ui_tarjetas_reutilizadas")
+            return actual[1]
+        self.fallos += 1
+        if METRICAS:
+            METRICAS.contar("ui_tarjetas_construidas")
+        control = crear()
+        self.tarjetas[id] = (firma, control)
+        self.tarjetas.move_to_end(id)
+        while len(self.tarjetas) > self.capacidad:
+            self.tarjetas.popitem(last=False)
+        return control
+    
+    def asegurar_capacidad(self, visibles):
+        """Lo que está en pantalla tiene que entrar: si no, cada render expulsaría tarjetas
+        visibles y las volvería a construir. Al volver a una vista corta, recupera la base"""
+        self.capacidad = max(self.capacidad_base, visibles)
+    
+    def descartar(self, id):
+        self.tarjetas.pop(id, None)
+    
+    def limpiar(self):
+        self.tarjetas.clear()
 
 # ========== APLICACIÓN FLET ==========
 
-def main(page: ft.Page):
+# ========== ARRANQUE ==========
+TIEMPO_IMPORTS = time.perf_counter() - _INICIO_IMPORTS
+ARRANQUE = {}  # fase -> segundos desde que empieza main (lo rellena main)
+
+def informe_arranque():
+    """Imprime los tiempos de arranque (y los pasa a las métricas si están activas)"""
+    partes = [f"imports {TIEMPO_IMPORTS * 1000:.0f} ms"]
+    partes += [f"{fase.replace('_', ' ')} {segundos * 1000:.0f} ms" for fase, segundos in ARRANQUE.items()]
+    print("⏱️ Arranque: " + " · ".join(partes))
+    if METRICAS:
+        METRICAS.observar("arranque", TIEMPO_IMPORTS, fase="imports")
+        for fase, segundos in ARRANQUE.items():
+            METRICAS.observar("arranque", segundos, fase=fase)
+
+async def main(page: ft.Page):
+    inicio_main = time.perf_counter()
+    ARRANQUE.clear()
     page.title = "Agenda de Proyectos"
     page.vertical_alignment = ft.MainAxisAlignment.START
     page.horizontal_alignment = ft.CrossAxisAlignment.START
     
     # ========== ESTADO GLOBAL ==========
-    gestor = GestorDatos()
+    loop = asyncio.get_running_loop()
+    # Antes del primer frame solo se leen proyectos.json y el resumen de conteos;
+    # tareas.json, el archivado, el notificador y la sync van después (completar_arranque)
+    gestor = await loop.run_in_executor(None, functools.partial(GestorDatos, diferir_tareas=True))
+    notificador = NotificadorTareas(gestor)
     cliente_sync = ClienteSincronizacion(GOOGLE_SHEETS_URL) if GOOGLE_SHEETS_URL else None
     proyecto_seleccionado = None
     proyecto_editando = None
     tarea_editando = None
+    mostrando_historial = False
+    limite_visible = TAMANO_VENTANA_TAREAS  # Tarjetas de tareas construidas (crece con el scroll)
+    texto_busqueda = ""
+    modo_orden = "prioridad"
+    mostrando_agenda = False
+    mostrando_estadisticas = False
+    buscar_archivadas = False  # La búsqueda actual incluye el archivo (se pide con un botón)
+    vista_columnar = None  # analitica.VistaColumnar, creada al abrir las estadísticas (False sin numpy)
     
     lbl_estado_sync = ft.Text("📂 Datos en local", size=11, color=ft.Colors.GREY_600)
+    render = PlanificadorRender(page)
     
     # ========== FORMULARIOS DE PROYECTO ==========
     proyecto_nombre_field = ft.TextField(label="Nombre del proyecto", filled=True, expand=True)
@@ -299,13 +2208,14 @@ def main(page: ft.Page):
     
     def cerrar_dialogo_proyecto(e):
         dialogo_proyecto.open = False
-        page.update()
+        render.marcar()
     
+    @render.accion("guardar_proyecto")
     def guardar_proyecto(e):
         nonlocal proyecto_editando
         if not proyecto_nombre_field.value or not proyecto_nombre_field.value.strip():
             proyecto_nombre_field.error_text = "El nombre es requerido"
-            page.update()
+            render.marcar()
             return
         
         proyecto_nombre_field.error_text = None
@@ -366,7 +2276,7 @@ def main(page: ft.Page):
         
         proyecto_nombre_field.error_text = None
         dialogo_proyecto.open = True
-        page.update()
+        render.marcar()
     
     # ========== FORMULARIOS DE TAREA ==========
     tarea_titulo_field = ft.TextField(label="Título de la tarea", filled=True, expand=True)
@@ -384,16 +2294,18 @@ def main(page: ft.Page):
     
     def cerrar_dialogo_tarea(e):
         dialogo_tarea.open = False
-        page.update()
+        render.marcar()
     
+    @render.accion("guardar_tarea")
     def guardar_tarea(e):
         nonlocal proyecto_seleccionado
         if not tarea_titulo_field.value or not tarea_titulo_field.value.strip():
             tarea_titulo_field.error_text = "El título es requerido"
-            page.update()
+            render.marcar()
             return
         
-        if not proyecto_seleccionado:
+        # Desde los resultados de búsqueda se puede editar sin proyecto seleccionado
+        if not proyecto_seleccionado and not tarea_editando:
             return
         
         tarea_titulo_field.error_text = None
@@ -405,7 +2317,7 @@ def main(page: ft.Page):
                 datetime.strptime(fecha_prog, "%Y-%m-%d %H:%M")
             except:
                 fecha_programada_field.error_text = "Formato inválido"
-                page.update()
+                render.marcar()
                 return
         
         if tarea_editando:
@@ -485,19 +2397,79 @@ def main(page: ft.Page):
         tarea_titulo_field.error_text = None
         fecha_programada_field.error_text = None
         dialogo_tarea.open = True
-        page.update()
+        render.marcar()
+    
+    # ========== DIÁLOGO DE CONFIRMACIÓN ==========
+    # Un solo diálogo reutilizado para todas las confirmaciones: page.overlay no
+    # crece con cada clic en "Eliminar" y no hay diálogos muertos en cada update.
+    accion_confirmada = None
+    texto_confirmacion = ft.Text("")
+    
+    def cerrar_confirmacion(e=None):
+        nonlocal accion_confirmada
+        accion_confirmada = None
+        dialogo_confirmacion.open = False
+        limpiar_overlay()
+        render.marcar()
+    
+    def aceptar_confirmacion(e):
+        accion = accion_confirmada
+        cerrar_confirmacion()
+        if accion:
+            accion()
+    
+    dialogo_confirmacion = ft.AlertDialog(
+        modal=True,
+        title=ft.Text("Confirmar eliminación"),
+        content=texto_confirmacion,
+        actions=[
+            ft.TextButton("Cancelar", on_click=cerrar_confirmacion),
+            ft.FilledButton("Eliminar", on_click=aceptar_confirmacion, style=ft.ButtonStyle(bgcolor=ft.Colors.RED_400)),
+        ],
+    )
+    page.overlay.append(dialogo_confirmacion)
+    overlays_fijos = {id(dialogo_proyecto), id(dialogo_tarea), id(dialogo_confirmacion)}
+    
+    def pedir_confirmacion(mensaje, accion):
+        nonlocal accion_confirmada
+        accion_confirmada = accion
+        texto_confirmacion.value = mensaje
+        dialogo_confirmacion.open = True
+        render.marcar()
+    
+    def limpiar_overlay():
+        """Quita del overlay los controles transitorios ya cerrados"""
+        page.overlay[:] = [c for c in page.overlay if id(c) in overlays_fijos or getattr(c, "open", False)]
+    
+    # ========== RECONCILIACIÓN DE LISTAS ==========
+    # Una tarjeta se reutiliza mientras su firma no cambie, así Flet solo envía
+    # las tarjetas nuevas o modificadas y los movimientos.
+    tarjetas_proyectos = CacheTarjetas()
+    tarjetas_tareas = CacheTarjetas()
+    
+    def reconciliar(tarjetas, elementos, firma, crear):
+        # Las tarjetas fuera de la vista siguen en la caché hasta que el LRU las expulse
+        tarjetas.asegurar_capacidad(len(elementos))
+        return [tarjetas.obtener(e.id, firma(e), lambda e=e: crear(e)) for e in elementos]
+    
+    def firma_tarea(tarea):
+        return (tarea.titulo, tarea.descripcion, tarea.completada, tarea.fecha_programada,
+                tarea.notificacion_enviada, tarea.fecha_creacion, tarea.prioridad)
     
     # ========== VISTA DE PROYECTOS ==========
     
-    def crear_tarjeta_proyecto(proyecto):
-        tareas_proyecto = gestor.obtener_tareas_proyecto(proyecto.id)
-        total = len(tareas_proyecto)
-        completadas = sum(1 for t in tareas_proyecto if t.completada)
+    def crear_tarjeta_proyecto(proyecto, total, completadas, vencidas=0):
         progreso = completadas / total if total > 0 else 0
         
+        @render.accion("seleccionar_proyecto")
         def seleccionar_proyecto(e):
-            nonlocal proyecto_seleccionado
+            nonlocal proyecto_seleccionado, mostrando_historial, mostrando_agenda, limite_visible, texto_busqueda
             proyecto_seleccionado = proyecto
+            mostrando_historial = False
+            mostrando_agenda = False
+            limite_visible = TAMANO_VENTANA_TAREAS
+            texto_busqueda = ""
+            campo_busqueda.value = ""
             actualizar_tareas()
             actualizar_layout()
         
@@ -505,36 +2477,22 @@ def main(page: ft.Page):
             abrir_formulario_proyecto(proyecto)
         
         def eliminar_proyecto(e):
-            def confirmar(e):
+            def confirmar():
                 gestor.eliminar_proyecto(proyecto.id)
-                dialogo_conf.open = False
+                tarjetas_proyectos.descartar(proyecto.id)
                 nonlocal proyecto_seleccionado
                 if proyecto_seleccionado and proyecto_seleccionado.id == proyecto.id:
                     proyecto_seleccionado = None
                 actualizar_proyectos()
                 actualizar_tareas()
             
-            def cancelar(e):
-                dialogo_conf.open = False
-                page.update()
-            
-            dialogo_conf = ft.AlertDialog(
-                modal=True,
-                title=ft.Text("Confirmar eliminación"),
-                content=ft.Text(f"¿Eliminar el proyecto '{proyecto.nombre}' y todas sus tareas?"),
-                actions=[
-                    ft.TextButton("Cancelar", on_click=cancelar),
-                    ft.FilledButton("Eliminar", on_click=confirmar, style=ft.ButtonStyle(bgcolor=ft.Colors.RED_400)),
-                ],
-            )
-            page.overlay.append(dialogo_conf)
-            dialogo_conf.open = True
-            page.update()
+            pedir_confirmacion(f"¿Eliminar el proyecto '{proyecto.nombre}' y todas sus tareas?", confirmar)
         
         es_seleccionado = proyecto_seleccionado and proyecto_seleccionado.id == proyecto.id
         color_proyecto = COLORES_PROYECTO.get(proyecto.color, ft.Colors.BLUE_400)
         
         return ft.GestureDetector(
+            key=f"proyecto-{proyecto.id}",
             content=ft.Card(
                 content=ft.Container(
                     content=ft.Column([
@@ -545,6 +2503,13 @@ def main(page: ft.Page):
                                 ft.Row([
                                     ft.Text(f"{completadas}/{total}", size=11, color=ft.Colors.GREY_600, weight=ft.FontWeight.BOLD),
                                     ft.Text(f"tareas completadas", size=11, color=ft.Colors.GREY_600),
+                                    ft.Container(
+                                        content=ft.Text(f"{vencidas} vencidas", size=10, color=ft.Colors.WHITE, weight=ft.FontWeight.BOLD),
+                                        bgcolor=ft.Colors.RED_400,
+                                        border_radius=8,
+                                        padding=ft.Padding.symmetric(horizontal=6, vertical=1),
+                                        visible=vencidas > 0,
+                                    ),
                                 ], spacing=4),
                                 ft.ProgressBar(value=progreso, color=color_proyecto, bgcolor=ft.Colors.GREY_200, height=4, border_radius=2),
                             ], spacing=4, expand=True),
@@ -566,25 +2531,38 @@ def main(page: ft.Page):
     
     lista_proyectos = ft.Column(spacing=8, scroll=ft.ScrollMode.AUTO)
     
-    def actualizar_proyectos():
-        lista_proyectos.controls.clear()
-        
+    def construir_proyectos():
         if not gestor.proyectos:
-            lista_proyectos.controls.append(
+            tarjetas_proyectos.limpiar()
+            lista_proyectos.controls = [
                 ft.Container(
                     content=ft.Text("No hay proyectos", size=12, color=ft.Colors.GREY_500),
                     padding=20,
                 )
-            )
+            ]
         else:
-            for proyecto in sorted(gestor.proyectos, key=lambda p: -p.id):
-                lista_proyectos.controls.append(crear_tarjeta_proyecto(proyecto))
-        
-        page.update()
+            if gestor.tareas_cargadas.is_set() and not gestor.error_carga_tareas:
+                conteos = gestor.contar_por_proyecto()
+                vencidas = gestor.vencidas_por_proyecto()
+            else:
+                # Primer frame: conteos del resumen mientras se lee tareas.json (o si no se pudo leer)
+                conteos, vencidas = gestor.resumen
+            
+            def firma(proyecto):
+                seleccionado = bool(proyecto_seleccionado and proyecto_seleccionado.id == proyecto.id)
+                return (proyecto.nombre, proyecto.color, conteos.get(proyecto.id, (0, 0)), vencidas.get(proyecto.id, 0), seleccionado)
+            
+            lista_proyectos.controls = reconciliar(
+                tarjetas_proyectos,
+                sorted(gestor.proyectos, key=lambda p: -p.id),
+                firma,
+                lambda p: crear_tarjeta_proyecto(p, *conteos.get(p.id, (0, 0)), vencidas.get(p.id, 0)),
+            )
     
     # ========== VISTA DE TAREAS ==========
     
     def crear_tarjeta_tarea(tarea):
+        @render.accion("toggle_check")
         def toggle_check(e):
             gestor.toggle_completada(tarea.id)
             actualizar_tareas()
@@ -594,28 +2572,13 @@ def main(page: ft.Page):
             abrir_formulario_tarea(tarea)
         
         def eliminar_click(e):
-            def confirmar(e):
+            def confirmar():
                 gestor.eliminar_tarea(tarea.id)
-                dialogo_conf.open = False
+                tarjetas_tareas.descartar(tarea.id)  # El id puede volver a usarse
                 actualizar_tareas()
                 actualizar_proyectos()
             
-            def cancelar(e):
-                dialogo_conf.open = False
-                page.update()
-            
-            dialogo_conf = ft.AlertDialog(
-                modal=True,
-                title=ft.Text("Confirmar eliminación"),
-                content=ft.Text(f"¿Eliminar la tarea '{tarea.titulo}'?"),
-                actions=[
-                    ft.TextButton("Cancelar", on_click=cancelar),
-                    ft.FilledButton("Eliminar", on_click=confirmar, style=ft.ButtonStyle(bgcolor=ft.Colors.RED_400)),
-                ],
-            )
-            page.overlay.append(dialogo_conf)
-            dialogo_conf.open = True
-            page.update()
+            pedir_confirmacion(f"¿Eliminar la tarea '{tarea.titulo}'?", confirmar)
         
         notif_icon = None
         if tarea.fecha_programada:
@@ -627,6 +2590,7 @@ def main(page: ft.Page):
             )
         
         return ft.Card(
+            key=f"tarea-{tarea.id}",
             content=ft.Container(
                 content=ft.Row([
                     ft.Checkbox(value=tarea.completada, on_change=toggle_check),
@@ -651,7 +2615,10 @@ def main(page: ft.Page):
                             max_lines=3,
                             overflow=ft.TextOverflow.ELLIPSIS
                         ),
-                        ft.Text(f"Creada: {tarea.fecha_creacion}", size=10, color=ft.Colors.GREY_500),
+                        ft.Row([
+                            ft.Text(f"Creada: {tarea.fecha_creacion}", size=10, color=ft.Colors.GREY_500),
+                            ft.Text(tarea.prioridad, size=10, weight=ft.FontWeight.BOLD, color=COLORES_PRIORIDAD.get(tarea.prioridad, ft.Colors.GREY_500)),
+                        ], spacing=8),
                     ], spacing=3, expand=True),
                     ft.Row([
                         ft.IconButton(icon=ft.Icons.EDIT, icon_size=20, icon_color=ft.Colors.BLUE_400, on_click=editar_click),
@@ -663,25 +2630,268 @@ def main(page: ft.Page):
             elevation=1,
         )
     
+    def crear_tarjeta_archivada(tarea):
+        def restaurar_click(e):
+            gestor.restaurar_tarea(tarea.id)
+            actualizar_tareas()
+            actualizar_proyectos()
+        
+        return ft.Card(
+            content=ft.Container(
+                content=ft.Row([
+                    ft.Icon(ft.Icons.ARCHIVE, size=20, color=ft.Colors.GREY_400),
+                    ft.Column([
+                        ft.Text(tarea.titulo, size=14, color=ft.Colors.GREY_700, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS),
+                        ft.Text(f"Completada: {tarea.fecha_completada}", size=10, color=ft.Colors.GREY_500),
+                    ], spacing=3, expand=True),
+                    ft.IconButton(icon=ft.Icons.UNARCHIVE, icon_size=20, icon_color=ft.Colors.BLUE_400, on_click=restaurar_click, tooltip="Restaurar"),
+                ], alignment=ft.MainAxisAlignment.START),
+                padding=12,
+            ),
+            elevation=0,
+        )
+    
     def volver_a_proyectos(e):
-        nonlocal proyecto_seleccionado
+        nonlocal proyecto_seleccionado, mostrando_historial, mostrando_agenda, mostrando_estadisticas, limite_visible, texto_busqueda
         proyecto_seleccionado = None
+        mostrando_historial = False
+        mostrando_agenda = False
+        mostrando_estadisticas = False
+        boton_estadisticas.icon_color = None
+        limite_visible = TAMANO_VENTANA_TAREAS
+        texto_busqueda = ""
+        campo_busqueda.value = ""
         actualizar_tareas()
         actualizar_layout()
     
+    def alternar_historial(e):
+        nonlocal mostrando_historial
+        mostrando_historial = not mostrando_historial
+        actualizar_tareas()
+    
+    def alternar_agenda(e):
+        nonlocal mostrando_agenda, mostrando_estadisticas, limite_visible
+        mostrando_agenda = not mostrando_agenda
+        mostrando_estadisticas = False
+        limite_visible = TAMANO_VENTANA_TAREAS
+        boton_agenda.icon_color = ft.Colors.BLUE_400 if mostrando_agenda else None
+        boton_estadisticas.icon_color = None
+        actualizar_tareas()
+        actualizar_layout()
+        actualizar_proyectos()  # Los contadores de vencidas dependen de la hora
+    
+    def alternar_estadisticas(e):
+        nonlocal mostrando_estadisticas, mostrando_agenda
+        mostrando_estadisticas = not mostrando_estadisticas
+        mostrando_agenda = False
+        boton_estadisticas.icon_color = ft.Colors.BLUE_400 if mostrando_estadisticas else None
+        boton_agenda.icon_color = None
+        actualizar_tareas()
+        actualizar_layout()
+    
+    boton_agenda = ft.IconButton(icon=ft.Icons.CALENDAR_MONTH, icon_size=20, tooltip="Agenda", on_click=alternar_agenda)
+    boton_estadisticas = ft.IconButton(icon=ft.Icons.INSIGHTS, icon_size=22, tooltip="Estadísticas", on_click=alternar_estadisticas)
     boton_volver = ft.IconButton(icon=ft.Icons.ARROW_BACK, icon_size=24, on_click=volver_a_proyectos, visible=False, tooltip="Volver a proyectos")
     boton_nueva_tarea = ft.FilledButton("Nueva Tarea", icon=ft.Icons.ADD, on_click=lambda e: abrir_formulario_tarea(), disabled=True)
     fab_nueva_tarea = ft.FloatingActionButton(icon=ft.Icons.ADD, on_click=lambda e: abrir_formulario_tarea(), bgcolor=ft.Colors.BLUE_400)
+    
+    def cambiar_orden(e):
+        nonlocal modo_orden, limite_visible
+        modo_orden = selector_orden.value
+        limite_visible = TAMANO_VENTANA_TAREAS
+        actualizar_tareas()
+    
+    selector_orden = ft.Dropdown(
+        options=[
+            ft.dropdown.Option(key="prioridad", text="Prioridad"),
+            ft.dropdown.Option(key="fecha", text="Fecha"),
+            ft.dropdown.Option(key="creacion", text="Creación"),
+        ],
+        value="prioridad",
+        on_select=cambiar_orden,
+        dense=True,
+        width=140,
+        tooltip="Ordenar tareas",
+    )
+    boton_historial = ft.IconButton(icon=ft.Icons.HISTORY, icon_size=22, on_click=alternar_historial, disabled=True, tooltip="Ver tareas archivadas")
     titulo_tareas = ft.Text("Tareas", size=22, weight=ft.FontWeight.BOLD)
     
-    lista_tareas = ft.Column(spacing=10, scroll=ft.ScrollMode.AUTO, expand=True)
+    def cargar_mas_tareas(e=None):
+        nonlocal limite_visible
+        limite_visible += TAMANO_VENTANA_TAREAS
+        actualizar_tareas()
     
-    def actualizar_tareas():
+    def scroll_tareas(e):
+        # Scroll infinito: al acercarse al final se construye el siguiente tramo
+        if boton_cargar_mas.visible and e.pixels >= e.max_scroll_extent - 300:
+            cargar_mas_tareas()
+    
+    boton_cargar_mas = ft.TextButton("Mostrar más", icon=ft.Icons.EXPAND_MORE, on_click=cargar_mas_tareas, visible=False)
+    
+    # ListView: Flutter solo dibuja lo visible, y desde Python solo se construye
+    # el tramo ya alcanzado con el scroll (no las miles de tarjetas del proyecto)
+    lista_tareas = ft.ListView(spacing=10, expand=True, on_scroll=scroll_tareas, scroll_interval=100)
+    
+    # ========== ESTADÍSTICAS ==========
+    
+    def obtener_vista_columnar():
+        nonlocal vista_columnar
+        if vista_columnar is None:
+            # numpy se importa al abrir el panel por primera vez, no al arrancar
+            import analitica
+            try:
+                vista_columnar = analitica.VistaColumnar(gestor)
+            except RuntimeError as e:
+                print(f"⚠️ {e}")
+                vista_columnar = False
+        return vista_columnar
+    
+    def tarjeta_dato(etiqueta, valor, color=ft.Colors.BLUE_400):
+        return ft.Container(
+            content=ft.Column([
+                ft.Text(str(valor), size=22, weight=ft.FontWeight.BOLD, color=color),
+                ft.Text(etiqueta, size=11, color=ft.Colors.GREY_600),
+            ], spacing=2, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+            padding=12,
+            bgcolor=ft.Colors.GREY_100,
+            border_radius=8,
+            expand=True,
+        )
+    
+    def construir_estadisticas(resumen):
+        controles = [
+            ft.Row([
+                tarjeta_dato("Tareas", resumen["total"]),
+                tarjeta_dato("Pendientes", resumen["pendientes"], ft.Colors.ORANGE_400),
+                tarjeta_dato(f"Completadas ({resumen['tasa']:.0%})", resumen["completadas"], ft.Colors.GREEN_400),
+                tarjeta_dato("Vencidas", resumen["vencidas"], ft.Colors.RED_400),
+            ], spacing=10),
+            ft.Text("Por semana (con archivadas) · creadas / completadas · tasa acumulada", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700),
+        ]
+        maximo = max([max(s["creadas"], s["completadas"]) for s in resumen["semanas"]] + [1])
+        for semana in resumen["semanas"]:
+            controles.append(ft.Row([
+                ft.Text(semana["inicio"].strftime("%d/%m"), size=12, width=48, color=ft.Colors.GREY_600),
+                ft.Column([
+                    ft.ProgressBar(value=semana["creadas"] / maximo, color=ft.Colors.BLUE_300, bgcolor=ft.Colors.GREY_200, height=6, border_radius=3),
+                    ft.ProgressBar(value=semana["completadas"] / maximo, color=ft.Colors.GREEN_400, bgcolor=ft.Colors.GREY_200, height=6, border_radius=3),
+                ], spacing=3, expand=True),
+                ft.Text(f"{semana['creadas']} / {semana['completadas']}", size=12, width=70, text_align=ft.TextAlign.RIGHT),
+                ft.Text(f"{semana['tasa']:.0%}", size=12, width=44, text_align=ft.TextAlign.RIGHT, color=ft.Colors.GREY_600),
+            ], spacing=10, vertical_alignment=ft.CrossAxisAlignment.CENTER))
+        
+        controles.append(ft.Text("Pendientes por prioridad", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700))
+        for prioridad, cantidad in resumen["prioridades"].items():
+            controles.append(ft.Row([
+                ft.Text(prioridad, size=12, width=48, color=COLORES_PRIORIDAD.get(prioridad, ft.Colors.GREY_500), weight=ft.FontWeight.BOLD),
+                ft.ProgressBar(value=cantidad / resumen["pendientes"] if resumen["pendientes"] else 0,
+                               color=COLORES_PRIORIDAD.get(prioridad, ft.Colors.GREY_500), bgcolor=ft.Colors.GREY_200,
+                               height=8, border_radius=4, expand=True),
+                ft.Text(str(cantidad), size=12, width=70, text_align=ft.TextAlign.RIGHT),
+            ], spacing=10, vertical_alignment=ft.CrossAxisAlignment.CENTER))
+        return controles
+    
+    def construir_tareas():
         lista_tareas.controls.clear()
+        boton_cargar_mas.visible = False
         
-        if not proyecto_seleccionado:
+        if not gestor.tareas_cargadas.is_set() or gestor.error_carga_tareas:
+            boton_nueva_tarea.disabled = True
+            fab_nueva_tarea.disabled = True
+            boton_historial.disabled = True
+            titulo_tareas.value = proyecto_seleccionado.nombre if proyecto_seleccionado else "Tareas"
+            if gestor.error_carga_tareas:
+                estado = ft.Text(f"No se pudo cargar tareas.json: {gestor.error_carga_tareas}", size=14, color=ft.Colors.RED_400)
+            else:
+                estado = ft.Row([
+                    ft.ProgressRing(width=16, height=16, stroke_width=2),
+                    ft.Text("Cargando tareas...", size=14, color=ft.Colors.GREY_500),
+                ], spacing=10)
+            lista_tareas.controls.append(ft.Container(content=estado, padding=20))
+        elif texto_busqueda:
+            boton_historial.disabled = True
+            resultados = sorted(gestor.buscar(texto_busqueda), key=MODOS_ORDEN[modo_orden])
+            titulo_tareas.value = f"Resultados: {len(resultados)}"
+            
+            if not resultados:
+                lista_tareas.controls.append(
+                    ft.Container(
+                        content=ft.Text(f"Sin resultados para '{texto_busqueda}'", size=14, color=ft.Colors.GREY_500),
+                        padding=20,
+                    )
+                )
+            else:
+                lista_tareas.controls = reconciliar(tarjetas_tareas, resultados[:MAX_RESULTADOS_BUSQUEDA], firma_tarea, crear_tarjeta_tarea)
+            
+            # El archivo solo se lee si se pide: las archivadas no están en el índice de búsqueda
+            if not buscar_archivadas:
+                lista_tareas.controls.append(
+                    ft.TextButton("Buscar también en archivadas", icon=ft.Icons.ARCHIVE, on_click=incluir_archivadas)
+                )
+            else:
+                archivadas = gestor.buscar_en_historial(texto_busqueda)
+                lista_tareas.controls.append(ft.Text(f"Archivadas · {len(archivadas)}", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700))
+                for tarea in sorted(archivadas, key=lambda t: t.fecha_completada or "", reverse=True)[:MAX_RESULTADOS_BUSQUEDA]:
+                    lista_tareas.controls.append(crear_tarjeta_archivada(tarea))
+        elif mostrando_estadisticas:
+            # Del proyecto seleccionado o de todos; la vista columnar solo aplica las tareas cambiadas
             boton_nueva_tarea.disabled = True
             fab_nueva_tarea.disabled = True
+            boton_historial.disabled = True
+            titulo_tareas.value = f"{proyecto_seleccionado.nombre if proyecto_seleccionado else 'Todos los proyectos'} · Estadísticas"
+            vista = obtener_vista_columnar()
+            if not vista:
+                lista_tareas.controls.append(
+                    ft.Container(
+                        content=ft.Text("Las estadísticas necesitan numpy (pip install numpy)", size=14, color=ft.Colors.GREY_500),
+                        padding=20,
+                    )
+                )
+            else:
+                resumen = vista.resumen(proyecto_seleccionado.id if proyecto_seleccionado else None)
+                lista_tareas.controls.extend(construir_estadisticas(resumen))
+        elif mostrando_agenda:
+            # Rangos del índice de fechas: atrasadas y luego día a día
+            boton_nueva_tarea.disabled = True
+            fab_nueva_tarea.disabled = True
+            boton_historial.disabled = True
+            hoy = datetime.now().date()
+            titulo_tareas.value = "Agenda"
+            grupos = [("Atrasadas", gestor.tareas_entre("", hoy.strftime("%Y-%m-%d")))]
+            for dias in range(DIAS_AGENDA):
+                dia = hoy + timedelta(days=dias)
+                etiqueta = "Hoy" if dias == 0 else "Mañana" if dias == 1 else f"{DIAS_SEMANA[dia.weekday()]} {dia.strftime('%d/%m')}"
+                grupos.append((etiqueta, gestor.tareas_entre(dia.strftime("%Y-%m-%d"), (dia + timedelta(days=1)).strftime("%Y-%m-%d"))))
+            
+            total = sum(len(tareas) for _, tareas in grupos)
+            if not total:
+                lista_tareas.controls.append(
+                    ft.Container(
+                        content=ft.Text(f"Nada programado para los próximos {DIAS_AGENDA} días", size=14, color=ft.Colors.GREY_500),
+                        padding=20,
+                    )
+                )
+            else:
+                # Mismo tope que la lista de un proyecto; las cabeceras no cuentan
+                ventana = [t for _, tareas in grupos for t in tareas][:limite_visible]
+                tarjetas = iter(reconciliar(tarjetas_tareas, ventana, firma_tarea, crear_tarjeta_tarea))
+                restantes = len(ventana)
+                for etiqueta, tareas in grupos:
+                    if not tareas or not restantes:
+                        continue
+                    lista_tareas.controls.append(ft.Text(f"{etiqueta} · {len(tareas)}", size=13, weight=ft.FontWeight.BOLD, color=ft.Colors.GREY_700))
+                    for _ in tareas[:restantes]:
+                        lista_tareas.controls.append(next(tarjetas))
+                    restantes -= min(len(tareas), restantes)
+                
+                if total > len(ventana):
+                    boton_cargar_mas.content = f"Mostrar más ({total - len(ventana)} restantes)"
+                    boton_cargar_mas.visible = True
+                    lista_tareas.controls.append(boton_cargar_mas)
+        elif not proyecto_seleccionado:
+            boton_nueva_tarea.disabled = True
+            fab_nueva_tarea.disabled = True
+            boton_historial.disabled = True
             titulo_tareas.value = "Tareas"
             lista_tareas.controls.append(
                 ft.Container(
@@ -692,13 +2902,32 @@ def main(page: ft.Page):
                     expand=True,
                 )
             )
+        elif mostrando_historial:
+            # El archivo solo se lee del disco al abrir esta vista
+            boton_historial.disabled = False
+            boton_historial.icon = ft.Icons.LIST_ALT
+            titulo_tareas.value = f"{proyecto_seleccionado.nombre} · Archivadas"
+            archivadas = gestor.obtener_historial_proyecto(proyecto_seleccionado.id)
+            
+            if not archivadas:
+                lista_tareas.controls.append(
+                    ft.Container(
+                        content=ft.Text("No hay tareas archivadas", size=14, color=ft.Colors.GREY_500),
+                        padding=20,
+                    )
+                )
+            else:
+                for tarea in sorted(archivadas, key=lambda t: t.fecha_completada or "", reverse=True):
+                    lista_tareas.controls.append(crear_tarjeta_archivada(tarea))
         else:
             boton_nueva_tarea.disabled = False
             fab_nueva_tarea.disabled = False
+            boton_historial.disabled = False
+            boton_historial.icon = ft.Icons.HISTORY
             titulo_tareas.value = proyecto_seleccionado.nombre
-            tareas = gestor.obtener_tareas_proyecto(proyecto_seleccionado.id)
+            tareas_ordenadas = gestor.obtener_tareas_ordenadas(proyecto_seleccionado.id, modo_orden)
             
-            if not tareas:
+            if not tareas_ordenadas:
                 lista_tareas.controls.append(
                     ft.Container(
                         content=ft.Column([
@@ -710,102 +2939,81 @@ def main(page: ft.Page):
                     )
                 )
             else:
-                tareas_ordenadas = sorted(tareas, key=lambda t: (t.completada, -t.id))
-                for tarea in tareas_ordenadas:
-                    lista_tareas.controls.append(crear_tarjeta_tarea(tarea))
-        
-        page.update()
+                ventana = tareas_ordenadas[:limite_visible]
+                lista_tareas.controls = reconciliar(tarjetas_tareas, ventana, firma_tarea, crear_tarjeta_tarea)
+                
+                restantes = len(tareas_ordenadas) - len(ventana)
+                if restantes > 0:
+                    boton_cargar_mas.content = f"Mostrar más ({restantes} restantes)"
+                    boton_cargar_mas.visible = True
+                    lista_tareas.controls.append(boton_cargar_mas)
+    
+    # ========== SINCRONIZACIÓN ==========
+    
+    def mostrar_estado_sync(estado, resultado):
+        # Llega desde el hilo del sincronizador: se aplica en el event loop
+        render.publicar(aplicar_estado_sync, estado, resultado)
+    
+    @render.accion("sync")
+    def aplicar_estado_sync(estado, resultado):
+        if estado == "sincronizando":
+            lbl_estado_sync.value = "📡 Sincronizando..."
+            lbl_estado_sync.color = ft.Colors.BLUE_500
+        elif estado == "ok":
+            lbl_estado_sync.value = f"✓ Sincronizado {datetime.now().strftime('%H:%M')}"
+            lbl_estado_sync.color = ft.Colors.GREEN
+            if resultado["traidas"]:
+                actualizar_proyectos()
+                actualizar_tareas()
+        elif resultado["sin_conexion"]:
+            lbl_estado_sync.value = f"📴 Sin conexión (reintento en {resultado['reintento']} s)"
+            lbl_estado_sync.color = ft.Colors.GREY_600
+        else:
+            lbl_estado_sync.value = f"❌ Error (reintento en {resultado['reintento']} s)"
+            lbl_estado_sync.color = ft.Colors.RED_500
+        render.marcar()
     
-    # ========== SINCRONIZACIÓN MANUAL ==========
+    sincronizador = SincronizadorAutomatico(gestor, cliente_sync, mostrar_estado_sync) if cliente_sync else None
     
     def sincronizar_traer(e):
-        if not cliente_sync:
+        if not sincronizador:
             lbl_estado_sync.value = "❌ Google Sheets no configurado"
             lbl_estado_sync.color = ft.Colors.RED_500
-            page.update()
+            render.marcar()
             return
-        
-        lbl_estado_sync.value = "📡 Descargando..."
-        lbl_estado_sync.color = ft.Colors.BLUE_500
-        page.update()
-        
-        def bg():
-            try:
-                p = cliente_sync.traer_proyectos()
-                t = cliente_sync.traer_tareas()
-                
-                # MERGE inteligente: agregar nuevos sin perder lo local
-                if p:
-                    # Obtener IDs existentes localmente
-                    ids_locales = {int(proy.id) for proy in gestor.proyectos}
-                    for proyecto_sheets in p:
-                        proyecto_id = int(proyecto_sheets.id)
-                        # Si no existe localmente, agregarlo
-                        if proyecto_id not in ids_locales:
-                            gestor.proyectos.append(proyecto_sheets)
-                    gestor.guardar_proyectos()
-                
-                if t:
-                    # Obtener IDs existentes localmente
-                    ids_locales = {int(tarea.id) for tarea in gestor.tareas}
-                    for tarea_sheets in t:
-                        tarea_id = int(tarea_sheets.id)
-                        # Si no existe localmente, agregarlo
-                        if tarea_id not in ids_locales:
-                            gestor.tareas.append(tarea_sheets)
-                    gestor.guardar_tareas()
-                
-                lbl_estado_sync.value = "✓ Descargado"
-                lbl_estado_sync.color = ft.Colors.GREEN
-                actualizar_proyectos()
-                actualizar_tareas()
-            except Exception as ex:
-                print(f"❌ Error en sincronizar_traer: {ex}")
-                lbl_estado_sync.value = f"❌ Error"
-                lbl_estado_sync.color = ft.Colors.RED_500
-            page.update()
-        
-        threading.Thread(target=bg, daemon=True).start()
+        sincronizador.solicitar("traer")
     
     def sincronizar_guardar(e):
-        if not cliente_sync:
+        if not sincronizador:
             lbl_estado_sync.value = "❌ Google Sheets no configurado"
             lbl_estado_sync.color = ft.Colors.RED_500
-            page.update()
+            render.marcar()
             return
-        
-        lbl_estado_sync.value = "📡 Guardando..."
-        lbl_estado_sync.color = ft.Colors.BLUE_500
-        page.update()
-        
-        def bg():
-            try:
-                # Primero traer lo que existe en Sheets para no duplicar
-                proyectos_sheets = cliente_sync.traer_proyectos() or []
-                tareas_sheets = cliente_sync.traer_tareas() or []
-                
-                ids_proyectos_sheets = {int(p.id) for p in proyectos_sheets}
-                ids_tareas_sheets = {int(t.id) for t in tareas_sheets}
-                
-                # Enviar solo los proyectos nuevos
-                for p in gestor.proyectos:
-                    if int(p.id) not in ids_proyectos_sheets:
-                        cliente_sync.enviar_proyecto(p)
-                
-                # Enviar solo las tareas nuevas
-                for t in gestor.tareas:
-                    if int(t.id) not in ids_tareas_sheets:
-                        cliente_sync.enviar_tarea(t)
-                
-                lbl_estado_sync.value = "✓ Guardado"
-                lbl_estado_sync.color = ft.Colors.GREEN
-            except Exception as ex:
-                print(f"❌ Error en sincronizar_guardar: {ex}")
-                lbl_estado_sync.value = f"❌ Error"
-                lbl_estado_sync.color = ft.Colors.RED_500
-            page.update()
-        
-        threading.Thread(target=bg, daemon=True).start()
+        sincronizador.solicitar("guardar")
+    
+    # ========== BÚSQUEDA ==========
+    
+    def buscar_tareas(e):
+        nonlocal texto_busqueda, buscar_archivadas
+        texto = (campo_busqueda.value or "").strip()
+        # Con una sola letra casi todo coincide: se espera a la segunda
+        texto_busqueda = texto if len(texto) >= 2 else ""
+        buscar_archivadas = False  # Cada texto nuevo vuelve a buscar solo en las activas
+        actualizar_tareas()
+        actualizar_layout()
+    
+    def incluir_archivadas(e):
+        nonlocal buscar_archivadas
+        buscar_archivadas = True
+        actualizar_tareas()
+    
+    campo_busqueda = ft.TextField(
+        hint_text="Buscar tareas...",
+        prefix_icon=ft.Icons.SEARCH,
+        on_change=buscar_tareas,
+        dense=True,
+        filled=True,
+    )
     
     # ========== PANELES PRINCIPALES ==========
     
@@ -814,6 +3022,7 @@ def main(page: ft.Page):
             ft.Row([
                 ft.Text("Proyectos", size=20, weight=ft.FontWeight.BOLD),
                 ft.IconButton(icon=ft.Icons.ADD, icon_size=20, tooltip="Nuevo Proyecto", on_click=lambda e: abrir_formulario_proyecto()),
+                boton_agenda,
                 ft.IconButton(icon=ft.Icons.SAVE, icon_size=20, tooltip="Guardar en Sheets", on_click=sincronizar_guardar),
                 ft.IconButton(icon=ft.Icons.SYNC_ROUNDED, icon_size=20, tooltip="Traer de Sheets", on_click=sincronizar_traer)
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
@@ -834,6 +3043,9 @@ def main(page: ft.Page):
                 ft.Icon(ft.Icons.LIST_ALT, size=28, color=ft.Colors.BLUE_400),
                 ft.Container(content=titulo_tareas, expand=True),
                 ft.Container(content=lbl_estado_sync, expand=True),
+                selector_orden,
+                boton_estadisticas,
+                boton_historial,
                 boton_nueva_tarea,
             ], alignment=ft.MainAxisAlignment.START),
             ft.Divider(height=1),
@@ -845,10 +3057,17 @@ def main(page: ft.Page):
     
     layout_principal = ft.Row([panel_proyectos, panel_tareas], spacing=15, expand=True)
     
+    # La búsqueda va en una barra sobre los dos paneles: en móvil los resultados
+    # ocultan el panel de proyectos y el campo tiene que seguir a la vista
+    barra_busqueda = ft.Container(content=campo_busqueda, padding=ft.Padding.symmetric(horizontal=15))
+    vista_principal = ft.Column([barra_busqueda, layout_principal], spacing=10, expand=True)
+    
     # ========== RESPONSIVE ==========
     
-    def actualizar_layout(e=None):
-        is_mobile = page.width < 800 if page.width else False
+    def construir_layout():
+        nonlocal modo_movil
+        is_mobile = page.width < ANCHO_MOVIL if page.width else False
+        modo_movil = is_mobile
         
         if dialogo_proyecto.open and dialogo_proyecto.content:
             dialogo_proyecto.content.width = min(500, page.width - 50) if page.width else 500
@@ -863,7 +3082,7 @@ def main(page: ft.Page):
             panel_proyectos.expand = True
             boton_nueva_tarea.visible = False
             
-            if proyecto_seleccionado:
+            if proyecto_seleccionado or texto_busqueda or mostrando_agenda or mostrando_estadisticas:
                 panel_proyectos.visible = False
                 panel_tareas.visible = True
                 boton_volver.visible = True
@@ -881,17 +3100,114 @@ def main(page: ft.Page):
             boton_volver.visible = False
             boton_nueva_tarea.visible = True
             page.floating_action_button = None
-        
-        page.update()
     
-    page.on_resize = actualizar_layout
+    render.registrar("proyectos", construir_proyectos)
+    render.registrar("tareas", construir_tareas)
+    render.registrar("layout", construir_layout)
+    
+    def actualizar_proyectos():
+        render.marcar("proyectos")
+    
+    def actualizar_tareas():
+        render.marcar("tareas")
+    
+    def actualizar_layout(e=None):
+        render.marcar("layout")
+    
+    # ========== RESIZE ==========
+    # Arrastrar el borde de la ventana dispara decenas de eventos por segundo:
+    # se espera a que paren y solo se rehace el layout si se cruzó el punto de
+    # quiebre o hay un diálogo abierto que ajustar. Si no, no hay page.update().
+    # La espera es un solo TimerHandle del loop de la página que se rearma (sin hilos).
+    modo_movil = None
+    espera_resize = None
+    
+    def aplicar_resize():
+        es_movil = page.width < ANCHO_MOVIL if page.width else False
+        if es_movil != modo_movil or dialogo_proyecto.open or dialogo_tarea.open:
+            actualizar_layout()
+    
+    def rearmar_resize():
+        # Siempre en el loop: no hace falta lock
+        nonlocal espera_resize
+        if espera_resize is not None:
+            espera_resize.cancel()
+        espera_resize = loop.call_later(ESPERA_RESIZE, aplicar_resize)
+    
+    def al_redimensionar(e=None):
+        loop.call_soon_threadsafe(rearmar_resize)
+    
+    page.on_resize = al_redimensionar
     
     # ========== AGREGAR A LA PÁGINA ==========
-    page.add(layout_principal)
+    page.add(vista_principal)
     
     actualizar_layout()
     actualizar_proyectos()
     actualizar_tareas()
+    render.flush()  # Primer frame sin esperar al siguiente
+    ARRANQUE["primer_frame"] = time.perf_counter() - inicio_main
+    
+    async def vigilar_archivos():
+        # Otra instancia (o el servicio) puede escribir los mismos archivos: se aplican
+        # solo los registros que cambiaron y la reconciliación rehace solo esas tarjetas
+        nonlocal proyecto_seleccionado
+        while True:
+            await asyncio.sleep(INTERVALO_VIGILANCIA)
+            try:
+                cambios = await loop.run_in_executor(None, gestor.recargar_cambios)
+            except Exception as e:
+                print(f"⚠️ Error al recargar cambios de otro proceso: {e}")
+                continue
+            if not cambios:
+                continue
+            if proyecto_seleccionado and gestor.obtener_proyecto(proyecto_seleccionado.id) is None:
+                proyecto_seleccionado = None
+            actualizar_proyectos()
+            actualizar_tareas()
+    
+    async def completar_arranque():
+        # Disco fuera del event loop: la carga y el archivado inicial van a un hilo del executor
+        try:
+            await loop.run_in_executor(None, gestor.cargar_tareas)
+            ARRANQUE["tareas_cargadas"] = time.perf_counter() - inicio_main
+            if not await loop.run_in_executor(None, gestor.archivar_completadas):
+                # Sin archivado no hubo escritura: se refresca el resumen para el próximo arranque
+                await loop.run_in_executor(None, gestor.guardar_resumen)
+        except Exception as e:
+            print(f"❌ Error al cargar tareas: {e}")
+            lbl_estado_sync.value = "❌ Error al cargar tareas.json"
+            lbl_estado_sync.color = ft.Colors.RED_500
+            actualizar_tareas()  # Cambia "Cargando tareas..." por el error
+            render.marcar()
+            return
+        
+        actualizar_proyectos()
+        actualizar_tareas()
+        render.flush()
+        ARRANQUE["interactivo"] = time.perf_counter() - inicio_main
+        
+        # Con la UI ya usable: índice de búsqueda, recordatorios, métricas y sync
+        def avisar_error_indice(futuro):
+            if not futuro.cancelled() and futuro.exception():
+                print(f"⚠️ No se pudo preparar el índice de búsqueda (se reintenta al buscar): {futuro.exception()}")
+        loop.run_in_executor(None, gestor.preparar_busqueda).add_done_callback(avisar_error_indice)
+        notificador.iniciar()
+        loop.create_task(vigilar_archivos())
+        
+        if METRICAS:
+            async def exportar_metricas():
+                while True:
+                    await asyncio.sleep(INTERVALO_METRICAS)
+                    await loop.run_in_executor(None, METRICAS.exportar)
+            loop.create_task(exportar_metricas())
+            print(f"📊 Métricas activas: {ARCHIVO_METRICAS}.json / {ARCHIVO_METRICAS}.prom cada {INTERVALO_METRICAS} s")
+        
+        if sincronizador:
+            sincronizador.iniciar()
+        informe_arranque()
+    
+    loop.create_task(completar_arranque())
 
 if __name__ == "__main__":
     ft.run(main)
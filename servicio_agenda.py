@@ -0,0 +1,537 @@
+"""
+Modo servicio: la agenda sin ventana, con un API HTTP/JSON local.
+
+Mantiene GestorDatos (con sus índices en memoria) y NotificadorTareas
+vivos en un proceso largo para que scripts y otras herramientas creen y
+consulten tareas sin abrir la UI de Flet:
+
+    python servicio_agenda.py --puerto 8766 --datos ~/agenda
+    curl "http://127.0.0.1:8766/tareas?proyecto=1&orden=fecha&limite=20"
+    curl -X POST http://127.0.0.1:8766/tareas -d '{"titulo": "Llamar", "proyecto_id": 1}'
+
+Rutas:
+    GET    /salud
+    GET    /proyectos                 (con total, completadas y vencidas)
+    GET    /proyectos/<id>
+    POST   /proyectos                 {nombre, descripcion, color}
+    PUT    /proyectos/<id>            campos a cambiar
+    DELETE /proyectos/<id>            (y sus tareas)
+    GET    /tareas                    ?q= &proyecto= &prioridad= &desde= &hasta= (YYYY-MM-DD[ HH:MM]) &estado=pendientes|completadas
+                                      &orden=prioridad|fecha|creacion &limite= &saltar=
+    GET    /tareas/<id>
+    POST   /tareas                    {titulo, descripcion, proyecto_id, fecha_programada, prioridad}
+    PUT    /tareas/<id>               campos a cambiar
+    POST   /tareas/<id>/completar
+    DELETE /tareas/<id>
+    POST   /lote                      {"operaciones": [{"metodo", "ruta", "cuerpo"}, ...]}
+
+Los GET llevan un ETag (versión de los datos): con If-None-Match se
+responde 304 sin volver a serializar. Un lote se aplica bajo un solo lock
+y escribe cada archivo una vez al final.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from main2 import (GestorDatos, NotificadorTareas, ClienteSincronizacion, SincronizadorAutomatico,
+                   MODOS_ORDEN, RANGO_PRIORIDAD, COLORES_PROYECTO, GOOGLE_SHEETS_URL,
+                   INTERVALO_VIGILANCIA)
+
+PUERTO_SERVICIO = 8766
+HILOS_SERVICIO = 8  # Peticiones atendidas a la vez
+MAX_RESPUESTAS_CACHE = 256  # Cuerpos de GET guardados por versión de los datos
+MAX_OPERACIONES_LOTE = 500
+LIMITE_TAREAS = 1000  # Tope de ?limite= en /tareas
+FORMATO_FECHA = "%Y-%m-%d %H:%M"
+
+class ErrorApi(Exception):
+    """Error que llega al cliente como {"error": mensaje} con su código HTTP"""
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+# ========== API ==========
+
+class ApiAgenda:
+    """Rutas del servicio sobre un GestorDatos. Independiente de HTTP (lo usa también /lote)"""
+    def __init__(self, gestor):
+        self.gestor = gestor
+        self.version = 0  # Sube con cada escritura del gestor: es el ETag
+        self._cache = OrderedDict()  # ruta completa -> (version, cuerpo JSON en bytes)
+        self._lock_cache = threading.Lock()
+        gestor.suscribir(self._cambio)
+        self.rutas = [
+            ("GET", r"/salud", self.salud),
+            ("GET", r"/proyectos", self.listar_proyectos),
+            ("GET", r"/proyectos/(\d+)", self.ver_proyecto),
+            ("POST", r"/proyectos", self.crear_proyecto),
+            ("PUT", r"/proyectos/(\d+)", self.actualizar_proyecto),
+            ("DELETE", r"/proyectos/(\d+)", self.eliminar_proyecto),
+            ("GET", r"/tareas", self.listar_tareas),
+            ("GET", r"/tareas/(\d+)", self.ver_tarea),
+            ("POST", r"/tareas", self.crear_tarea),
+            ("PUT", r"/tareas/(\d+)", self.actualizar_tarea),
+            ("POST", r"/tareas/(\d+)/completar", self.completar_tarea),
+            ("DELETE", r"/tareas/(\d+)", self.eliminar_tarea),
+            ("POST", r"/lote", self.lote),
+        ]
+        self.rutas = [(metodo, re.compile(patron + r"/?$"), funcion) for metodo, patron, funcion in self.rutas]
+
+    def _cambio(self, tipo):
+        with self._lock_cache:
+            self.version += 1
+            self._cache.clear()
+
+    @property
+    def etag(self):
+        return f'W/"{self.version}"'
+
+    def ejecutar(self, metodo, ruta, parametros=None, cuerpo=None):
+        """(estado, datos) de una petición. Cada escritura va en un lote del gestor: de a una,
+        también respecto de la sincronización y el notificador"""
+        parametros = parametros or {}
+        ruta_encontrada = False
+        for metodo_ruta, patron, funcion in self.rutas:
+            coincidencia = patron.match(ruta)
+            if not coincidencia:
+                continue
+            ruta_encontrada = True
+            if metodo_ruta != metodo:
+                continue
+            argumentos = [int(g) for g in coincidencia.groups()]
+            try:
+                if metodo == "GET":
+                    return 200, funcion(*argumentos, parametros)
+                with self.gestor.lote():
+                    return funcion(*argumentos, cuerpo or {})
+            except ErrorApi as e:
+                return e.estado, {"error": str(e)}
+            except Exception as e:
+                # Un fallo inesperado no puede dejar la conexión sin respuesta
+                print(f"❌ Error en {metodo} {ruta}: {e!r}")
+                return 500, {"error": "Error interno del servicio"}
+        if ruta_encontrada:
+            return 405, {"error": f"Método {metodo} no permitido en {ruta}"}
+        return 404, {"error": f"Ruta desconocida: {ruta}"}
+
+    def respuesta_get(self, ruta_completa):
+        """(version, cuerpo) de un GET, serializado una vez por versión de los datos"""
+        with self._lock_cache:
+            guardada = self._cache.get(ruta_completa)
+            if guardada is not None and guardada[0] == self.version:
+                self._cache.move_to_end(ruta_completa)
+                return guardada
+            version = self.version
+        url = urlparse(ruta_completa)
+        parametros = {k: v[0] for k, v in parse_qs(url.query).items()}
+        estado, datos = self.ejecutar("GET", url.path, parametros)
+        if estado != 200:
+            raise ErrorApi(estado, datos["error"])
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        with self._lock_cache:
+            # Si los datos cambiaron mientras se construía, no se guarda (la versión ya no vale)
+            if version == self.version:
+                self._cache[ruta_completa] = (version, cuerpo)
+                if len(self._cache) > MAX_RESPUESTAS_CACHE:
+                    self._cache.popitem(last=False)
+        return version, cuerpo
+
+    # ---------- Validación ----------
+
+    def _proyecto(self, id):
+        proyecto = self.gestor.obtener_proyecto(id)
+        if proyecto is None:
+            raise ErrorApi(404, f"No existe el proyecto {id}")
+        return proyecto
+
+    def _tarea(self, id):
+        tarea = self.gestor.obtener_tarea(id)
+        if tarea is None:
+            raise ErrorApi(404, f"No existe la tarea {id}")
+        return tarea
+
+    @staticmethod
+    def _texto(cuerpo, campo, obligatorio=False, defecto=""):
+        valor = cuerpo.get(campo, defecto)
+        if valor is None:
+            valor = defecto
+        if not isinstance(valor, str):
+            raise ErrorApi(400, f"'{campo}' debe ser texto")
+        if obligatorio and not valor.strip():
+            raise ErrorApi(400, f"Falta '{campo}'")
+        return valor.strip() if obligatorio else valor
+
+    @staticmethod
+    def _fecha(valor, campo, admite_dia=False):
+        """admite_dia: también YYYY-MM-DD (los rangos de /tareas comparan como texto)"""
+        if valor in (None, ""):
+            return None
+        formatos = (FORMATO_FECHA, "%Y-%m-%d") if admite_dia else (FORMATO_FECHA,)
+        for formato in formatos:
+            try:
+                datetime.strptime(valor, formato)
+                return valor
+            except (TypeError, ValueError):
+                pass
+        if admite_dia:
+            raise ErrorApi(400, f"'{campo}' debe tener el formato YYYY-MM-DD o YYYY-MM-DD HH:MM")
+        raise ErrorApi(400, f"'{campo}' debe tener el formato YYYY-MM-DD HH:MM")
+
+    @staticmethod
+    def _prioridad(valor):
+        if valor not in RANGO_PRIORIDAD:
+            raise ErrorApi(400, f"'prioridad' debe ser una de: {', '.join(RANGO_PRIORIDAD)}")
+        return valor
+
+    @staticmethod
+    def _color(valor):
+        if valor not in COLORES_PROYECTO:
+            raise ErrorApi(400, f"'color' debe ser uno de: {', '.join(COLORES_PROYECTO)}")
+        return valor
+
+    @staticmethod
+    def _entero(parametros, campo, defecto, minimo=None):
+        try:
+            valor = int(parametros.get(campo, defecto))
+        except ValueError:
+            raise ErrorApi(400, f"'{campo}' debe ser un número")
+        if minimo is not None and valor < minimo:
+            raise ErrorApi(400, f"'{campo}' no puede ser menor que {minimo}")
+        return valor
+
+    # ---------- Proyectos ----------
+
+    def salud(self, parametros):
+        return {"estado": "ok", "proyectos": len(self.gestor.proyectos), "tareas": len(self.gestor.tareas)}
+
+    def _proyecto_con_conteos(self, proyecto, conteos, vencidas):
+        total, completadas = conteos.get(proyecto.id, (0, 0))
+        return {**proyecto.to_dict(), "total": total, "completadas": completadas,
+                "vencidas": vencidas.get(proyecto.id, 0)}
+
+    def listar_proyectos(self, parametros):
+        conteos = self.gestor.contar_por_proyecto()
+        vencidas = self.gestor.vencidas_por_proyecto()
+        return {"proyectos": [self._proyecto_con_conteos(p, conteos, vencidas) for p in self.gestor.proyectos]}
+
+    def ver_proyecto(self, id, parametros):
+        return self._proyecto_con_conteos(self._proyecto(id), self.gestor.contar_por_proyecto(),
+                                          self.gestor.vencidas_por_proyecto())
+
+    def crear_proyecto(self, cuerpo):
+        proyecto = self.gestor.agregar_proyecto(
+            self._texto(cuerpo, "nombre", obligatorio=True),
+            self._texto(cuerpo, "descripcion"),
+            self._color(cuerpo.get("color", "Azul")),
+        )
+        return 201, proyecto.to_dict()
+
+    def actualizar_proyecto(self, id, cuerpo):
+        proyecto = self._proyecto(id)
+        self.gestor.actualizar_proyecto(
+            id,
+            self._texto(cuerpo, "nombre", obligatorio=True) if "nombre" in cuerpo else proyecto.nombre,
+            self._texto(cuerpo, "descripcion") if "descripcion" in cuerpo else proyecto.descripcion,
+            self._color(cuerpo["color"]) if "color" in cuerpo else proyecto.color,
+        )
+        return 200, proyecto.to_dict()
+
+    def eliminar_proyecto(self, id, cuerpo):
+        self._proyecto(id)
+        self.gestor.eliminar_proyecto(id)
+        return 200, {"ok": True}
+
+    # ---------- Tareas ----------
+
+    def listar_tareas(self, parametros):
+        """Traduce los parámetros a gestor.query, que elige el índice (búsqueda, fechas, proyecto...)"""
+        orden = parametros.get("orden", "prioridad")
+        if orden not in MODOS_ORDEN:
+            raise ErrorApi(400, f"'orden' debe ser uno de: {', '.join(MODOS_ORDEN)}")
+        estado = parametros.get("estado")
+        if estado not in (None, "pendientes", "completadas"):
+            raise ErrorApi(400, "'estado' debe ser 'pendientes' o 'completadas'")
+        filtros = {}
+        if parametros.get("q"):
+            filtros["texto"] = parametros["q"]
+        if parametros.get("proyecto"):
+            filtros["proyecto_id"] = self._entero(parametros, "proyecto", 0)
+        if parametros.get("prioridad"):
+            filtros["prioridad"] = self._prioridad(parametros["prioridad"])
+        if estado:
+            filtros["completada"] = estado == "completadas"
+        if parametros.get("desde"):
+            filtros["fecha_desde"] = self._fecha(parametros["desde"], "desde", admite_dia=True)
+        if parametros.get("hasta"):
+            filtros["fecha_hasta"] = self._fecha(parametros["hasta"], "hasta", admite_dia=True)
+        limite = min(self._entero(parametros, "limite", LIMITE_TAREAS, minimo=0), LIMITE_TAREAS)
+        saltar = self._entero(parametros, "saltar", 0, minimo=0)
+
+        consulta = self.gestor.query(filtros, orden_por=orden, limite=limite, desplazamiento=saltar)
+        return {"tareas": [t.to_dict() for t in consulta], "total": consulta.count()}
+
+    def ver_tarea(self, id, parametros):
+        return self._tarea(id).to_dict()
+
+    def crear_tarea(self, cuerpo):
+        proyecto_id = cuerpo.get("proyecto_id")
+        # bool es subclase de int: true/false no son un id
+        if not isinstance(proyecto_id, int) or isinstance(proyecto_id, bool):
+            raise ErrorApi(400, "Falta 'proyecto_id' (número)")
+        self._proyecto(proyecto_id)
+        tarea = self.gestor.agregar_tarea(
+            self._texto(cuerpo, "titulo", obligatorio=True),
+            self._texto(cuerpo, "descripcion"),
+            proyecto_id,
+            fecha_programada=self._fecha(cuerpo.get("fecha_programada"), "fecha_programada"),
+            prioridad=self._prioridad(cuerpo.get("prioridad", "Media")),
+        )
+        return 201, tarea.to_dict()
+
+    def actualizar_tarea(self, id, cuerpo):
+        tarea = self._tarea(id)
+        completada = cuerpo.get("completada", tarea.completada)
+        if not isinstance(completada, bool):
+            raise ErrorApi(400, "'completada' debe ser true o false")
+        self.gestor.actualizar_tarea(
+            id,
+            self._texto(cuerpo, "titulo", obligatorio=True) if "titulo" in cuerpo else tarea.titulo,
+            self._texto(cuerpo, "descripcion") if "descripcion" in cuerpo else tarea.descripcion,
+            completada,
+            fecha_programada=self._fecha(cuerpo["fecha_programada"], "fecha_programada") if "fecha_programada" in cuerpo else tarea.fecha_programada,
+            prioridad=self._prioridad(cuerpo["prioridad"]) if "prioridad" in cuerpo else tarea.prioridad,
+        )
+        return 200, tarea.to_dict()
+
+    def completar_tarea(self, id, cuerpo):
+        tarea = self._tarea(id)
+        if not tarea.completada:
+            self.gestor.toggle_completada(id)
+        return 200, tarea.to_dict()
+
+    def eliminar_tarea(self, id, cuerpo):
+        self._tarea(id)
+        self.gestor.eliminar_tarea(id)
+        return 200, {"ok": True}
+
+    # ---------- Lote ----------
+
+    def lote(self, cuerpo):
+        """Varias operaciones seguidas; tareas.json/proyectos.json se escriben una vez al final.
+
+        No es atómico: si una falla, las anteriores quedan aplicadas y se sigue con las demás.
+        """
+        operaciones = cuerpo.get("operaciones")
+        if not isinstance(operaciones, list):
+            raise ErrorApi(400, "Falta 'operaciones' (lista)")
+        if len(operaciones) > MAX_OPERACIONES_LOTE:
+            raise ErrorApi(400, f"Como mucho {MAX_OPERACIONES_LOTE} operaciones por lote")
+        resultados = []
+        with self.gestor.lote():
+            for operacion in operaciones:
+                if not isinstance(operacion, dict) or not isinstance(operacion.get("ruta"), str):
+                    resultados.append({"estado": 400, "cuerpo": {"error": "Operación sin 'ruta'"}})
+                    continue
+                metodo = str(operacion.get("metodo", "GET")).upper()
+                url = urlparse(operacion["ruta"])
+                if url.path.rstrip("/") == "/lote":
+                    resultados.append({"estado": 400, "cuerpo": {"error": "No se pueden anidar lotes"}})
+                    continue
+                if metodo == "GET":
+                    parametros = {k: v[0] for k, v in parse_qs(url.query).items()}
+                    estado, datos = self.ejecutar("GET", url.path, parametros)
+                elif operacion.get("cuerpo") is not None and not isinstance(operacion["cuerpo"], dict):
+                    estado, datos = 400, {"error": "'cuerpo' debe ser un objeto JSON"}
+                else:
+                    estado, datos = self.ejecutar(metodo, url.path, cuerpo=operacion.get("cuerpo"))
+                resultados.append({"estado": estado, "cuerpo": datos})
+        return 200, {"resultados": resultados}
+
+# ========== HTTP ==========
+
+class ManejadorAgenda(BaseHTTPRequestHandler):
+    api = None  # Se asigna en crear_servidor
+
+    def log_message(self, formato, *args):
+        pass  # Sin una línea por petición
+
+    def _responder(self, datos, estado=200, cuerpo=None, etag=None):
+        cuerpo = cuerpo if cuerpo is not None else json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")  # Siempre revalidar con If-None-Match
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _cuerpo(self):
+        try:
+            longitud = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ErrorApi(400, "Content-Length no es un número")
+        if not longitud:
+            return {}
+        try:
+            datos = json.loads(self.rfile.read(longitud))
+        except ValueError:
+            raise ErrorApi(400, "El cuerpo no es JSON válido")
+        if not isinstance(datos, dict):
+            raise ErrorApi(400, "El cuerpo debe ser un objeto JSON")
+        return datos
+
+    def do_GET(self):
+        # El ETag es la versión de los datos: si no cambió, ni se recalcula ni se envía
+        if self.headers.get("If-None-Match") == self.api.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.api.etag)
+            self.end_headers()
+            return
+        try:
+            version, cuerpo = self.api.respuesta_get(self.path)
+        except ErrorApi as e:
+            self._responder({"error": str(e)}, e.estado)
+            return
+        self._responder(None, cuerpo=cuerpo, etag=f'W/"{version}"')
+
+    def _escritura(self, metodo):
+        try:
+            cuerpo = self._cuerpo()
+        except ErrorApi as e:
+            self._responder({"error": str(e)}, e.estado)
+            return
+        estado, datos = self.api.ejecutar(metodo, urlparse(self.path).path, cuerpo=cuerpo)
+        self._responder(datos, estado, etag=self.api.etag)
+
+    def do_POST(self):
+        self._escritura("POST")
+
+    def do_PUT(self):
+        self._escritura("PUT")
+
+    def do_DELETE(self):
+        self._escritura("DELETE")
+
+class ServidorAgenda(HTTPServer):
+    """HTTPServer que atiende cada conexión en un pool fijo de hilos"""
+    def __init__(self, direccion, manejador, hilos=HILOS_SERVICIO):
+        super().__init__(direccion, manejador)
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="servicio")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+def crear_servidor(api, host="127.0.0.1", puerto=0, hilos=HILOS_SERVICIO):
+    """Servidor en un hilo daemon. Devuelve (servidor, url); puerto=0 elige uno libre"""
+    manejador = type("Manejador", (ManejadorAgenda,), {"api": api})
+    servidor = ServidorAgenda((host, puerto), manejador, hilos)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_port}/"
+
+# ========== SERVICIO ==========
+
+class ServicioAgenda:
+    """Gestor + notificador (+ sincronización si hay URL de Sheets) + API HTTP en un proceso"""
+    def __init__(self, host="127.0.0.1", puerto=PUERTO_SERVICIO, hilos=HILOS_SERVICIO, sync=True):
+        self.gestor = GestorDatos()
+        self.gestor.archivar_completadas()
+        self.api = ApiAgenda(self.gestor)
+        self.notificador = NotificadorTareas(self.gestor)
+        self.sincronizador = None
+        if sync and GOOGLE_SHEETS_URL:
+            self.sincronizador = SincronizadorAutomatico(self.gestor, ClienteSincronizacion(GOOGLE_SHEETS_URL),
+                                                         self._estado_sync)
+        self.host, self.puerto, self.hilos = host, puerto, hilos
+        self.servidor = None
+        self.loop = None
+        self._vigilancia = None
+
+    def _estado_sync(self, estado, resultado):
+        if estado not in ("sincronizando", "ok"):
+            print(f"⚠️ Sincronización fallida (reintento en {resultado['reintento']} s)")
+
+    def iniciar(self):
+        """Arranca el event loop (notificador y sync) y el servidor HTTP. Devuelve la URL"""
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="servicio-loop", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._iniciar_tareas(), self.loop).result()
+        self.gestor.preparar_busqueda()
+        self.servidor, url = crear_servidor(self.api, self.host, self.puerto, self.hilos)
+        return url
+
+    async def _iniciar_tareas(self):
+        self.notificador.iniciar()
+        self._vigilancia = asyncio.get_running_loop().create_task(self._vigilar_archivos())
+        if self.sincronizador:
+            self.sincronizador.iniciar()
+
+    async def _vigilar_archivos(self):
+        # La app u otro servicio pueden escribir los mismos archivos
+        while True:
+            await asyncio.sleep(INTERVALO_VIGILANCIA)
+            try:
+                await asyncio.to_thread(self.gestor.recargar_cambios)
+            except Exception as e:
+                print(f"⚠️ Error al recargar cambios de otro proceso: {e}")
+
+    def detener(self):
+        if self.servidor:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+        if self.loop:
+            asyncio.run_coroutine_threadsafe(self._detener_tareas(), self.loop).result(timeout=5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _detener_tareas(self):
+        self.notificador.detener()
+        tareas = [self.notificador.tarea, self._vigilancia]
+        if self.sincronizador:
+            self.sincronizador.detener()
+            tareas.append(self.sincronizador.tarea)
+            await self.sincronizador.cliente.cerrar()
+        for tarea in tareas:
+            if tarea:
+                tarea.cancel()
+        await asyncio.gather(*(t for t in tareas if t), return_exceptions=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agenda de Proyectos sin UI, con API HTTP/JSON local")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_SERVICIO)
+    parser.add_argument("--hilos", type=int, default=HILOS_SERVICIO, help="Peticiones atendidas a la vez")
+    parser.add_argument("--datos", help="Directorio con proyectos.json/tareas.json (por defecto el actual)")
+    parser.add_argument("--sin-sync", action="store_true", help="No sincronizar con Google Sheets")
+    args = parser.parse_args()
+
+    if args.datos:
+        os.chdir(args.datos)  # GestorDatos usa rutas relativas
+    servicio = ServicioAgenda(args.host, args.puerto, args.hilos, sync=not args.sin_sync)
+    url = servicio.iniciar()
+    print(f"📡 Agenda en {url} · {len(servicio.gestor.proyectos)} proyectos, "
+          f"{len(servicio.gestor.tareas)} tareas (Ctrl+C para salir)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servicio.detener()